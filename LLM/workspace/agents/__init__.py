@@ -0,0 +1,3 @@
+# Importing the agent modules registers their tools with services.tool_registry.
+# Add new agent modules here so the runner picks up their tools automatically.
+from agents import weather_agent, schedule_agent, vision_agent  # noqa: F401
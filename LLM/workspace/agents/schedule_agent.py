@@ -1,22 +1,26 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from services.openai_client import get_client
+from services.tool_registry import register_tool
+from tools.schedule_api import manage_schedule
 
 schedule_tool = {
     "type": "function",
     "function": {
         "name": "manage_schedule",
-        "description": "Add an event or retrieve today's schedule.",
+        "description": (
+            "Add one-off or recurring events, list events for today or a date range, "
+            "and find free time or check whether a time is free."
+        ),
         "parameters": {
             "type": "object",
             "properties": {
                 "action": {
                     "type": "string",
-                    "enum": ["add", "get_today"],
+                    "enum": ["add", "get_today", "get_range", "find_free_slots", "add_recurring"],
+                    "description": (
+                        "get_range: events from date to end_date. "
+                        "find_free_slots: free time on date; with time, whether that time is free. "
+                        "add_recurring: event repeating from date with frequency/interval."
+                    )
                 },
                 "event": {
                     "type": "string",
@@ -24,11 +28,32 @@ schedule_tool = {
                 },
                 "date": {
                     "type": "string",
-                    "description": "Natural language date (e.g., 'today', 'tomorrow', 'next Monday')."
+                    "description": "Natural language date (e.g., 'today', 'tomorrow', 'next Monday'). First day for get_range and add_recurring."
                 },
                 "time": {
                     "type": "string",
                     "description": "Natural language time (e.g., '7 PM', 'this evening', 'after lunch')."
+                },
+                "end_date": {
+                    "type": "string",
+                    "description": "Last day for get_range (inclusive). Defaults to a week from date."
+                },
+                "duration": {
+                    "type": "integer",
+                    "description": "Length of the event or wanted free slot in minutes (default 60)."
+                },
+                "frequency": {
+                    "type": "string",
+                    "enum": ["daily", "weekly", "monthly"],
+                    "description": "How often a recurring event repeats."
+                },
+                "interval": {
+                    "type": "integer",
+                    "description": "Repeat every N days/weeks/months (default 1)."
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Last date a recurring event can occur (optional)."
                 }
             },
             "required": ["action"]
@@ -37,5 +62,9 @@ schedule_tool = {
 }
 
 
+# Writes must never be served from cache
+register_tool(schedule_tool, manage_schedule, timeout=5)
+
+
 def create_schedule_agent():
-    return client.chat.completions
+    return get_client().chat.completions
@@ -1,10 +1,7 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from services.openai_client import get_client
+from services.tool_registry import register_tool
+from tools.video_processor import iter_frames
+from tools.vision_api import analyze_frames
 
 # Vision 분석 tool 정의
 vision_tool = {
@@ -29,8 +26,18 @@ vision_tool = {
     }
 }
 
+
+def analyze_video(video_path, frame_interval=2):
+    """영상을 frame_interval초 간격으로 분석하여 장면 묘사를 반환합니다."""
+    description = analyze_frames(iter_frames(video_path, frame_interval), "지금 뭐가 보여?")
+    return {"video_path": video_path, "description": description}
+
+
+register_tool(vision_tool, analyze_video, timeout=180)
+
+
 def create_vision_agent():
     """Vision 에이전트 클라이언트를 반환합니다."""
-    return client.chat.completions
+    return get_client().chat.completions
 
 
@@ -1,10 +1,6 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from services.openai_client import get_client
+from services.tool_registry import register_tool
+from tools.weather_api import get_weather
 
 weather_tool = {
     "type": "function",
@@ -21,5 +17,8 @@ weather_tool = {
     }
 }
 
+# tools.weather_api caches per city itself (TTL + stale-while-revalidate)
+register_tool(weather_tool, get_weather, timeout=15)
+
 def create_weather_agent():
-    return client.chat.completions
+    return get_client().chat.completions
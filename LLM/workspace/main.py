@@ -1,54 +1,163 @@
 import os
+import asyncio
 from dotenv import load_dotenv
-from services.agent_runner import ask_agent, ask_vision
+from services.agent_runner import (
+    ask_agent_astream, ask_vision_astream, ask_vision_async, ask_vision_live_async,
+)
+from services.tool_registry import get_metrics
+from services.intent_router import classify
+from services.conversation import ConversationState
+from tools.udp_stream import UdpFrameSource
 
 load_dotenv()
 
 # Default Vision settings
 FRAME_INTERVAL_SECONDS = 2
 VIDEO_PATH = "input/sample.mp4"  # Default video file path
+VISION_CHUNK_SIZE = None  # Set to K to analyse K frames per request, in parallel
+SCENE_CHANGE_SAMPLING = False  # Extract frames only when the scene changes
+VISION_SOURCE = "file"  # "file" for VIDEO_PATH, "udp" for the live robot camera stream
+LIVE_WINDOW_SECONDS = 10  # How many recent seconds of the live stream to analyse
 
 
-def is_vision_question(text: str) -> bool:
-    """Check whether the user message is a vision-related question."""
-    vision_keywords = [
-        "see", "what do you see", "what can you see", "show me",
-        "describe the video", "describe the scene", "what is on the screen",
-        "video", "frame", "scene"
-    ]
-    return any(keyword in text.lower() for keyword in vision_keywords)
+async def print_stream(chunks):
+    """Print each text chunk as soon as it arrives."""
+    started = False
+    async for chunk in chunks:
+        if not started:
+            print("AI: ", end="", flush=True)
+            started = True
+        print(chunk, end="", flush=True)
+    print()
 
 
-def main():
+async def print_lines(label: str, chunks):
+    """
+    Print a background job's answer line by line with its label,
+    so it stays readable while other answers are printed.
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            print(f"{label} {line}")
+    if buffer:
+        print(f"{label} {buffer}")
+
+
+def print_metrics():
+    for name, m in get_metrics().items():
+        print(f"[Tool] {name}: {m['calls']} calls, avg {m['avg_seconds']:.2f}s, "
+              f"max {m['max_seconds']:.2f}s, {m['cache_hits']} cached, "
+              f"{m['errors']} errors, {m['timeouts']} timeouts")
+
+
+async def run_vision_job(label: str, question: str, live_source):
+    """Analyse the video (or live stream) for one question, reporting text as it arrives."""
+    try:
+        if live_source is not None:
+            answer = await ask_vision_live_async(
+                question=question,
+                source=live_source,
+                seconds=LIVE_WINDOW_SECONDS,
+                frame_interval=FRAME_INTERVAL_SECONDS,
+                chunk_size=VISION_CHUNK_SIZE
+            )
+            print(f"{label} {answer}")
+        elif VISION_CHUNK_SIZE:
+            answer = await ask_vision_async(
+                question=question,
+                video_path=VIDEO_PATH,
+                frame_interval=FRAME_INTERVAL_SECONDS,
+                chunk_size=VISION_CHUNK_SIZE,
+                scene_change=SCENE_CHANGE_SAMPLING
+            )
+            print(f"{label} {answer}")
+        else:
+            await print_lines(label, ask_vision_astream(
+                question=question,
+                video_path=VIDEO_PATH,
+                frame_interval=FRAME_INTERVAL_SECONDS,
+                scene_change=SCENE_CHANGE_SAMPLING
+            ))
+        print(f"{label} Done.")
+    except asyncio.CancelledError:
+        print(f"{label} Cancelled.")
+        raise
+    except Exception as e:
+        print(f"{label} Error:", e)
+
+
+async def chat():
     print("=== Starting AI Assistant Chat ===")
-    print("Type your question below. (Type 'exit chat' to quit)\n")
+    print("Type your question below. (Type 'exit chat' to quit)")
+    print("Video analysis runs in the background: 'jobs' lists it, 'cancel' (or 'cancel N') stops it.\n")
+
+    loop = asyncio.get_running_loop()
+    live_source = UdpFrameSource().start() if VISION_SOURCE == "udp" else None
+    conversation = ConversationState()  # lets follow-ups like "and tomorrow?" keep their context
+    vision_jobs = {}  # job number -> (task, question)
+    job_count = 0
 
     while True:
-        user_input = input("You: ").strip()
+        # input() blocks, so it waits in a thread while vision jobs keep running
+        user_input = (await loop.run_in_executor(None, input, "You: ")).strip()
+        command = user_input.lower()
+
+        # Forget finished jobs
+        for number in [n for n, (task, _) in vision_jobs.items() if task.done()]:
+            del vision_jobs[number]
 
-        if user_input.lower() == "exit chat":
+        if command == "exit chat":
+            for task, _ in vision_jobs.values():
+                task.cancel()
+            await asyncio.gather(*(task for task, _ in vision_jobs.values()), return_exceptions=True)
             print("AI: Chat ended. Have a great day!")
+            print_metrics()
             break
 
-        try:
-            # Check if the question is related to Vision tasks
-            if is_vision_question(user_input):
-                print("AI: Analyzing video... please wait.\n")
-                answer = ask_vision(
-                    question=user_input,
-                    video_path=VIDEO_PATH,
-                    frame_interval=FRAME_INTERVAL_SECONDS
-                )
-                print("AI:", answer)
-
-            else:
-                # Otherwise, send to Weather Agent
-                answer = ask_agent(user_input)
-                print("AI:", answer)
+        if command == "jobs":
+            if not vision_jobs:
+                print("AI: No video analysis is running.")
+            for number, (_, question) in vision_jobs.items():
+                print(f"AI: [Vision #{number}] {question}")
+            continue
+
+        if command == "cancel" or command.startswith("cancel "):
+            target = command[len("cancel"):].strip().lstrip("#")
+            numbers = list(vision_jobs) if not target else [int(target)] if target.isdigit() else []
+            cancelled = [n for n in numbers if n in vision_jobs and vision_jobs[n][0].cancel()]
+            print(f"AI: Cancelling {', '.join(f'#{n}' for n in cancelled)}." if cancelled
+                  else "AI: No matching video analysis is running.")
+            continue
+
+        if not user_input:
+            continue
 
+        # Check if the question is related to Vision tasks
+        if classify(user_input) == "vision":
+            job_count += 1
+            label = f"[Vision #{job_count}]"
+            print(f"AI: Analyzing video in the background {label}. Keep chatting meanwhile.")
+            task = asyncio.create_task(run_vision_job(label, user_input, live_source))
+            vision_jobs[job_count] = (task, user_input)
+            continue
+
+        try:
+            # Otherwise, answer with the agent (weather/schedule tools) while vision jobs run
+            await print_stream(ask_agent_astream(user_input, conversation))
         except Exception as e:
             print("Error:", e)
 
+    if live_source is not None:
+        live_source.stop()
+
+
+def main():
+    """Blocking entry point for the async chat loop."""
+    asyncio.run(chat())
+
 
 if __name__ == "__main__":
     main()
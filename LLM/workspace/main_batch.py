@@ -0,0 +1,43 @@
+# ========== Batch Vision 설정 (명령행 인자로 덮어쓸 수 있음) ==========
+INPUT_DIR = "input"  # 분석할 영상이 있는 디렉터리
+OUTPUT_PATH = "temp/batch_results.jsonl"  # 영상별 결과 (한 줄에 영상 하나)
+FRAME_INTERVAL_SECONDS = 2
+# ======================================================================
+
+import os
+import argparse
+from dotenv import load_dotenv
+from services.batch_runner import run_batch, DEFAULT_QUESTION, MAX_EXTRACT_WORKERS, MAX_VIDEOS_IN_FLIGHT
+from tools.vision_api import CHUNK_SIZE, MAX_CONCURRENCY
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="디렉터리의 모든 영상을 분석하여 JSONL로 저장합니다.")
+    parser.add_argument("directory", nargs="?", default=INPUT_DIR, help="영상 디렉터리")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH, help="결과 JSONL 경로 (이미 완료된 영상은 건너뜀)")
+    parser.add_argument("-q", "--question", default=DEFAULT_QUESTION, help="모든 영상에 할 질문")
+    parser.add_argument("--interval", type=float, default=FRAME_INTERVAL_SECONDS, help="프레임 추출 간격 (초)")
+    parser.add_argument("--scene-change", action="store_true", help="장면 변화 기반으로 프레임 추출")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="요청 하나에 담을 프레임 수")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="영상 하나당 동시 요청 수")
+    parser.add_argument("--workers", type=int, default=MAX_EXTRACT_WORKERS, help="프레임 추출 프로세스 수")
+    parser.add_argument("--in-flight", type=int, default=MAX_VIDEOS_IN_FLIGHT, help="동시에 처리할 영상 수")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    run_batch(
+        args.directory, args.output,
+        question=args.question,
+        frame_interval=args.interval,
+        scene_change=args.scene_change,
+        chunk_size=args.chunk_size,
+        max_concurrency=args.concurrency,
+        max_workers=args.workers,
+        max_in_flight=args.in_flight,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 import json
 import os
-from agents.weather_agent import client, weather_tool
-from agents.schedule_agent import schedule_tool
-from tools.weather_api import get_weather
-from tools.schedule_api import manage_schedule
-from tools.video_processor import extract_frames
-from tools.vision_api import analyze_frames
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from services.openai_client import get_client
+from services.tool_registry import tool_schemas, run_tool_calls
+from services.intent_router import route
+import agents  # noqa: F401  (registers every agent's tools)
+from tools.video_processor import extract_frames, iter_frames, iter_keyframes
+from tools.vision_api import (
+    analyze_frames, analyze_frames_concurrent, analyze_frames_stream,
+)
+from tools.vision_session import VisionSession
+from tools import vision_cache
 
 SYSTEM_PROMPT = """
 You are an AI assistant that helps with everyday tasks.
@@ -13,11 +20,12 @@ Always respond in natural English.
 
 You have access to the following tools:
 - Weather tool: Call only when the user asks about the weather or conditions of a specific city.
-- Schedule tool: Call only when the user wants to add a schedule or check today's schedule.
+- Schedule tool: Call only when the user wants to add a (recurring) schedule, check their schedule for a day or period, or find free time.
+- Video tool: Call only when the user asks to describe a specific video file.
 
 Rules:
 1. Do NOT call any tool unless the user intent clearly matches a tool.
-2. If the user's request is not about weather or scheduling, answer normally without calling any tool.
+2. If the user's request is not about weather, scheduling or a video file, answer normally without calling any tool.
 
 If the user refers to a date or time using natural expressions such as
 "today", "tomorrow", "this evening", "at 7 PM", etc.,
@@ -27,73 +35,190 @@ Pass the expression exactly as the user said it to the schedule tool.
 The backend will normalize it.
 
 """
+MAX_STREAM_WORKERS = 8  # 동시에 진행할 수 있는 비동기 요청 수
 
-def ask_agent(question: str):
+_stream_executor = ThreadPoolExecutor(max_workers=MAX_STREAM_WORKERS, thread_name_prefix="stream")
 
-    # 1st call to determine intent & possible tool usage
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[
+
+def _timed_stream(label: str, chunks):
+    """
+    텍스트 조각을 그대로 전달하면서 첫 토큰까지의 시간(TTFT)과 전체 시간을 기록합니다.
+    """
+    start = time.perf_counter()
+    first_token = None
+
+    for chunk in chunks:
+        if first_token is None and chunk:
+            first_token = time.perf_counter() - start
+        yield chunk
+
+    total = time.perf_counter() - start
+    ttft = f"{first_token:.2f}초" if first_token is not None else "-"
+    print(f"\n[Timing] {label} 첫 토큰: {ttft}, 전체: {total:.2f}초")
+
+
+def _content_deltas(stream):
+    """스트리밍 응답에서 텍스트 조각만 꺼냅니다."""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def ask_agent_stream(question: str, conversation=None):
+    """
+    ask_agent()와 같지만 답변을 생성되는 대로 조각(str)으로 반환합니다.
+
+    도구 호출이 필요 없는 질문은 첫 번째 호출의 텍스트가 바로 전달되고,
+    도구를 호출한 경우에는 도구 결과를 받은 최종 답변이 스트리밍됩니다.
+
+    conversation (ConversationState)을 넘기면 이전 대화를 함께 보내고,
+    답변이 끝나면 이번 턴을 기록합니다.
+    """
+    return _timed_stream("ask_agent", _remember(conversation, question, _ask_agent_stream(question, conversation)))
+
+
+def _remember(conversation, question: str, chunks):
+    """답변 조각을 그대로 전달하고, 끝까지 받은 답변을 대화 기록에 추가합니다."""
+    if conversation is None:
+        yield from chunks
+        return
+
+    answer = []
+    for chunk in chunks:
+        answer.append(chunk)
+        yield chunk
+    conversation.add_turn(question, "".join(answer))
+
+
+def _ask_agent_stream(question: str, conversation=None):
+
+    client = get_client()
+    if conversation is not None:
+        messages = conversation.messages(SYSTEM_PROMPT, question)
+    else:
+        messages = [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": question}
-        ],
-        tools=[weather_tool, schedule_tool],
+        ]
+
+    # Obvious weather/schedule requests go straight to the tool, skipping the 1st call
+    intent = route(question)
+    if intent and intent["tool"]:
+        print(f"[Router] {intent['intent']} -> {intent['tool']}({intent['args']})")
+        calls = [{
+            "id": "call_router_0",
+            "name": intent["tool"],
+            "arguments": json.dumps(intent["args"], ensure_ascii=False),
+        }]
+        yield from _answer_with_tools(client, messages, calls)
+        return
+
+    # 1st call to determine intent & possible tool usage
+    stream = client.chat.completions.create(
+        model="gpt-4.1-mini",
+        messages=messages,
+        tools=tool_schemas(),
+        stream=True,
+    )
+
+    # Text is forwarded as it arrives; tool call fragments are assembled by index
+    tool_calls = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            yield delta.content
+
+        for fragment in delta.tool_calls or []:
+            call = tool_calls.setdefault(fragment.index, {"id": None, "name": "", "arguments": ""})
+            if fragment.id:
+                call["id"] = fragment.id
+            if fragment.function:
+                call["name"] += fragment.function.name or ""
+                call["arguments"] += fragment.function.arguments or ""
+
+    # If no tool call, the reply has already been streamed
+    if not tool_calls:
+        return
+
+    calls = [tool_calls[index] for index in sorted(tool_calls)]
+    yield from _answer_with_tools(client, messages, calls)
+
+
+def _answer_with_tools(client, messages, calls):
+    """Run the tool calls and stream the model's answer to their results."""
+
+    # Run every requested tool at once and answer them all in a single follow-up call
+    results = run_tool_calls(calls)
+
+    assistant_msg = {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{
+            "id": call["id"],
+            "type": "function",
+            "function": {"name": call["name"], "arguments": call["arguments"]},
+        } for call in calls],
+    }
+    tool_msgs = [{
+        "role": "tool",
+        "content": json.dumps(result, ensure_ascii=False),
+        "tool_call_id": call["id"]
+    } for call, result in zip(calls, results)]
+
+    final_stream = client.chat.completions.create(
+        model="gpt-4.1-mini",
+        messages=messages + [assistant_msg] + tool_msgs,
+        stream=True,
     )
+    yield from _content_deltas(final_stream)
+
+
+def ask_agent(question: str, conversation=None):
+    """Answer a general question, calling the weather or schedule tool when needed."""
+    return "".join(ask_agent_stream(question, conversation))
+
+
+def _print_vision_header(question: str, video_path: str, frame_interval: int, scene_change: bool):
+    print(f"\n{'='*60}")
+    print(f"[Vision Agent] 영상 분석 시작")
+    print(f"- 영상 경로: {video_path}")
+    print(f"- 프레임 간격: {'장면 변화 기반' if scene_change else f'{frame_interval}초'}")
+    print(f"- 질문: {question}")
+    print(f"{'='*60}\n")
+
+
+def _iter_video_frames(video_path: str, frame_interval: int, scene_change: bool):
+    """영상에서 프레임 추출 (디코딩되는 대로 바로 인코딩되도록 이터레이터로 반환)"""
+    if scene_change:
+        return iter_keyframes(video_path)
+    return iter_frames(video_path, frame_interval)
+
+
+def _save_explanation(description: str):
+    """결과 저장 (설명은 temp 폴더에 보관)"""
+    stats = vision_cache.get_stats()
+    print(f"[Vision Cache] hit: {stats['hits']}, miss: {stats['misses']}, evicted: {stats['evictions']}")
+    
+    os.makedirs("temp", exist_ok=True)
+    explanation_path = os.path.join("temp", "explanation.txt")
+    with open(explanation_path, "w", encoding="utf-8") as f:
+        f.write(description or "")
+    print(f"\n[Vision Agent] 설명을 저장했습니다: {explanation_path}\n")
+
 
-    msg = response.choices[0].message
-
-    # Check if tool is requested
-    if msg.tool_calls:
-
-        tool_call = msg.tool_calls[0]
-        tool_name = tool_call.function.name
-        args = json.loads(tool_call.function.arguments)
-
-        # --- Weather Tool ---
-        if tool_name == "get_weather":
-            city = args["city"]
-            weather = get_weather(city)
-
-            final_response = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": question},
-                    msg,
-                    {
-                        "role": "tool",
-                        "content": json.dumps(weather, ensure_ascii=False),
-                        "tool_call_id": tool_call.id
-                    },
-                ]
-            )
-            return final_response.choices[0].message.content
-
-        # --- Schedule Tool ---
-        elif tool_name == "manage_schedule":
-            schedule_result = manage_schedule(**args)
-
-            final_response = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": question},
-                    msg,
-                    {
-                        "role": "tool",
-                        "content": json.dumps(schedule_result, ensure_ascii=False),
-                        "tool_call_id": tool_call.id
-                    },
-                ]
-            )
-            return final_response.choices[0].message.content
-
-    # If no tool call, reply directly
-    return msg.content
-
-
-
-def ask_vision(question: str, video_path: str, frame_interval: int = 2):
+def _vision_error_message(e: Exception):
+    if isinstance(e, FileNotFoundError):
+        return f"오류: {str(e)}\n\n영상 파일을 'input/' 폴더에 넣어주세요."
+    if isinstance(e, ValueError):
+        return f"오류: {str(e)}\n\n영상 파일이 손상되었거나 지원하지 않는 형식입니다."
+    return f"영상 분석 중 오류가 발생했습니다: {str(e)}"
+
+
+def ask_vision(question: str, video_path: str, frame_interval: int = 2, chunk_size: int = None,
+               scene_change: bool = False):
     """
     영상을 분석하여 시간대별 장면을 묘사합니다.
     
@@ -101,42 +226,99 @@ def ask_vision(question: str, video_path: str, frame_interval: int = 2):
         question (str): 사용자 질문
         video_path (str): 분석할 영상 파일 경로
         frame_interval (int): 프레임 추출 간격 (초)
+        chunk_size (int): 지정하면 chunk_size개 프레임씩 나누어 병렬로 분석
+        scene_change (bool): True면 고정 간격 대신 장면이 바뀔 때만 프레임 추출
         
     Returns:
         str: 시간대별 장면 묘사
     """
     
+    if not chunk_size:
+        return "".join(ask_vision_stream(question, video_path, frame_interval, scene_change))
+    
     try:
-        print(f"\n{'='*60}")
-        print(f"[Vision Agent] 영상 분석 시작")
-        print(f"- 영상 경로: {video_path}")
-        print(f"- 프레임 간격: {frame_interval}초")
-        print(f"- 질문: {question}")
-        print(f"{'='*60}\n")
+        _print_vision_header(question, video_path, frame_interval, scene_change)
         
         # 1. 영상에서 프레임 추출
-        frames_info = extract_frames(video_path, frame_interval)
+        frames_info = _iter_video_frames(video_path, frame_interval, scene_change)
         
-        if not frames_info:
-            return "영상에서 프레임을 추출할 수 없습니다."
+        # 2. Vision API로 구간별 병렬 분석
+        description = analyze_frames_concurrent(frames_info, question, chunk_size=chunk_size)
         
-        # 2. Vision API로 프레임 분석
-        description = analyze_frames(frames_info, question)
-        
-        # 3. 결과 저장 (프레임과 설명 모두 temp 폴더에 보관)
-        os.makedirs("temp", exist_ok=True)
-        explanation_path = os.path.join("temp", "explanation.txt")
-        with open(explanation_path, "w", encoding="utf-8") as f:
-            f.write(description or "")
-        print(f"\n[Vision Agent] 설명을 저장했습니다: {explanation_path}\n")
+        # 3. 결과 저장
+        _save_explanation(description)
         
         return description
         
-    except FileNotFoundError as e:
-        return f"오류: {str(e)}\n\n영상 파일을 'input/' 폴더에 넣어주세요."
+    except Exception as e:
+        return _vision_error_message(e)
+
+
+def ask_vision_stream(question: str, video_path: str, frame_interval: int = 2,
+                      scene_change: bool = False):
+    """
+    ask_vision()과 같지만 장면 묘사를 생성되는 대로 조각(str)으로 반환합니다.
     
-    except ValueError as e:
-        return f"오류: {str(e)}\n\n영상 파일이 손상되었거나 지원하지 않는 형식입니다."
+    Yields:
+        str: 시간대별 장면 묘사 텍스트 조각
+    """
+    return _timed_stream("ask_vision", _ask_vision_stream(question, video_path, frame_interval, scene_change))
+
+
+def _ask_vision_stream(question: str, video_path: str, frame_interval: int, scene_change: bool):
+    parts = []
+    
+    try:
+        _print_vision_header(question, video_path, frame_interval, scene_change)
+        
+        # 1. 영상에서 프레임 추출
+        frames_info = _iter_video_frames(video_path, frame_interval, scene_change)
+        
+        # 2. Vision API로 프레임 분석
+        for chunk in analyze_frames_stream(frames_info, question):
+            parts.append(chunk)
+            yield chunk
+        
+    except Exception as e:
+        yield _vision_error_message(e)
+        return
+    
+    # 3. 결과 저장
+    _save_explanation("".join(parts))
+
+
+def ask_vision_live(question: str, source, seconds: float = 10, frame_interval: float = 2,
+                    chunk_size: int = None):
+    """
+    로봇 카메라 UDP 스트림의 최근 N초를 분석하여 장면을 묘사합니다.
+    
+    Args:
+        question (str): 사용자 질문
+        source (UdpFrameSource): 수신 중인 카메라 스트림
+        seconds (float): 분석할 최근 구간 길이 (초)
+        frame_interval (float): 프레임 선택 간격 (초)
+        chunk_size (int): 지정하면 chunk_size개 프레임씩 나누어 병렬로 분석
+        
+    Returns:
+        str: 시간대별 장면 묘사
+    """
+    
+    try:
+        print(f"\n{'='*60}")
+        print(f"[Vision Agent] 실시간 영상 분석 시작")
+        print(f"- 소스: UDP {source.host}:{source.port}")
+        print(f"- 최근 {seconds}초, 프레임 간격: {frame_interval}초")
+        print(f"- 질문: {question}")
+        print(f"{'='*60}\n")
+        
+        frames_info = source.recent_frames(seconds, frame_interval)
+        
+        if not frames_info:
+            return "아직 로봇 카메라에서 받은 영상이 없습니다."
+        
+        if chunk_size:
+            return analyze_frames_concurrent(frames_info, question, chunk_size=chunk_size)
+        return analyze_frames(frames_info, question)
     
     except Exception as e:
         return f"영상 분석 중 오류가 발생했습니다: {str(e)}"
@@ -165,37 +347,23 @@ def ask_vision_interactive(video_path: str, frame_interval: int = 2):
             print("영상에서 프레임을 추출할 수 없습니다.")
             return
         
-        # 2. 전체 기본 설명 생성
+        # 2. 프레임별 기본 설명 생성 (프레임 번호로 색인)
         print("[기본 설명 생성 중...]")
-        basic_descriptions = analyze_frames(frames_info, "지금 뭐가 보여?")
+        session = VisionSession(frames_info)
+        session.describe()
         
         # 3. 결과 저장
+        basic_descriptions = "\n\n".join(
+            f"[{frame['timestamp']}]\n{session.description(i) or ''}".strip()
+            for i, frame in enumerate(session.frames)
+        )
         os.makedirs("temp", exist_ok=True)
         explanation_path = os.path.join("temp", "explanation.txt")
         with open(explanation_path, "w", encoding="utf-8") as f:
-            f.write(basic_descriptions or "")
+            f.write(basic_descriptions)
         print(f"[설명 저장 완료: {explanation_path}]\n")
         
-        # 4. 기본 설명을 프레임별로 분리
-        descriptions_by_frame = {}
-        current_timestamp = None
-        current_desc = []
-        
-        for line in basic_descriptions.split('\n'):
-            # [0-2초] 형식의 타임스탬프 찾기
-            if line.strip().startswith('[') and '초]' in line:
-                if current_timestamp:
-                    descriptions_by_frame[current_timestamp] = '\n'.join(current_desc).strip()
-                current_timestamp = line.strip()
-                current_desc = []
-            elif current_timestamp:
-                current_desc.append(line)
-        
-        # 마지막 프레임 저장
-        if current_timestamp:
-            descriptions_by_frame[current_timestamp] = '\n'.join(current_desc).strip()
-        
-        # 5. 각 프레임마다 대화형 루프
+        # 4. 각 프레임마다 대화형 루프
         print(f"\n{'='*60}")
         print("대화형 모드 시작!")
         print("- 각 프레임에서 질문할 수 있습니다")
@@ -203,15 +371,10 @@ def ask_vision_interactive(video_path: str, frame_interval: int = 2):
         print("- 'quit' 입력시 종료")
         print(f"{'='*60}\n")
         
-        for frame in frames_info:
-            timestamp = f"[{frame['timestamp']}]"
-            
+        for index, frame in enumerate(session.frames):
             # 기본 설명 출력
-            print(f"\n{timestamp}")
-            if timestamp in descriptions_by_frame:
-                print(descriptions_by_frame[timestamp])
-            else:
-                print("(기본 설명 없음)")
+            print(f"\n[{frame['timestamp']}]")
+            print(session.description(index) or "(기본 설명 없음)")
             
             # 질문 루프
             while True:
@@ -226,10 +389,12 @@ def ask_vision_interactive(video_path: str, frame_interval: int = 2):
                     print("\n대화형 모드를 종료합니다.")
                     return
                 
-                # 질문에 답변
-                from tools.vision_api import analyze_single_frame
-                answer = analyze_single_frame(frame, question)
-                print(f"Answer: {answer}")
+                # 질문에 답변 (생성되는 대로 출력, 인코딩된 이미지와 기본 설명/이전 질문 재사용)
+                print("Answer: ", end="", flush=True)
+                answer_stream = _timed_stream("follow-up", session.ask_stream(index, question))
+                for chunk in answer_stream:
+                    print(chunk, end="", flush=True)
+                print()
         
         print(f"\n{'='*60}")
         print("모든 프레임 분석 완료!")
@@ -243,3 +408,64 @@ def ask_vision_interactive(video_path: str, frame_interval: int = 2):
     
     except Exception as e:
         print(f"영상 분석 중 오류가 발생했습니다: {str(e)}")
+
+
+async def _astream(chunks):
+    """
+    동기 제너레이터를 작업 스레드에서 한 조각씩 꺼내는 비동기 제너레이터로 바꿉니다.
+
+    태스크가 취소되면 진행 중인 조각이 끝나는 즉시 원래 제너레이터를 close()하므로
+    프레임 추출과 API 스트림이 다음 조각 경계에서 멈춥니다.
+    """
+    done = object()
+    pending = None
+    try:
+        while True:
+            pending = _stream_executor.submit(next, chunks, done)
+            chunk = await asyncio.wrap_future(pending)
+            pending = None
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        if pending is None or pending.cancel():
+            chunks.close()
+        else:
+            # 실행 중인 제너레이터는 다른 스레드에서 닫을 수 없으므로 이번 조각이 끝난 뒤 닫음
+            pending.add_done_callback(lambda _: chunks.close())
+
+
+def ask_agent_astream(question: str, conversation=None):
+    """ask_agent_stream()의 비동기 버전. 다른 요청과 동시에 진행할 수 있습니다."""
+    return _astream(ask_agent_stream(question, conversation))
+
+
+def ask_vision_astream(question: str, video_path: str, frame_interval: int = 2,
+                       scene_change: bool = False):
+    """ask_vision_stream()의 비동기 버전. 태스크를 취소하면 분석이 중단됩니다."""
+    return _astream(ask_vision_stream(question, video_path, frame_interval, scene_change))
+
+
+async def ask_vision_async(question: str, video_path: str, frame_interval: int = 2,
+                           chunk_size: int = None, scene_change: bool = False):
+    """
+    ask_vision()의 비동기 버전.
+
+    chunk_size를 지정한 병렬 분석은 한 번에 실행되므로, 취소하면 결과만 버려지고
+    이미 보낸 요청은 끝까지 진행됩니다.
+    """
+    if not chunk_size:
+        return "".join([chunk async for chunk in ask_vision_astream(question, video_path, frame_interval, scene_change)])
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _stream_executor, ask_vision, question, video_path, frame_interval, chunk_size, scene_change
+    )
+
+
+async def ask_vision_live_async(question: str, source, seconds: float = 10, frame_interval: float = 2,
+                                chunk_size: int = None):
+    """ask_vision_live()의 비동기 버전. 취소하면 결과만 버려집니다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _stream_executor, ask_vision_live, question, source, seconds, frame_interval, chunk_size
+    )
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from services.openai_client import create_async_client
+from tools.video_processor import extract_frames, extract_keyframes
+from tools.vision_api import analyze_frames_concurrent_async, CHUNK_SIZE, MAX_CONCURRENCY
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+DEFAULT_QUESTION = "영상에서 어떤 일이 일어나는지 시간 순서대로 설명해줘."
+MAX_EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 프레임 디코딩은 CPU를 쓰므로 프로세스로 분산
+MAX_VIDEOS_IN_FLIGHT = 8  # 추출이 끝나 분석을 기다리는 영상까지 포함한 동시 처리 수 (메모리 상한)
+
+
+def find_videos(directory):
+    """디렉터리(하위 폴더 포함)의 영상 파일 경로를 정렬하여 반환합니다."""
+    videos = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, name))
+    return sorted(videos)
+
+
+def load_completed(output_path):
+    """
+    결과 JSONL에서 이미 성공한 영상 경로를 읽습니다.
+
+    중단 시점에 마지막 줄이 잘려 있을 수 있으므로 해석할 수 없는 줄은 건너뜁니다.
+    오류로 끝난 영상은 다시 처리합니다.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["video_path"])
+    return completed
+
+
+def _end_partial_line(output_path):
+    """중단으로 잘린 마지막 줄 뒤에 새 결과가 이어 붙지 않도록 줄을 끝냅니다."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def _append_record(output_path, record):
+    """결과 한 줄을 추가하고 디스크에 기록될 때까지 기다립니다. (중단되어도 완료분은 보존)"""
+    with open(output_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _extract(video_path, frame_interval, scene_change):
+    """작업 프로세스에서 실행되는 프레임 추출 (결과는 피클로 부모 프로세스에 전달)"""
+    start = time.perf_counter()
+    if scene_change:
+        frames = extract_keyframes(video_path)
+    else:
+        frames = extract_frames(video_path, frame_interval)
+    return frames, time.perf_counter() - start
+
+
+async def _process_video(video_path, pool, limit, async_client, options, output_path, stats):
+    loop = asyncio.get_running_loop()
+    record = {"video_path": video_path}
+
+    async with limit:
+        try:
+            # 1. 프레임 추출 (프로세스 풀)
+            frames, extract_seconds = await loop.run_in_executor(
+                pool, _extract, video_path, options["frame_interval"], options["scene_change"]
+            )
+            record["frames"] = len(frames)
+            record["extract_seconds"] = round(extract_seconds, 2)
+
+            # 2. 구간별 병렬 분석 (비동기 I/O)
+            start = time.perf_counter()
+            description, errors = await analyze_frames_concurrent_async(
+                frames, options["question"],
+                chunk_size=options["chunk_size"],
+                max_concurrency=options["max_concurrency"],
+                async_client=async_client,
+                with_errors=True,
+            )
+            record["analyze_seconds"] = round(time.perf_counter() - start, 2)
+            record["description"] = description
+
+            # 구간 중 하나라도 실패하면 다음 실행에서 다시 처리
+            record["status"] = "error" if errors else "ok"
+            if errors:
+                record["error"] = f"{len(errors)}개 구간 분석 실패"
+
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+
+    record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    _append_record(output_path, record)
+
+    stats[record["status"]] += 1
+    done = stats["ok"] + stats["error"]
+    minutes = (time.perf_counter() - stats["start"]) / 60
+    print(f"[Batch] ({done}/{stats['total']}) {record['status']}: {video_path} "
+          f"- {done / minutes:.1f} videos/min")
+
+
+async def run_batch_async(directory, output_path, question=DEFAULT_QUESTION, frame_interval=2,
+                          scene_change=False, chunk_size=CHUNK_SIZE, max_concurrency=MAX_CONCURRENCY,
+                          max_workers=MAX_EXTRACT_WORKERS, max_in_flight=MAX_VIDEOS_IN_FLIGHT,
+                          async_client=None):
+    """
+    디렉터리의 모든 영상을 분석하여 영상마다 한 줄씩 JSONL로 기록합니다.
+
+    프레임 추출은 프로세스 풀에서, Vision API 호출은 이벤트 루프에서 동시에 진행됩니다.
+    output_path에 이미 성공으로 기록된 영상은 건너뛰므로 중단 후 다시 실행하면 이어서 처리합니다.
+
+    Args:
+        directory (str): 영상이 있는 디렉터리
+        output_path (str): 결과 JSONL 경로
+        question (str): 모든 영상에 공통으로 할 질문
+        frame_interval (int): 프레임 추출 간격 (초)
+        scene_change (bool): True면 장면 변화 기반으로 추출
+        chunk_size (int): 요청 하나에 담을 프레임 수
+        max_concurrency (int): 영상 하나당 동시에 보낼 최대 요청 수
+        max_workers (int): 프레임 추출 프로세스 수
+        max_in_flight (int): 동시에 처리할 최대 영상 수
+        async_client (AsyncOpenAI | None): 사용할 클라이언트 (테스트용 가짜 클라이언트 등).
+            없으면 create_async_client()로 만들고 끝나면 닫습니다.
+
+    Returns:
+        dict: {"total", "skipped", "ok", "error", "seconds", "videos_per_minute"}
+    """
+    videos = find_videos(directory)
+    completed = load_completed(output_path)
+    _end_partial_line(output_path)
+    pending = [path for path in videos if path not in completed]
+
+    print(f"[Batch] 영상 {len(videos)}개 중 {len(videos) - len(pending)}개는 이미 완료, {len(pending)}개 처리 시작")
+
+    stats = {"total": len(pending), "ok": 0, "error": 0, "start": time.perf_counter()}
+    options = {
+        "question": question, "frame_interval": frame_interval, "scene_change": scene_change,
+        "chunk_size": chunk_size, "max_concurrency": max_concurrency,
+    }
+
+    if pending:
+        # 재시도는 vision_api에서 직접 처리하므로 SDK 자체 재시도는 끕니다.
+        owns_client = async_client is None
+        if owns_client:
+            async_client = create_async_client(max_retries=0)
+
+        limit = asyncio.Semaphore(max_in_flight)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                await asyncio.gather(*(
+                    _process_video(path, pool, limit, async_client, options, output_path, stats)
+                    for path in pending
+                ))
+        finally:
+            if owns_client:
+                await async_client.close()
+
+    seconds = time.perf_counter() - stats["start"]
+    processed = stats["ok"] + stats["error"]
+    summary = {
+        "total": len(videos),
+        "skipped": len(videos) - len(pending),
+        "ok": stats["ok"],
+        "error": stats["error"],
+        "seconds": round(seconds, 2),
+        "videos_per_minute": round(processed / (seconds / 60), 2) if processed and seconds else 0.0,
+    }
+    print(f"[Batch] 완료: 성공 {summary['ok']}, 실패 {summary['error']}, 건너뜀 {summary['skipped']}, "
+          f"{summary['seconds']}초 ({summary['videos_per_minute']} videos/min)")
+    return summary
+
+
+def run_batch(directory, output_path, **kwargs):
+    """run_batch_async()의 동기 버전입니다."""
+    return asyncio.run(run_batch_async(directory, output_path, **kwargs))
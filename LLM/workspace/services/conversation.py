@@ -0,0 +1,177 @@
+"""
+Conversation memory for the chat loop.
+
+Recent turns are kept verbatim within a token budget. When the budget is
+exceeded, the oldest turns are folded into a rolling summary, down to a
+low-water mark so the summary changes only every few turns. Messages are
+always ordered system prompt -> summary -> turns -> new question, so the
+long, unchanging system prompt stays a cacheable prefix for the provider.
+"""
+
+import os
+import threading
+from collections import deque
+
+from services.openai_client import get_client
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKENS", "3000"))  # verbatim turns
+SUMMARY_TOKEN_BUDGET = int(os.getenv("CHAT_SUMMARY_TOKENS", "400"))
+LOW_WATER_RATIO = 0.6  # after summarising, keep turns up to this share of the budget
+SUMMARY_MODEL = "gpt-4.1-mini"
+
+SUMMARY_PROMPT = """
+Update the running summary of a conversation between a user and an assistant.
+Keep facts the user may refer back to: names, cities, dates, times, events and decisions.
+Drop greetings and small talk. Answer with the updated summary only, in at most {words} words.
+"""
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken encoding if installed (pip install tiktoken), otherwise False."""
+    global _encoding
+
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoding = False
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text; about 4 characters per token when tiktoken is not installed."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _message_tokens(message: dict) -> int:
+    return count_tokens(message["content"]) + 4  # role and message framing
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the end of text (the most recent part) within max_tokens."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text)[-max_tokens:])
+    return text[-max_tokens * 4:]
+
+
+def llm_summarize(summary: str, messages, max_tokens: int) -> str:
+    """Fold messages into summary with one model call."""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = get_client().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT.format(words=max_tokens * 3 // 4)},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"},
+        ],
+        max_tokens=max_tokens,
+    )
+    return response.choices[0].message.content or summary
+
+
+class ConversationState:
+    """
+    Prior turns of one chat session, bounded by CONTEXT_TOKEN_BUDGET
+    (verbatim turns) plus SUMMARY_TOKEN_BUDGET (rolling summary).
+    """
+
+    def __init__(self, max_tokens=CONTEXT_TOKEN_BUDGET, summary_tokens=SUMMARY_TOKEN_BUDGET,
+                 summarize=llm_summarize):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.summarize = summarize
+
+        self.summary = ""
+        self._turns = deque()  # (user message, assistant message, tokens)
+        self._tokens = 0
+        self.summarized_turns = 0
+
+    @property
+    def token_count(self):
+        """Tokens of the verbatim turns plus the summary."""
+        return self._tokens + count_tokens(self.summary)
+
+    def __len__(self):
+        return len(self._turns)
+
+    def messages(self, system_prompt: str, question: str):
+        """Messages for the next request: system prompt, summary, prior turns, then the question."""
+        messages = [{"role": "system", "content": system_prompt}]
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        for user_msg, assistant_msg, _ in self._turns:
+            messages += [user_msg, assistant_msg]
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def add_turn(self, question: str, answer: str):
+        """Record a finished turn, summarising old turns once the budget is exceeded."""
+        user_msg = {"role": "user", "content": question}
+        assistant_msg = {"role": "assistant", "content": answer or ""}
+        tokens = _message_tokens(user_msg) + _message_tokens(assistant_msg)
+
+        self._turns.append((user_msg, assistant_msg, tokens))
+        self._tokens += tokens
+
+        if self._tokens > self.max_tokens:
+            self._compact()
+
+    def _compact(self):
+        # Evict down to the low-water mark (always keeping the latest turn) so the
+        # summary, and with it the cached prefix, changes only every few turns
+        target = self.max_tokens * LOW_WATER_RATIO
+        evicted = []
+        while len(self._turns) > 1 and self._tokens > target:
+            user_msg, assistant_msg, tokens = self._turns.popleft()
+            evicted += [user_msg, assistant_msg]
+            self._tokens -= tokens
+
+        if not evicted:
+            return
+
+        try:
+            summary = self.summarize(self.summary, evicted, self.summary_tokens)
+        except Exception as e:
+            print(f"[Conversation] 요약 실패, 이전 대화를 잘라서 보관합니다: {e}")
+            summary = self.summary + "\n" + "\n".join(f"{m['role']}: {m['content']}" for m in evicted)
+
+        self.summary = _truncate_tokens(summary.strip(), self.summary_tokens)
+        self.summarized_turns += len(evicted) // 2
+
+    def clear(self):
+        self.summary = ""
+        self._turns.clear()
+        self._tokens = 0
+        self.summarized_turns = 0
+
+
+if __name__ == "__main__":
+    # Memory must stay bounded however long the chat runs (no model calls here)
+    def keep_recent(summary, messages, max_tokens):
+        return summary + " " + " ".join(m["content"] for m in messages)
+
+    state = ConversationState(max_tokens=1000, summary_tokens=200, summarize=keep_recent)
+    prefixes = set()
+    peak = 0
+    for i in range(5000):
+        state.add_turn(f"question {i}: what about day {i}?", f"answer {i} " + "detail " * (i % 40))
+        peak = max(peak, state.token_count)
+        prefixes.add(state.summary)
+        assert state.token_count <= 1000 + 200, state.token_count
+
+    print(f"[Conversation] 5000턴 후: 보관 {len(state)}턴, {state.token_count} 토큰 (최대 {peak}), "
+          f"요약된 턴 {state.summarized_turns}, 요약 변경 {len(prefixes) - 1}회")
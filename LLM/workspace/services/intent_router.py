@@ -0,0 +1,240 @@
+"""
+Local intent router: decides obvious weather / schedule / vision requests
+without a model call.
+
+Each intent has weighted keyword patterns (compiled once at import). A
+message is routed only when exactly one intent scores at least
+ROUTE_THRESHOLD and the tool arguments can be extracted from the text;
+everything else returns None and goes to the LLM as before.
+"""
+
+import re
+import time
+from datetime import timedelta
+
+from tools.schedule_normalizer import find_date, find_time
+
+ROUTE_THRESHOLD = 3
+
+INTENT_PATTERNS = {
+    "weather": [
+        (r"\bweather\b|날씨", 3),
+        (r"\b(temperature|forecast)\b|기온", 3),
+        (r"\bhumidity\b|습도", 2),
+        (r"\b(rain(ing|y)?|snow(ing|y)?|sunny|windy)\b|비\s*(와|오|올)|눈\s*(와|오|올)|더워|추워", 1),
+    ],
+    "schedule": [
+        (r"\b(schedule|calendar|agenda)\b|일정|스케줄", 3),
+        (r"\b(am i|are we) (free|busy|available)\b|시간\s*(있|괜찮|돼|되|비)|한가", 3),
+        (r"\b(meeting|appointment|plans?)\b|회의|미팅|약속", 1),
+    ],
+    "vision": [
+        (r"\bvideo\b|영상", 3),
+        (r"what (do|can) you see|describe the (scene|video|frame)|on the (screen|camera)", 3),
+        (r"카메라|화면", 2),
+        (r"뭐가 보|무엇이 보|보이는 (게|것)", 2),
+        (r"\b(scene|frame|camera)\b", 1),
+    ],
+}
+
+# Schedule requests that change the calendar: the model has to pull out the event description
+SCHEDULE_WRITE_RE = re.compile(
+    r"\b(add|book|set up|put|remind|create|every|cancel\w*|delete|remove|move|reschedule|postpone|clear)\b"
+    r"|추가|등록|잡아|넣어|예약|매일|매주|매달|취소|삭제|지워|빼|옮겨|변경|바꿔|미뤄|당겨"
+)
+SCHEDULE_FREE_RE = re.compile(r"\b(free|busy|available)\b|시간\s*(있|괜찮|돼|되|비)|한가|비어")
+WEEK_RE = re.compile(r"\b(this|next|last) week\b|(이번|다음|지난|다다음)\s*주(?!\s*[월화수목금토일]요일)")
+
+# OpenWeatherMap needs a city name it knows; Korean names are mapped for the common cities
+KOREAN_CITIES = {
+    "서울": "Seoul", "부산": "Busan", "인천": "Incheon", "대구": "Daegu", "대전": "Daejeon",
+    "광주": "Gwangju", "울산": "Ulsan", "수원": "Suwon", "세종": "Sejong", "제주": "Jeju",
+    "도쿄": "Tokyo", "뉴욕": "New York", "런던": "London", "파리": "Paris",
+}
+# A capitalised name, or several joined by and/or/vs/commas ("Seoul and Busan")
+_CITY_NAME = r"[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*"
+_CITY_LIST = rf"{_CITY_NAME}(?:\s*(?:,|&|\band\b|\bor\b|\bvs\b\.?|\bversus\b)\s*{_CITY_NAME})*"
+CITY_EN_RE = re.compile(rf"\b(?:in|for|at)\s+({_CITY_LIST})")
+CITY_EN_BEFORE_RE = re.compile(rf"\b({_CITY_LIST})(?:'s)?\s+weather\b")
+CITY_SPLIT_RE = re.compile(r"\s*(?:,|&|\band\b|\bor\b|\bvs\b\.?|\bversus\b)\s*")
+CITY_STOPWORDS = {"What", "How", "Is", "Today", "Tomorrow", "The", "Tell", "Show", "Check"}
+
+_PATTERNS = {
+    intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+    for intent, patterns in INTENT_PATTERNS.items()
+}
+
+
+def score(text: str):
+    """Keyword score per intent."""
+    return {
+        intent: sum(weight for pattern, weight in patterns if pattern.search(text))
+        for intent, patterns in _PATTERNS.items()
+    }
+
+
+def classify(text: str):
+    """The one intent that clearly matches text, or None when no intent or several do."""
+    scores = score(text)
+    matched = [intent for intent, value in scores.items() if value >= ROUTE_THRESHOLD]
+    if len(matched) != 1:
+        return None
+
+    intent = matched[0]
+    if any(value for other, value in scores.items() if other != intent):
+        return None
+    return intent
+
+
+def _weather_args(text: str):
+    """{"city": ...} when text names exactly one city; several or none are left to the LLM."""
+    cities = [city for korean, city in KOREAN_CITIES.items() if korean in text]
+    for pattern in (CITY_EN_RE, CITY_EN_BEFORE_RE):
+        for match in pattern.finditer(text):
+            for name in CITY_SPLIT_RE.split(match.group(1)):
+                # "Seoul Today" -> "Seoul": stopwords are dropped per word, not per match
+                words = (word[:-2] if word.endswith("'s") else word for word in name.split())
+                name = " ".join(word for word in words if word not in CITY_STOPWORDS)
+                if name:
+                    cities.append(name)
+    cities = list(dict.fromkeys(cities))
+    if len(cities) != 1:
+        return None
+    return {"city": cities[0]}
+
+
+def _schedule_args(text: str):
+    lowered = text.lower()
+    if SCHEDULE_WRITE_RE.search(lowered):
+        return None
+
+    day = find_date(text)
+
+    if SCHEDULE_FREE_RE.search(lowered):
+        args = {"action": "find_free_slots", "date": (day or find_date("today")).isoformat()}
+        clock = find_time(text)
+        if clock:
+            args["time"] = clock
+        return args
+
+    if WEEK_RE.search(lowered) and day is not None:
+        return {"action": "get_range", "date": day.isoformat(),
+                "end_date": (day + timedelta(days=6)).isoformat()}
+
+    if day is None or day == find_date("today"):
+        return {"action": "get_today"}
+
+    return {"action": "get_range", "date": day.isoformat(), "end_date": day.isoformat()}
+
+
+def route(text: str):
+    """
+    Route a message without the LLM.
+
+    Returns:
+        dict | None: {"intent", "tool", "args"}; "tool" is None for vision
+        (answered by ask_vision). None means ask the LLM.
+    """
+    intent = classify(text)
+
+    if intent == "vision":
+        return {"intent": "vision", "tool": None, "args": {}}
+
+    if intent == "weather":
+        args = _weather_args(text)
+        if args:
+            return {"intent": "weather", "tool": "get_weather", "args": args}
+
+    if intent == "schedule":
+        args = _schedule_args(text)
+        if args:
+            return {"intent": "schedule", "tool": "manage_schedule", "args": args}
+
+    return None
+
+
+# Labelled messages: (text, intent route() should return, None = leave to the LLM[, expected args])
+LABELLED_EXAMPLES = [
+    ("What's the weather in Seoul?", "weather"),
+    ("How is the weather in New York right now", "weather"),
+    ("London weather please", "weather"),
+    ("Is it raining in Busan?", None),
+    ("서울 날씨 어때?", "weather"),
+    ("부산의 기온 알려줘", "weather"),
+    ("오늘 날씨 어때?", None),
+    ("What is the weather in Seoul Today?", "weather", {"city": "Seoul"}),
+    ("What's Seoul's weather?", "weather", {"city": "Seoul"}),
+    ("What's the weather in Seoul and Busan?", None),
+    ("서울이랑 부산 날씨", None),
+    ("Seoul vs Tokyo weather", None),
+    ("What's the weather like?", None),
+    ("What's on my schedule today?", "schedule"),
+    ("Show me my calendar for tomorrow", "schedule"),
+    ("What do I have on my schedule this week?", "schedule"),
+    ("Am I free at 3pm Friday?", "schedule"),
+    ("오늘 일정 알려줘", "schedule"),
+    ("다음주 일정 보여줘", "schedule"),
+    ("내일 오후 3시에 시간 있어?", "schedule"),
+    ("Add a meeting with Sam tomorrow at 7 PM to my schedule", None),
+    ("내일 저녁 7시에 저녁 약속 일정 추가해줘", None),
+    ("Remind me about the dentist appointment on Monday", None),
+    ("Delete my schedule for tomorrow", None),
+    ("Cancel the meeting on my calendar", None),
+    ("Remove tomorrow's dentist appointment from my calendar", None),
+    ("Move my 3pm meeting to Friday", None),
+    ("Reschedule today's meeting with Sam", None),
+    ("내일 일정 취소해줘", None),
+    ("오늘 회의 일정 삭제해줘", None),
+    ("금요일 일정을 다음주로 옮겨줘", None),
+    ("Describe the video", "vision"),
+    ("What do you see?", "vision"),
+    ("영상에서 무슨 일이 일어나?", "vision"),
+    ("카메라에 뭐가 보여?", "vision"),
+    ("Describe the scene in the video", "vision"),
+    ("Write a poem about a picture frame", None),
+    ("How do I frame this question better?", None),
+    ("Tell me a joke", None),
+    ("What is the capital of France?", None),
+    ("파이썬에서 리스트 정렬하는 법", None),
+    ("Does the weather affect my schedule tomorrow?", None),
+    ("Play the video of the meeting schedule", None),
+]
+
+
+def evaluate(examples=LABELLED_EXAMPLES):
+    """Accuracy of route() on labelled examples. Returns (accuracy, [(text, expected, got)])."""
+    mistakes = []
+    for text, expected, *args in examples:
+        result = route(text)
+        got = result["intent"] if result else None
+        if args and result and result["args"] != args[0]:
+            expected, got = (expected, args[0]), (got, result["args"])
+        if got != expected:
+            mistakes.append((text, expected, got))
+    return 1 - len(mistakes) / len(examples), mistakes
+
+
+if __name__ == "__main__":
+    import json
+    from services.agent_runner import SYSTEM_PROMPT
+    from services.tool_registry import tool_schemas
+
+    accuracy, mistakes = evaluate()
+    for text, expected, got in mistakes:
+        print(f"[Router] '{text}': 기대 {expected}, 결과 {got}")
+    print(f"[Router] 정확도: {accuracy:.0%} ({len(LABELLED_EXAMPLES) - len(mistakes)}/{len(LABELLED_EXAMPLES)})")
+
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text, *_ in LABELLED_EXAMPLES:
+            route(text)
+    seconds = (time.perf_counter() - start) / (rounds * len(LABELLED_EXAMPLES))
+    print(f"[Router] 1회 평균 {seconds * 1e6:.1f}µs")
+
+    # A routed message skips the first (tool-choosing) call: its system prompt,
+    # tool schemas and the question itself. ~4 characters per token is a rough estimate.
+    routed = sum(1 for text, *_ in LABELLED_EXAMPLES if (route(text) or {}).get("tool"))
+    prompt_chars = len(SYSTEM_PROMPT) + len(json.dumps(tool_schemas()))
+    print(f"[Router] 도구 직접 호출: {routed}/{len(LABELLED_EXAMPLES)}건, "
+          f"건당 첫 LLM 호출 1회(입력 약 {prompt_chars // 4} 토큰) 생략")
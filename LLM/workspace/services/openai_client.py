@@ -0,0 +1,91 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+from openai import (
+    OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient,
+    Timeout, DEFAULT_CONNECTION_LIMITS,
+)
+
+# .env는 이 모듈을 처음 import할 때 한 번만 읽습니다.
+load_dotenv()
+
+# HTTP 연결 풀 설정 (모든 에이전트와 도구가 공유)
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+KEEPALIVE_EXPIRY = 60.0  # 유휴 연결 유지 시간 (초)
+
+# 타임아웃 설정 (초) - Vision 요청은 응답이 길어 읽기 타임아웃을 넉넉히 둡니다.
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 120.0
+WRITE_TIMEOUT = 30.0
+POOL_TIMEOUT = 10.0
+
+_client = None
+_lock = threading.Lock()
+
+
+def _http2_available():
+    """h2 패키지가 설치되어 있으면 HTTP/2를 사용합니다. (pip install httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+HTTP2 = _http2_available()
+
+# openai SDK가 사용하는 httpx 구현의 Limits 클래스 (SDK 버전에 따라 httpx/httpx2)
+Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+def _limits():
+    return Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout():
+    return Timeout(
+        READ_TIMEOUT, connect=CONNECT_TIMEOUT, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT
+    )
+
+
+def get_client():
+    """
+    공유 OpenAI 클라이언트를 반환합니다. 처음 호출할 때만 생성합니다.
+
+    모든 요청이 하나의 연결 풀을 쓰므로 keep-alive 연결이 재사용되어
+    요청마다 TLS 핸드셰이크를 다시 하지 않습니다.
+    """
+    global _client
+
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=DefaultHttpxClient(limits=_limits(), timeout=_timeout(), http2=HTTP2),
+                )
+
+    return _client
+
+
+def create_async_client(**kwargs):
+    """
+    공유 설정(연결 풀, 타임아웃, HTTP/2)으로 AsyncOpenAI 클라이언트를 만듭니다.
+
+    비동기 연결은 이벤트 루프에 묶이므로 루프마다 새로 만들고,
+    사용이 끝나면 호출한 쪽에서 close()해야 합니다.
+
+    Args:
+        **kwargs: AsyncOpenAI에 그대로 전달할 추가 인자 (예: max_retries)
+    """
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout(), http2=HTTP2),
+        **kwargs,
+    )
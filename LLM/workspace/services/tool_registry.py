@@ -0,0 +1,209 @@
+import json
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+MAX_TOOL_WORKERS = 8
+
+
+@dataclass
+class Tool:
+    """A tool the model can call: its OpenAI schema plus how to run it."""
+    name: str
+    schema: dict
+    func: Callable
+    async_func: Optional[Callable] = None
+    cache_ttl: float = 0  # seconds to reuse a result for identical arguments (0 = never)
+    timeout: Optional[float] = None  # seconds before the call is reported as timed out
+
+
+_tools = {}
+_cache = {}  # (name, canonical args) -> (expires_at, result)
+_metrics = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix="tool")
+
+
+def register_tool(schema: dict, func: Callable, async_func: Callable = None,
+                  cache_ttl: float = 0, timeout: float = None) -> Tool:
+    """
+    Register a tool under the function name in its schema.
+
+    schema: OpenAI tool definition ({"type": "function", "function": {...}})
+    func: called with the model's JSON arguments as keyword arguments
+    async_func: optional coroutine function used by call_tool_async()
+    cache_ttl: reuse results for identical arguments for this many seconds
+    timeout: give up waiting after this many seconds
+    """
+    name = schema["function"]["name"]
+    tool = Tool(name, schema, func, async_func, cache_ttl, timeout)
+    _tools[name] = tool
+    return tool
+
+
+def get_tool(name: str) -> Optional[Tool]:
+    return _tools.get(name)
+
+
+def tool_schemas():
+    """Schemas of every registered tool, to pass as `tools=` to the model."""
+    return [tool.schema for tool in _tools.values()]
+
+
+def _parse_arguments(arguments):
+    if isinstance(arguments, dict):
+        return arguments
+    return json.loads(arguments or "{}")
+
+
+def _cache_key(name: str, args: dict):
+    return name, json.dumps(args, sort_keys=True, ensure_ascii=False)
+
+
+def _cached(tool: Tool, key):
+    if not tool.cache_ttl:
+        return None
+    with _lock:
+        entry = _cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry
+    return None
+
+
+def _store(tool: Tool, key, result):
+    # Tools report failures as {"error": ...}; those are never cached
+    if tool.cache_ttl and not (isinstance(result, dict) and "error" in result):
+        with _lock:
+            _cache[key] = (time.monotonic() + tool.cache_ttl, result)
+
+
+def _record(name: str, seconds: float, outcome: str):
+    with _lock:
+        m = _metrics.setdefault(name, {
+            "calls": 0, "errors": 0, "timeouts": 0, "cache_hits": 0,
+            "total_seconds": 0.0, "max_seconds": 0.0,
+        })
+        m["calls"] += 1
+        if outcome == "cache_hit":
+            m["cache_hits"] += 1
+            return
+        if outcome in ("error", "timeout"):
+            m[outcome + "s"] += 1
+        m["total_seconds"] += seconds
+        m["max_seconds"] = max(m["max_seconds"], seconds)
+
+
+def get_metrics():
+    """Per-tool call counts and latency (average excludes cache hits)."""
+    with _lock:
+        metrics = {name: dict(m) for name, m in _metrics.items()}
+    for m in metrics.values():
+        executed = m["calls"] - m["cache_hits"]
+        m["avg_seconds"] = m["total_seconds"] / executed if executed else 0.0
+    return metrics
+
+
+def _invoke(tool: Tool, args: dict):
+    """Run the tool in a worker thread. Returns (result, seconds, outcome) for _finish() to record."""
+    start = time.perf_counter()
+    try:
+        result = tool.func(**args)
+    except Exception as e:
+        return {"error": f"{tool.name} failed: {e}"}, time.perf_counter() - start, "error"
+    return result, time.perf_counter() - start, "ok"
+
+
+def _start(name: str, arguments):
+    """
+    Look up a tool and start running it.
+
+    Returns (tool, cache key, future) for a call in flight,
+    or (tool, None, result) when the result is already known.
+    """
+    tool = _tools.get(name)
+    if tool is None:
+        return None, None, {"error": f"Unknown tool: {name}"}
+
+    try:
+        args = _parse_arguments(arguments)
+    except json.JSONDecodeError as e:
+        return tool, None, {"error": f"Invalid arguments for {name}: {e}"}
+
+    key = _cache_key(name, args)
+    entry = _cached(tool, key)
+    if entry is not None:
+        _record(name, 0.0, "cache_hit")
+        return tool, None, entry[1]
+
+    return tool, key, _executor.submit(_invoke, tool, args)
+
+
+def _finish(tool: Tool, key, future):
+    # A call that times out keeps running in its worker, but its result is dropped
+    try:
+        result, seconds, outcome = future.result(timeout=tool.timeout)
+    except FutureTimeoutError:
+        _record(tool.name, tool.timeout, "timeout")
+        return {"error": f"{tool.name} timed out after {tool.timeout} seconds"}
+    _record(tool.name, seconds, outcome)
+    if outcome == "ok":
+        _store(tool, key, result)
+    return result
+
+
+def call_tool(name: str, arguments):
+    """Run one tool by name. Errors and timeouts are returned as {"error": ...}."""
+    tool, key, pending = _start(name, arguments)
+    if key is None:
+        return pending
+    return _finish(tool, key, pending)
+
+
+def run_tool_calls(calls):
+    """
+    Run all tool calls of one model turn concurrently.
+
+    calls: list of {"name", "arguments"} in the order the model requested them.
+    Returns the results in the same order.
+    """
+    started = [_start(call["name"], call["arguments"]) for call in calls]
+    return [pending if key is None else _finish(tool, key, pending)
+            for tool, key, pending in started]
+
+
+async def call_tool_async(name: str, arguments):
+    """
+    Async version of call_tool(). Uses the tool's async_func when it has one,
+    otherwise runs the sync function in the tool thread pool.
+    """
+    tool = _tools.get(name)
+    if tool is None or tool.async_func is None:
+        return await asyncio.get_running_loop().run_in_executor(None, call_tool, name, arguments)
+
+    try:
+        args = _parse_arguments(arguments)
+    except json.JSONDecodeError as e:
+        return {"error": f"Invalid arguments for {name}: {e}"}
+
+    key = _cache_key(name, args)
+    entry = _cached(tool, key)
+    if entry is not None:
+        _record(name, 0.0, "cache_hit")
+        return entry[1]
+
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(tool.async_func(**args), timeout=tool.timeout)
+    except asyncio.TimeoutError:
+        _record(name, time.perf_counter() - start, "timeout")
+        return {"error": f"{name} timed out after {tool.timeout} seconds"}
+    except Exception as e:
+        _record(name, time.perf_counter() - start, "error")
+        return {"error": f"{name} failed: {e}"}
+
+    _record(name, time.perf_counter() - start, "ok")
+    _store(tool, key, result)
+    return result
@@ -0,0 +1,122 @@
+import json
+import time
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import pytest
+
+from tools import vision_cache
+
+
+@pytest.fixture(autouse=True)
+def vision_cache_db(tmp_path, monkeypatch):
+    """Every test gets its own empty vision cache instead of cache/vision_cache.sqlite3."""
+    monkeypatch.setattr(vision_cache, "CACHE_PATH", str(tmp_path / "vision_cache.sqlite3"))
+    monkeypatch.setattr(vision_cache, "_conn", None)
+    monkeypatch.setattr(vision_cache, "_stats", {"hits": 0, "misses": 0, "evictions": 0})
+    yield vision_cache
+    if vision_cache._conn is not None:
+        vision_cache._conn.close()
+
+
+def _write_synthetic_clip(path, seconds, fps=30, size=(1280, 720)):
+    """Writes an mp4v clip of a moving rectangle with the frame number drawn on each frame."""
+    width, height = size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        pytest.skip("cv2.VideoWriter cannot write mp4v here")
+    try:
+        for index in range(int(seconds * fps)):
+            frame = np.full((height, width, 3), 40, dtype=np.uint8)
+            x = (index * 16) % width
+            cv2.rectangle(frame, (x, height // 3), (x + 160, height // 3 + 160), (0, 200, 255), -1)
+            cv2.putText(frame, str(index), (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+            writer.write(frame)
+    finally:
+        writer.release()
+
+
+@pytest.fixture(scope="session")
+def write_clip():
+    """write_clip(path, seconds, fps=30, size=(1280, 720)) creates a synthetic test video."""
+    return _write_synthetic_clip
+
+
+class StubServer:
+    """
+    Local HTTP stand-in for an upstream API.
+
+    respond(request) returns (status, body) or (status, body, delay_seconds); a dict body is
+    sent as JSON, a str as HTML. request has .method, .path, .query (first value per key)
+    and .json (parsed POST body or None). Every request is appended to .requests.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                request = SimpleNamespace(
+                    method=self.command, path=url.path,
+                    query={key: values[0] for key, values in parse_qs(url.query).items()},
+                    json=json.loads(body) if body else None,
+                )
+                with stub._lock:
+                    stub.requests.append(request)
+                status, payload, *delay = stub.respond(request)
+                if delay:
+                    time.sleep(delay[0])
+                if isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/html"
+                else:
+                    data, content_type = json.dumps(payload).encode(), "application/json"
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client already gave up (timeout tests)
+
+            do_GET = do_POST = _handle
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def hits(self, **query):
+        """Number of requests whose query string contains all of `query`."""
+        with self._lock:
+            return sum(all(r.query.get(k) == v for k, v in query.items()) for r in self.requests)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(respond):
+        server = StubServer(respond)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
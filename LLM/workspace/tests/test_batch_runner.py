@@ -0,0 +1,110 @@
+import os
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.batch_runner import run_batch
+from tools.video_processor import format_timestamp
+from tools.vision_api import API_ERROR_MESSAGE, CHUNK_SIZE
+
+CLIPS = {"a_short.mp4": 6, "b_long.mp4": 20}  # 파일 이름 -> 길이 (초)
+
+
+class StubAsyncClient:
+    """
+    API 대신 delay초 기다렸다가 첫 구간 타임스탬프를 답하는 가짜 비동기 클라이언트.
+
+    fail_labels에 든 구간은 재시도하지 않는 오류로 실패하고, answer가 있으면 라벨 대신 그 문장을 답합니다.
+    """
+
+    def __init__(self, delay=0.05, fail_labels=(), answer=None):
+        self.delay = delay
+        self.fail_labels = set(fail_labels)
+        self.answer = answer
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        first_label = messages[-1]["content"][1]["text"].strip()
+        if first_label in self.fail_labels:
+            raise ValueError(f"stub failure {first_label}")
+        content = self.answer or first_label
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def clips(tmp_path, write_clip):
+    directory = tmp_path / "videos"
+    directory.mkdir()
+    for name, seconds in CLIPS.items():
+        write_clip(str(directory / name), seconds, size=(320, 240))
+    return str(directory)
+
+
+def read_records(output_path):
+    with open(output_path, "r", encoding="utf-8") as f:
+        return {os.path.basename(r["video_path"]): r for r in map(json.loads, f)}
+
+
+def expected_description(seconds):
+    starts = range(0, seconds, 2 * CHUNK_SIZE)
+    return "\n\n".join(f"[{format_timestamp(start, min(start + 2, seconds))}]" for start in starts)
+
+
+def test_batch_records_each_video_in_order(clips, tmp_path):
+    output_path = str(tmp_path / "results.jsonl")
+
+    summary = run_batch(clips, output_path, frame_interval=2, max_workers=2, async_client=StubAsyncClient(0.2))
+
+    records = read_records(output_path)
+    assert set(records) == set(CLIPS)
+    for name, seconds in CLIPS.items():
+        record = records[name]
+        assert record["status"] == "ok", record
+        assert record["frames"] == seconds // 2
+        assert record["description"] == expected_description(seconds), f"{name}: 구간 순서가 다릅니다"
+
+    assert summary["ok"] == 2 and summary["error"] == 0, summary
+    expected_rate = round(2 / (summary["seconds"] / 60), 2)
+    assert abs(summary["videos_per_minute"] - expected_rate) <= 0.1 * expected_rate, summary
+
+
+def test_rerun_skips_completed_videos(clips, tmp_path):
+    output_path = str(tmp_path / "results.jsonl")
+    run_batch(clips, output_path, max_workers=2, async_client=StubAsyncClient())
+
+    client = StubAsyncClient()
+    again = run_batch(clips, output_path, async_client=client)
+
+    assert again["skipped"] == 2 and again["ok"] == 0, again
+    assert client.calls == 0
+
+
+def test_failed_chunk_marks_video_for_retry(clips, tmp_path):
+    output_path = str(tmp_path / "results.jsonl")
+
+    summary = run_batch(clips, output_path, max_workers=2,
+                        async_client=StubAsyncClient(fail_labels={f"[{format_timestamp(8, 10)}]"}))
+
+    records = read_records(output_path)
+    assert records["a_short.mp4"]["status"] == "ok"
+    assert records["b_long.mp4"]["status"] == "error"
+    assert records["b_long.mp4"]["error"] == "1개 구간 분석 실패"
+    assert summary["ok"] == 1 and summary["error"] == 1
+
+    again = run_batch(clips, output_path, async_client=StubAsyncClient())
+    assert again["skipped"] == 1 and again["ok"] == 1, again
+
+
+def test_answer_quoting_error_phrase_is_not_a_failure(clips, tmp_path):
+    output_path = str(tmp_path / "results.jsonl")
+    answer = f"화면에 '{API_ERROR_MESSAGE}'라는 안내문이 보입니다."
+
+    summary = run_batch(clips, output_path, max_workers=2, async_client=StubAsyncClient(answer=answer))
+
+    assert summary["ok"] == 2 and summary["error"] == 0, summary
+    assert all(record["status"] == "ok" for record in read_records(output_path).values())
@@ -0,0 +1,21 @@
+import pytest
+
+from services.intent_router import evaluate, route
+
+
+def test_labelled_examples_all_route_correctly():
+    accuracy, mistakes = evaluate()
+    assert mistakes == [], f"정확도 {accuracy:.0%}"
+
+
+@pytest.mark.parametrize("text", [
+    "Delete my schedule for tomorrow",
+    "Cancel the meeting on my calendar",
+    "My 3pm meeting was cancelled, show my schedule",
+    "Move my 3pm meeting to Friday",
+    "내일 일정 취소해줘",
+    "오늘 일정에서 회의 빼줘",
+])
+def test_schedule_changes_are_left_to_the_llm(text):
+    assert route(text) is None
+
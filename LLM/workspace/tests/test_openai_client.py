@@ -0,0 +1,71 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+from services import openai_client
+
+WORKSPACE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+
+def _git(*args, cwd=WORKSPACE):
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture(scope="module")
+def baseline_workspace(tmp_path_factory):
+    """
+    공유 클라이언트(services/openai_client.py)가 생기기 직전 커밋을 git worktree로 꺼냅니다.
+
+    STARTUP_BASELINE_REF 환경 변수로 비교할 커밋을 바꿀 수 있습니다.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git이 없습니다")
+    try:
+        ref = os.getenv("STARTUP_BASELINE_REF") or (
+            _git("log", "--diff-filter=A", "--format=%H", "--", "services/openai_client.py").splitlines()[-1] + "^"
+        )
+        top = _git("rev-parse", "--show-toplevel")
+    except (subprocess.CalledProcessError, IndexError):
+        pytest.skip("비교할 기준 커밋을 찾을 수 없습니다")
+
+    tree = str(tmp_path_factory.mktemp("baseline") / "tree")
+    _git("worktree", "add", "--detach", tree, ref)
+    try:
+        yield os.path.join(tree, os.path.relpath(WORKSPACE, top))
+    finally:
+        _git("worktree", "remove", "--force", tree)
+
+
+def _import_time(workspace):
+    """새 프로세스에서 python -X importtime으로 잰 main 모듈 import 시간 (누적, 초)."""
+    env = dict(os.environ, PYTHONPATH=workspace, OPENAI_API_KEY="sk-benchmark")
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=workspace, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    line = next(line for line in stderr.splitlines() if line.endswith("| main"))
+    return int(line.split("|")[1]) / 1e6
+
+
+def test_shared_client_is_created_once(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    openai_client._client = None
+    try:
+        assert openai_client.get_client() is openai_client.get_client()
+    finally:
+        openai_client._client = None
+
+
+def test_startup_is_faster_than_baseline(baseline_workspace, capsys):
+    results = {}
+    for label, workspace in (("before", baseline_workspace), ("after", WORKSPACE)):
+        _import_time(workspace)  # .pyc 생성은 재지 않습니다
+        results[label] = statistics.median(_import_time(workspace) for _ in range(RUNS))
+
+    with capsys.disabled():
+        print(f"\n[OpenAI Client] import main (중앙값 {RUNS}회): "
+              f"before {results['before'] * 1000:.0f}ms, after {results['after'] * 1000:.0f}ms")
+    assert results["after"] < results["before"]
@@ -0,0 +1,67 @@
+import os
+import sys
+import inspect
+import importlib.util
+
+import pytest
+
+from tools import udp_protocol
+from tools.udp_protocol import FrameAssembler, split_frame
+
+ROBOT_PROTOCOL = os.path.join(os.path.dirname(__file__), "..", "..", "..", "leggedrobot", "workspace", "udp_protocol.py")
+
+
+@pytest.fixture(scope="module")
+def robot_protocol():
+    """송신 쪽 원본 (leggedrobot/workspace/udp_protocol.py). LLM 컨테이너처럼 없으면 건너뜁니다."""
+    if not os.path.exists(ROBOT_PROTOCOL):
+        pytest.skip("leggedrobot/workspace/udp_protocol.py가 없습니다")
+    spec = importlib.util.spec_from_file_location("robot_udp_protocol", ROBOT_PROTOCOL)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # inspect.getsource()가 클래스의 파일을 찾을 수 있도록
+    spec.loader.exec_module(module)
+    yield module
+    del sys.modules[spec.name]
+
+
+def _shared_names():
+    return [name for name, value in vars(udp_protocol).items()
+            if not name.startswith("__") and not inspect.ismodule(value)]
+
+
+@pytest.mark.parametrize("name", _shared_names())
+def test_copy_matches_robot_protocol(robot_protocol, name):
+    ours = getattr(udp_protocol, name)
+    theirs = getattr(robot_protocol, name, None)
+    assert theirs is not None, f"leggedrobot 쪽에 {name}이(가) 없습니다"
+    if inspect.isfunction(ours) or inspect.isclass(ours):
+        assert inspect.getsource(ours) == inspect.getsource(theirs), f"{name} 구현이 다릅니다"
+    elif isinstance(ours, type(udp_protocol.HEADER)):
+        assert ours.format == theirs.format
+    else:
+        assert ours == theirs, f"{name} 값이 다릅니다"
+
+
+def _send(assembler, frame_id, sent_at, now):
+    results = [assembler.add(chunk, now) for chunk in split_frame(b"\xff\xd8" + bytes(3000), frame_id, sent_at)]
+    return results[-1]
+
+
+def test_short_restart_is_detected_by_send_time():
+    assembler = FrameAssembler()
+    for frame_id in range(20):
+        assert _send(assembler, frame_id, sent_at=100.0 + frame_id / 30, now=frame_id / 30) is not None
+
+    # 20프레임 만에 다시 시작한 송신기: 번호는 RESTART_GAP보다 조금 뒤지만 송신 시각은 더 늦습니다.
+    assert _send(assembler, 0, sent_at=101.0, now=0.7) is not None
+    assert assembler.restarts == 1
+
+
+def test_late_chunk_of_old_frame_is_stale():
+    assembler = FrameAssembler()
+    old = split_frame(b"\xff\xd8" + bytes(3000), 5, sent_at=100.0)
+    assembler.add(old[0], 0.0)
+    assert _send(assembler, 6, sent_at=100.1, now=0.1) is not None
+
+    assert assembler.add(old[1], 0.2) is None
+    assert assembler.stale == 1 and assembler.restarts == 0
@@ -0,0 +1,87 @@
+import time
+import socket
+
+import cv2
+import numpy as np
+import pytest
+
+from services import agent_runner
+from tools.udp_protocol import split_frame
+from tools.udp_stream import UdpFrameSource
+
+FPS = 30
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_clip(path):
+    video = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        success, frame = video.read()
+        if not success:
+            break
+        frames.append(frame)
+    video.release()
+    return frames
+
+
+@pytest.fixture
+def source():
+    source = UdpFrameSource(host="127.0.0.1", port=free_port()).start()
+    yield source
+    source.stop()
+
+
+def replay(source, frames, chunked):
+    """
+    프레임을 로봇 송신기처럼 JPEG으로 인코딩하여 루프백으로 보냅니다.
+
+    chunked면 udp_protocol 조각 형식, 아니면 프레임 하나를 데이터그램 하나로 보냅니다.
+    수신 버퍼가 넘치지 않도록 실제 카메라보다 빠른 정도로만 간격을 둡니다.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for frame_id, frame in enumerate(frames):
+            data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+            for datagram in (split_frame(data, frame_id) if chunked else [data]):
+                sock.sendto(datagram, (source.host, source.port))
+            time.sleep(0.005)
+
+    deadline = time.monotonic() + 2
+    while source.frame_count() < len(frames) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize("chunked, size", [(False, (320, 240)), (True, (1280, 720))])
+def test_replayed_clip_reaches_analysis(tmp_path, write_clip, source, monkeypatch, chunked, size):
+    path = str(tmp_path / "clip.mp4")
+    write_clip(path, 2, FPS, size=size)
+    frames = read_clip(path)
+    assert len(frames) == 2 * FPS
+
+    analysed = []
+
+    def fake_analyze(frames_info, question):
+        analysed.extend(frames_info)
+        return f"{len(frames_info)}개 프레임 분석"
+
+    monkeypatch.setattr(agent_runner, "analyze_frames", fake_analyze)
+
+    replay(source, frames, chunked)
+    assert source.frame_count() == len(frames)
+
+    answer = agent_runner.ask_vision_live("무엇이 보여?", source, seconds=10, frame_interval=0.1)
+
+    assert answer == f"{len(analysed)}개 프레임 분석"
+    assert len(analysed) >= 3
+    starts = [frame_info["start_time"] for frame_info in analysed]
+    assert starts == sorted(starts) and starts[0] == 0
+
+    # 분석에 들어간 첫 프레임은 보낸 첫 프레임과 같은 장면이어야 합니다.
+    first = cv2.imdecode(np.frombuffer(analysed[0]["image_bytes"], dtype=np.uint8), cv2.IMREAD_COLOR)
+    expected = cv2.resize(frames[0], (first.shape[1], first.shape[0]), interpolation=cv2.INTER_AREA)
+    assert np.abs(first.astype(int) - expected.astype(int)).mean() < 10
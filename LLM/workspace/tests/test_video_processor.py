@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from tools import video_processor
+from tools.video_processor import _select_mode, iter_frames, probe_gop
+
+FPS = 30
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory, write_clip):
+    """OpenCV mp4v 인코더로 만든 30초 합성 영상 (GOP 최대 12프레임)."""
+    path = str(tmp_path_factory.mktemp("video") / "clip.mp4")
+    write_clip(path, 30, FPS, size=(640, 360))
+    return path
+
+
+def _extract(path, interval, mode):
+    start = time.perf_counter()
+    timestamps = [f["timestamp"] for f in iter_frames(path, interval, mode, save_to_disk=False)]
+    return time.perf_counter() - start, timestamps
+
+
+def test_select_mode_breaks_even_at_half_gop():
+    assert _select_mode(60, 250) == "sequential"
+    assert _select_mode(125, 250) == "sequential"
+    assert _select_mode(126, 250) == "seek"
+    assert _select_mode(60, 12) == "seek"
+    assert _select_mode(60, None) == _select_mode(60, video_processor.DEFAULT_GOP_FRAMES)
+
+
+def test_probe_gop_reads_keyframe_interval(clip):
+    gop = probe_gop(clip)
+    assert gop is not None and 1 <= gop <= 12
+
+
+def test_probe_gop_unknown_without_two_keyframes(clip):
+    assert probe_gop(clip, max_packets=1) is None
+
+
+@pytest.mark.parametrize("interval", [0.5, 2, 10])
+def test_modes_return_same_segments(clip, interval):
+    _, seek = _extract(clip, interval, "seek")
+    _, sequential = _extract(clip, interval, "sequential")
+    assert seek == sequential
+    assert len(seek) == int(30 / interval)
+
+
+def test_auto_picks_faster_mode_at_default_interval(clip, capsys):
+    interval = 2
+    timings = {mode: min(_extract(clip, interval, mode)[0] for _ in range(3)) for mode in ("seek", "sequential")}
+
+    capsys.readouterr()
+    _extract(clip, interval, "auto")
+    chosen = "seek" if "모드: seek" in capsys.readouterr().out else "sequential"
+
+    faster = min(timings, key=timings.get)
+    report = ", ".join(f"{mode} {seconds:.3f}초" for mode, seconds in timings.items())
+    assert chosen == faster, f"auto가 {chosen}를 선택했지만 {faster}가 더 빠릅니다 ({report})"
@@ -0,0 +1,170 @@
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools import vision_api
+
+
+def make_frames(count):
+    return [{"timestamp": f"{i * 2}-{i * 2 + 2}초", "image_bytes": bytes([i])} for i in range(count)]
+
+
+def completion(content, finish_reason="stop"):
+    return SimpleNamespace(choices=[SimpleNamespace(finish_reason=finish_reason,
+                                                    message=SimpleNamespace(content=content))])
+
+
+class StructuredClient:
+    """Answers the JSON prompt; requests with more than max_frames images come back truncated."""
+
+    def __init__(self, max_frames=None, broken_timestamps=()):
+        self.max_frames = max_frames
+        self.broken_timestamps = set(broken_timestamps)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, **kwargs):
+        content = messages[-1]["content"]
+        labels = [part["text"].strip()[1:-1].split(" ", 1) for part in content if part["type"] == "text"][1:]
+        self.requests.append(len(labels))
+        frames = [{"index": int(number[1:]), "description": f"{timestamp} 장면"} for number, timestamp in labels]
+        if self.max_frames is not None and len(labels) > self.max_frames:
+            return completion(json.dumps({"frames": frames})[:40], finish_reason="length")
+        if any(timestamp in self.broken_timestamps for _, timestamp in labels):
+            return completion("not json")
+        return completion(json.dumps({"frames": frames}))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def install(**kwargs):
+        fake = StructuredClient(**kwargs)
+        monkeypatch.setattr(vision_api, "get_client", lambda: fake)
+        return fake
+    return install
+
+
+def test_structured_splits_frames_into_chunks(client):
+    fake = client()
+    results = vision_api.analyze_frames_structured(make_frames(10), "뭐가 보여?", chunk_size=4)
+
+    assert sorted(fake.requests) == [2, 4, 4]
+    assert [r["frame_index"] for r in results] == list(range(10))
+    assert [r["description"] for r in results] == [f"{i * 2}-{i * 2 + 2}초 장면" for i in range(10)]
+
+
+def test_truncated_chunk_falls_back_to_single_frames(client):
+    fake = client(max_frames=1)
+    results = vision_api.analyze_frames_structured(make_frames(6), "뭐가 보여?", chunk_size=4)
+
+    assert all(r["description"] for r in results)
+    assert sorted(fake.requests) == [1] * 6 + [2, 4]
+
+
+def test_invalid_json_only_loses_that_frame(client):
+    client(broken_timestamps={"4-6초"})
+    results = vision_api.analyze_frames_structured(make_frames(8), "뭐가 보여?", chunk_size=4)
+
+    missing = [r["frame_index"] for r in results if r["description"] is None]
+    assert missing == [2]
+
+
+def test_structured_results_are_cached_per_chunk(client):
+    frames = make_frames(8)
+    client()
+    vision_api.analyze_frames_structured(frames, "뭐가 보여?", chunk_size=4)
+    fake = client()
+    results = vision_api.analyze_frames_structured(frames, "뭐가 보여?", chunk_size=4)
+
+    assert fake.requests == []
+    assert all(r["description"] for r in results)
+
+
+def chat_completion(content):
+    return {
+        "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": vision_api.VISION_MODEL,
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
+
+
+@pytest.fixture
+def vision_upstream(stub_server, monkeypatch):
+    """
+    OpenAI 호환 /chat/completions 스텁. 요청마다 latency초 기다리고, failures[첫 구간 라벨]에
+    적힌 상태 코드를 차례로 돌려준 뒤에는 그 라벨을 답합니다.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(vision_api, "RETRY_BASE_DELAY", 0.01)
+    script = SimpleNamespace(latency=0.2, failures={})
+
+    def respond(request):
+        label = request.json["messages"][-1]["content"][1]["text"].strip()
+        pending = script.failures.get(label)
+        if pending:
+            status = pending.pop(0)
+            return status, {"error": {"message": f"stub {status}", "type": "server_error"}}, script.latency
+        return 200, chat_completion(label), script.latency
+
+    server = stub_server(respond)
+    server.script = script
+    return server
+
+
+def run_concurrent(server, frames, max_concurrency):
+    async def run():
+        async_client = vision_api.create_async_client(base_url=server.url, max_retries=0)
+        try:
+            return await vision_api.analyze_frames_concurrent_async(
+                frames, "벤치마크", max_concurrency=max_concurrency, use_cache=False, async_client=async_client
+            )
+        finally:
+            await async_client.close()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_analysis_over_http_with_retries(vision_upstream, capsys):
+    frames = make_frames(32)
+    chunks = [frames[i:i + vision_api.CHUNK_SIZE] for i in range(0, len(frames), vision_api.CHUNK_SIZE)]
+    labels = [f"[{chunk[0]['timestamp']}]" for chunk in chunks]
+    expected = "\n\n".join(labels)
+
+    report = []
+    for label, concurrency in (("순차", 1), ("병렬", vision_api.MAX_CONCURRENCY)):
+        # 429 한 번, 503 두 번, 429 후 503 - 모두 MAX_RETRIES 안에서 회복됩니다.
+        vision_upstream.script.failures = {labels[1]: [429], labels[4]: [503, 503], labels[6]: [429, 503]}
+        vision_upstream.requests.clear()
+
+        start = time.perf_counter()
+        result = run_concurrent(vision_upstream, frames, concurrency)
+        seconds = time.perf_counter() - start
+
+        retries = len(vision_upstream.requests) - len(chunks)
+        logged = capsys.readouterr().out.count("재시도")
+        assert result == expected, f"{label}: 구간 순서가 맞지 않습니다"
+        assert retries == logged == 5
+        report.append((label, concurrency, len(vision_upstream.requests), retries, seconds))
+
+    with capsys.disabled():
+        for label, concurrency, requests, retries, seconds in report:
+            print(f"\n[Vision Benchmark] {label} (동시 {concurrency}개): 프레임 {len(frames)}개, 요청 {requests}개 "
+                  f"(재시도 {retries}회), {seconds:.2f}초 (요청당 {vision_upstream.script.latency}초 지연)", end="")
+        print()
+    assert report[1][-1] < report[0][-1] / 2
+
+
+def test_concurrent_analysis_gives_up_after_max_retries(vision_upstream, monkeypatch):
+    monkeypatch.setattr(vision_api, "MAX_RETRIES", 2)
+    vision_upstream.script.latency = 0
+    frames = make_frames(8)
+    vision_upstream.script.failures = {"[0-2초]": [503] * 5}
+
+    result = run_concurrent(vision_upstream, frames, 4)
+
+    first, second = result.split("\n\n")
+    assert first.startswith(vision_api.API_ERROR_MESSAGE) and "503" in first
+    assert second == "[8-10초]"
+    assert len(vision_upstream.requests) == 1 + (1 + vision_api.MAX_RETRIES)
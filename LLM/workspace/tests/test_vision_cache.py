@@ -0,0 +1,70 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools import vision_api
+
+
+class CountingClient:
+    """호출 수를 세고 "answer N"을 답하는 가짜 비동기 클라이언트"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer {self.calls}"))])
+
+
+@pytest.fixture
+def cache(vision_cache_db, monkeypatch):
+    monkeypatch.setattr(vision_cache_db, "CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(vision_cache_db, "CACHE_MAX_ENTRIES", 3)
+    return vision_cache_db
+
+
+def analyze(client, index, question="무엇이 보여?"):
+    chunk = [{"timestamp": f"{index * 2}-{index * 2 + 2}초", "image_bytes": bytes([index])}]
+    text, ok = asyncio.run(vision_api._analyze_chunk(client, asyncio.Semaphore(1), chunk, question, True))
+    assert ok
+    return text
+
+
+def test_hit_ignores_case_and_spacing(cache):
+    client = CountingClient()
+
+    assert analyze(client, 0) == "answer 1" and client.calls == 1
+    assert analyze(client, 0, "  무엇이   보여? ") == "answer 1" and client.calls == 1, "적중 실패"
+    assert analyze(client, 0, "누가 있어?") == "answer 2" and client.calls == 2, "다른 질문이 적중함"
+
+
+def test_expired_entry_is_a_miss(cache):
+    client = CountingClient()
+    analyze(client, 0)
+
+    cache._get_connection().execute("UPDATE vision_cache SET created_at = created_at - 61")
+
+    assert analyze(client, 0) == "answer 2" and client.calls == 2, "만료된 항목이 적중함"
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    client = CountingClient()
+    for index in (0, 1, 2):
+        analyze(client, index)
+        time.sleep(0.01)
+    analyze(client, 0)  # 0번을 최근 사용으로
+    time.sleep(0.01)
+    analyze(client, 3)
+
+    count = cache._get_connection().execute("SELECT COUNT(*) FROM vision_cache").fetchone()[0]
+    assert count == 3, f"최대 개수를 넘었습니다: {count}"
+
+    calls = client.calls
+    analyze(client, 0)
+    assert client.calls == calls, "최근 사용한 항목이 삭제됨"
+    analyze(client, 1)
+    assert client.calls == calls + 1, "가장 오래된 항목이 남아 있음"
+    assert cache.get_stats()["evictions"] > 0
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from tools import vision_api
+from tools.vision_session import VisionSession
+
+
+class StreamingClient:
+    """Streams `answer` in two pieces, or raises `error` once some text has been sent."""
+
+    def __init__(self, answer="소파가 보여.", error=None):
+        self.answer = answer
+        self.error = error
+        self.messages = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, **kwargs):
+        self.messages.append(messages)
+        return Stream(self.answer, self.error)
+
+
+class Stream:
+    def __init__(self, answer, error):
+        self.answer = answer
+        self.error = error
+
+    def __iter__(self):
+        half = len(self.answer) // 2
+        for text in (self.answer[:half], self.answer[half:]):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+            if self.error:
+                raise self.error
+
+    def close(self):
+        pass
+
+
+def make_session():
+    return VisionSession([{"timestamp": "0-2초", "image_bytes": b"\xff\xd8\xff\xd9"}])
+
+
+def test_answer_is_added_to_history(monkeypatch):
+    monkeypatch.setattr(vision_api, "get_client", lambda: StreamingClient())
+    session = make_session()
+
+    assert session.ask(0, "뭐가 있어?") == "소파가 보여."
+    assert session.history(0) == [("뭐가 있어?", "소파가 보여.")]
+
+
+def test_failed_answer_is_not_added_to_history(monkeypatch):
+    failing = StreamingClient(error=ConnectionError("reset"))
+    monkeypatch.setattr(vision_api, "get_client", lambda: failing)
+    session = make_session()
+
+    answer = session.ask(0, "뭐가 있어?")
+    assert vision_api.API_ERROR_MESSAGE in answer
+    assert session.history(0) == []
+
+    # The follow-up must not replay the error as an assistant turn
+    working = StreamingClient()
+    monkeypatch.setattr(vision_api, "get_client", lambda: working)
+    assert session.ask(0, "뭐가 있어?") == "소파가 보여."
+    assert all(message["role"] != "assistant" for message in working.messages[0])
+    assert session.history(0) == [("뭐가 있어?", "소파가 보여.")]
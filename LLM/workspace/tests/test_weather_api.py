@@ -0,0 +1,133 @@
+import time
+import threading
+
+import pytest
+import requests
+
+from tools import weather_api
+
+OK_BODY = {"name": "Seoul", "main": {"temp": 21.5, "feels_like": 21.0, "humidity": 40},
+           "weather": [{"description": "맑음"}], "wind": {"speed": 2.1}}
+
+
+def ok(temp=21.5):
+    return {**OK_BODY, "main": {**OK_BODY["main"], "temp": temp}}
+
+
+@pytest.fixture
+def upstream(stub_server, monkeypatch):
+    """Points weather_api at a local server; `script` maps a city to a respond(request, hit) function."""
+    script = {}
+    hits = {}
+
+    def respond(request):
+        city = request.query["q"]
+        hits[city] = hits.get(city, 0) + 1
+        return script.get(city, lambda hit: (200, ok()))(hits[city])
+
+    server = stub_server(respond)
+    monkeypatch.setattr(weather_api, "OPENWEATHER_URL", server.url + "/weather")
+    monkeypatch.setattr(weather_api, "READ_TIMEOUT", 2.0)
+    monkeypatch.setattr(weather_api, "_session", None)
+    weather_api.clear_cache()
+    server.script = script
+    yield server
+    weather_api.clear_cache()
+
+
+def test_result_is_cached_per_city(upstream):
+    assert weather_api.get_weather("Seoul")["기온"] == 21.5
+    weather_api.get_weather(" seoul ")
+    assert upstream.hits(q="Seoul") == 1
+
+
+def test_503_is_retried(upstream):
+    upstream.script["Flaky"] = lambda hit: (503, {"message": "unavailable"}) if hit == 1 else (200, ok())
+    assert weather_api.get_weather("Flaky")["도시"] == "Seoul"
+    assert upstream.hits(q="Flaky") == 2
+
+
+def test_persistent_500_returns_error_payload(upstream):
+    upstream.script["Broken"] = lambda hit: (500, {"cod": 500, "message": "internal error"})
+    assert weather_api.get_weather("Broken") == {"error": "internal error"}
+    assert upstream.hits(q="Broken") == 1 + weather_api.MAX_RETRIES
+
+
+def test_error_payload_is_not_cached(upstream):
+    upstream.script["Nowhere"] = lambda hit: (404, {"cod": "404", "message": "city not found"})
+    assert weather_api.get_weather("Nowhere") == {"error": "city not found"}
+    weather_api.get_weather("Nowhere")
+    assert upstream.hits(q="Nowhere") == 2
+
+
+def test_html_error_page(upstream):
+    upstream.script["Gateway"] = lambda hit: (502, "<html><body>Bad Gateway</body></html>")
+    assert weather_api.get_weather("Gateway") == {"error": "API 요청 실패 (HTTP 502)"}
+
+
+def test_read_timeout_is_retried_then_raised(upstream, monkeypatch):
+    monkeypatch.setattr(weather_api, "READ_TIMEOUT", 0.2)
+    upstream.script["Slow"] = lambda hit: (200, ok(), 0.5)
+    with pytest.raises(requests.RequestException):
+        weather_api.get_weather("Slow")
+    assert upstream.hits(q="Slow") == 1 + weather_api.MAX_RETRIES
+
+
+def test_caller_waits_at_most_the_deadline(upstream, monkeypatch):
+    monkeypatch.setattr(weather_api, "READ_TIMEOUT", 5)
+    monkeypatch.setattr(weather_api, "REQUEST_DEADLINE_SECONDS", 0.3)
+    upstream.script["Slow"] = lambda hit: (200, ok(), 1.0)
+
+    start = time.monotonic()
+    assert "error" in weather_api.get_weather("Slow")
+    assert time.monotonic() - start < 0.8
+
+
+def test_retry_budget_fits_inside_the_tool_timeout():
+    from agents.weather_agent import weather_tool  # noqa: F401  (registers the tool)
+    from services.tool_registry import get_tool
+
+    worst_case = (1 + weather_api.MAX_RETRIES) * (weather_api.CONNECT_TIMEOUT + weather_api.READ_TIMEOUT)
+    assert worst_case <= weather_api.REQUEST_DEADLINE_SECONDS < get_tool("get_weather").timeout
+
+
+def test_concurrent_lookups_share_one_request(upstream):
+    upstream.script["Seoul"] = lambda hit: (200, ok(), 0.3)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        results.append(weather_api.get_weather("Seoul"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.hits(q="Seoul") == 1
+    assert len(results) == 8 and all(result["기온"] == 21.5 for result in results)
+
+
+def test_expired_entry_is_served_stale_while_one_refresh_runs(upstream, monkeypatch):
+    assert weather_api.get_weather("Seoul")["기온"] == 21.5
+
+    # The entry is now past its TTL but still within STALE_TTL; upstream is slower than STALE_WAIT
+    monkeypatch.setattr(weather_api, "CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(weather_api, "STALE_WAIT_SECONDS", 0.1)
+    upstream.script["Seoul"] = lambda hit: (200, ok(temp=25.0), 1.0)
+
+    start = time.monotonic()
+    stale = [weather_api.get_weather("Seoul") for _ in range(4)]
+    assert time.monotonic() - start < 0.8, "stale answers waited for the refresh"
+    assert all(result["기온"] == 21.5 for result in stale)
+
+    deadline = time.monotonic() + 3
+    while weather_api._inflight and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert upstream.hits(q="Seoul") == 2, "more than one refresh was sent"
+
+    monkeypatch.setattr(weather_api, "CACHE_TTL_SECONDS", 600)
+    assert weather_api.get_weather("Seoul")["기온"] == 25.0
+    assert upstream.hits(q="Seoul") == 2
@@ -1,85 +1,449 @@
 import os
 import json
-from datetime import datetime, timedelta
+import time as _time
+import sqlite3
+import threading
+from datetime import date as _date, datetime, timedelta
 
-SCHEDULE_FILE = "schedule.json"
+from tools.schedule_normalizer import normalize_date, normalize_time, find_time
 
+SCHEDULE_FILE = "schedule.json"  # legacy store, migrated into SCHEDULE_DB on first use
+SCHEDULE_DB = os.getenv("SCHEDULE_DB_PATH", "schedule.sqlite3")
+BUSY_TIMEOUT_MS = 5000  # how long a writer waits for another process's lock
 
-def normalize_date(date_str: str | None):
-    """Convert natural language date expressions into YYYY-MM-DD."""
-    if date_str is None:
+DEFAULT_DURATION_MINUTES = 60
+MAX_RANGE_DAYS = 92  # longest span get_range will list
+WORKDAY_START = "09:00"  # default window for find_free_slots
+WORKDAY_END = "18:00"
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()  # database paths whose schema/migration has been checked
+
+
+def parse_time(time_str: str | None):
+    """A time expression ("19:00", "7 PM", "저녁 7시") -> minutes after midnight. None if it isn't a clock time."""
+    if not time_str:
+        return None
+
+    normalized = find_time(time_str)
+    if normalized is None:
+        return None
+
+    hour, minute = normalized.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def format_minutes(minutes: int):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _parse_date(date_str: str):
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def _create_schema(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            event TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_events_date_time ON events (date, time);
+        CREATE TABLE IF NOT EXISTS recurring (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL,
+            time TEXT NOT NULL,
+            start_min INTEGER,
+            end_min INTEGER,
+            frequency TEXT NOT NULL,
+            interval INTEGER NOT NULL,
+            start_date TEXT NOT NULL,
+            until TEXT,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_recurring_start ON recurring (start_date);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        """
+    )
+
+    # Interval columns (minutes after midnight) for range and conflict queries.
+    # Added separately so databases created before they existed are upgraded in place.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    for column in ("start_min", "end_min"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {column} INTEGER")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_date_start ON events (date, start_min)")
+
+
+def _migrate_json(conn, json_path):
+    """
+    Import the legacy schedule.json ({date: {time: [events]}}) once.
+
+    Runs inside a write transaction so two processes starting at the same
+    time cannot both import it. The JSON file is renamed afterwards.
+    """
+    if not os.path.exists(json_path):
+        return 0
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+            conn.execute("COMMIT")
+            return 0
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                data = {}
+
+        now = _time.time()
+        rows = [
+            (date, slot, event, now, *_interval(slot, DEFAULT_DURATION_MINUTES))
+            for date, slots in data.items()
+            for slot, events in slots.items()
+            for event in events
+        ]
+        conn.executemany(
+            "INSERT INTO events (date, time, event, created_at, start_min, end_min) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (os.path.abspath(json_path),))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    try:
+        os.replace(json_path, json_path + ".migrated")
+    except OSError:
+        pass  # already recorded in meta, so it will not be imported twice
+
+    print(f"[Schedule] {json_path}에서 일정 {len(rows)}개를 {SCHEDULE_DB}로 옮겼습니다.")
+    return len(rows)
+
+
+def _get_conn(path=None):
+    """
+    Per-thread SQLite connection. The schema (and the one-off JSON
+    migration) is set up the first time each database is opened.
+    """
+    path = path or SCHEDULE_DB
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _connect(path)
+
+    if path not in _initialized:
+        with _init_lock:
+            if path not in _initialized:
+                _create_schema(conn)
+                if path == SCHEDULE_DB:
+                    _migrate_json(conn, SCHEDULE_FILE)
+                _initialized.add(path)
+
+    return conn
+
+
+def _interval(time_str, duration):
+    """(start_min, end_min) for a time, or (None, None) if the time isn't a clock time."""
+    start = parse_time(time_str)
+    if start is None:
+        return None, None
+    return start, min(start + duration, 24 * 60)
+
+
+def add_event(date: str, time: str, event: str, duration: int = DEFAULT_DURATION_MINUTES, db_path=None):
+    """Insert one event. A single INSERT is atomic, so concurrent writers never lose updates."""
+    conn = _get_conn(db_path)
+    conn.execute(
+        "INSERT INTO events (date, time, event, created_at, start_min, end_min) VALUES (?, ?, ?, ?, ?, ?)",
+        (date, time, event, _time.time(), *_interval(time, duration)),
+    )
+
+
+def add_recurring(event: str, time: str, start_date: str, frequency: str, interval: int = 1,
+                  until: str = None, duration: int = DEFAULT_DURATION_MINUTES, db_path=None):
+    """
+    Store a recurrence rule. Only the rule is stored; occurrences are
+    generated on demand for the dates being queried.
+    """
+    _get_conn(db_path).execute(
+        "INSERT INTO recurring (event, time, start_min, end_min, frequency, interval, start_date, until, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (event, time, *_interval(time, duration), frequency, interval, start_date, until, _time.time()),
+    )
+
+
+def _add_months(day: _date, months: int):
+    """Same day-of-month `months` later, or None if that month is too short."""
+    month_index = day.month - 1 + months
+    try:
+        return day.replace(year=day.year + month_index // 12, month=month_index % 12 + 1)
+    except ValueError:
         return None
 
-    ds = date_str.lower().strip()
 
-    if ds == "today":
-        return datetime.now().strftime("%Y-%m-%d")
+def _occurrences(frequency, interval, start: _date, until: _date | None, first: _date, last: _date):
+    """
+    Dates in [first, last] on which a rule occurs. Jumps straight to the first
+    occurrence on or after `first` instead of walking from the rule's start.
+    """
+    if until is not None:
+        last = min(last, until)
+    if last < start:
+        return
+
+    if frequency == "monthly":
+        months_before = max((first.year - start.year) * 12 + first.month - start.month, 0)
+        n = months_before - months_before % interval
+        while True:
+            day = _add_months(start, n)
+            if day is not None:
+                if day > last:
+                    return
+                if day >= first:
+                    yield day
+            elif _add_months(start.replace(day=1), n) > last:
+                return
+            n += interval
+    else:
+        step = interval * (7 if frequency == "weekly" else 1)
+        n = max(-(-(first - start).days // step), 0)
+        day = start + timedelta(days=n * step)
+        while day <= last:
+            yield day
+            day += timedelta(days=step)
+
+
+def _recurring_entries(first: _date, last: _date, db_path=None):
+    """Recurring occurrences in [first, last] as (date, start_min, end_min, time, event)."""
+    rules = _get_conn(db_path).execute(
+        "SELECT event, time, start_min, end_min, frequency, interval, start_date, until FROM recurring"
+        " WHERE start_date <= ? AND (until IS NULL OR until >= ?)",
+        (last.isoformat(), first.isoformat()),
+    ).fetchall()
+
+    for event, time, start_min, end_min, frequency, interval, start_date, until in rules:
+        for day in _occurrences(frequency, interval, _parse_date(start_date), _parse_date(until), first, last):
+            yield day.isoformat(), start_min, end_min, time, event
+
+
+def get_range(start_date: str, end_date: str, db_path=None):
+    """
+    Events between two dates (inclusive) as {date: [{"time", "event", ...}]},
+    one-off and recurring together, ordered by time.
+    """
+    first, last = _parse_date(start_date), _parse_date(end_date)
+
+    rows = _get_conn(db_path).execute(
+        "SELECT date, start_min, end_min, time, event FROM events"
+        " WHERE date BETWEEN ? AND ? ORDER BY date, start_min, id",
+        (start_date, end_date),
+    ).fetchall()
+    entries = [(*row, False) for row in rows]
+    entries += [(*row, True) for row in _recurring_entries(first, last, db_path)]
 
-    if ds == "tomorrow":
-        return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    # Untimed events ("after lunch") sort to the end of their day
+    entries.sort(key=lambda e: (e[0], e[1] is None, e[1] or 0))
 
-    return ds
+    days = {}
+    for day, _, _, time, event, recurring in entries:
+        item = {"time": time, "event": event}
+        if recurring:
+            item["recurring"] = True
+        days.setdefault(day, []).append(item)
+    return days
 
 
-def _load_schedule():
-    """Load schedule from a local JSON file."""
-    if not os.path.exists(SCHEDULE_FILE):
-        return {}
+def _busy_intervals(date: str, db_path=None):
+    """Sorted (start_min, end_min, event) for one date. Untimed events are left out."""
+    day = _parse_date(date)
+    rows = _get_conn(db_path).execute(
+        "SELECT start_min, end_min, event FROM events"
+        " WHERE date = ? AND start_min IS NOT NULL ORDER BY start_min",
+        (date,),
+    ).fetchall()
+    rows += [(start, end, event) for _, start, end, _, event in _recurring_entries(day, day, db_path)
+             if start is not None]
+    rows.sort()
+    return rows
 
-    with open(SCHEDULE_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
 
+def find_conflicts(date: str, start_min: int, end_min: int, db_path=None):
+    """Events on `date` that overlap [start_min, end_min)."""
+    return [
+        {"start": format_minutes(s), "end": format_minutes(e), "event": event}
+        for s, e, event in _busy_intervals(date, db_path)
+        if s < end_min and e > start_min
+    ]
 
-def _save_schedule(data):
-    """Save schedule back to the JSON file."""
-    with open(SCHEDULE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
 
+def find_free_slots(date: str, duration: int = DEFAULT_DURATION_MINUTES,
+                    day_start: str = WORKDAY_START, day_end: str = WORKDAY_END, db_path=None):
+    """Gaps of at least `duration` minutes between day_start and day_end, as [{"start", "end"}]."""
+    cursor, end_of_day = parse_time(day_start), parse_time(day_end)
+    slots = []
 
-def manage_schedule(action: str, event: str = None, date: str = None, time: str = None):
+    for start, end, _ in _busy_intervals(date, db_path):
+        if start - cursor >= duration:
+            slots.append((cursor, min(start, end_of_day)))
+        cursor = max(cursor, end)
+        if cursor >= end_of_day:
+            break
+
+    if end_of_day - cursor >= duration:
+        slots.append((cursor, end_of_day))
+
+    return [{"start": format_minutes(s), "end": format_minutes(e)} for s, e in slots if e - s >= duration]
+
+
+def get_events(date: str, db_path=None):
+    """Events on one date as {time: [events]}, using the (date, time) index."""
+    rows = _get_conn(db_path).execute(
+        "SELECT time, event FROM events WHERE date = ? ORDER BY time, id", (date,)
+    ).fetchall()
+
+    events = {}
+    for slot, event in rows:
+        events.setdefault(slot, []).append(event)
+    return events
+
+
+def manage_schedule(action: str, event: str = None, date: str = None, time: str = None,
+                    end_date: str = None, duration: int = None, frequency: str = None,
+                    interval: int = 1, until: str = None):
     """
     Manage schedule operations.
-    action: "add" or "get_today"
-    event: event description (required for add)
-    date: natural text or YYYY-MM-DD (required for add)
-    time: HH:MM (required for add)
+    action: "add", "get_today", "get_range", "find_free_slots" or "add_recurring"
+    event: event description (required for add / add_recurring)
+    date: natural text or YYYY-MM-DD (required for everything except get_today;
+          first occurrence for add_recurring, first day for get_range)
+    time: natural text or HH:MM (required for add / add_recurring; for find_free_slots, checks that time)
+    end_date: last day for get_range (defaults to 6 days after date)
+    duration: length in minutes (default 60)
+    frequency: "daily", "weekly" or "monthly" (add_recurring)
+    interval: repeat every N days/weeks/months (add_recurring)
+    until: last possible date of a recurrence (add_recurring, optional)
     """
 
-    schedule = _load_schedule()
+    # A time given inside the date ("내일 저녁 7시") is used when time is missing
+    if time is None and date:
+        time = find_time(date)
 
-    # Normalize date
+    # Normalize date and time (YYYY-MM-DD / HH:MM when understood)
     date = normalize_date(date)
+    time = normalize_time(time)
+    end_date = normalize_date(end_date)
+    until = normalize_date(until)
+    duration = duration or DEFAULT_DURATION_MINUTES
+
+    for value in (date, end_date, until):
+        if value is not None and _parse_date(value) is None:
+            return {"error": f"Could not understand the date '{value}'. Use YYYY-MM-DD."}
 
     # --- Add a new schedule ---
     if action == "add":
         if not event or not date or not time:
             return {"error": "Missing event, date, or time for adding schedule."}
 
-        # Ensure date exists
-        if date not in schedule:
-            schedule[date] = {}
+        start, end = _interval(time, duration)
+        conflicts = find_conflicts(date, start, end) if start is not None else []
+
+        add_event(date, time, event, duration)
 
-        # Ensure time slot exists
-        if time not in schedule[date]:
-            schedule[date][time] = []  # allow multiple events at same time
+        result = {
+            "status": "success",
+            "message": f"Added schedule for {date} at {time}: {event}"
+        }
+        if conflicts:
+            result["conflicts"] = conflicts
+        return result
 
-        # Add event
-        schedule[date][time].append(event)
+    # --- Add a repeating schedule ---
+    elif action == "add_recurring":
+        if not event or not date or not time or frequency not in FREQUENCIES:
+            return {"error": "Missing event, date, time, or frequency (daily/weekly/monthly) for recurring schedule."}
+        if interval is None:  # the model may send "interval": null
+            interval = 1
+        if interval < 1:
+            return {"error": "Interval must be at least 1."}
 
-        _save_schedule(schedule)
+        add_recurring(event, time, date, frequency, interval, until, duration)
 
+        every = frequency if interval == 1 else f"every {interval} {frequency}"
         return {
             "status": "success",
-            "message": f"Added schedule for {date} at {time}: {event}"
+            "message": f"Added {every} schedule from {date} at {time}: {event}" + (f" until {until}" if until else "")
         }
 
+    # --- Events in a date range ---
+    elif action == "get_range":
+        if not date:
+            return {"error": "Missing start date for range."}
+
+        end_date = end_date or (_parse_date(date) + timedelta(days=6)).isoformat()
+        if end_date < date:
+            return {"error": "End date is before start date."}
+        if (_parse_date(end_date) - _parse_date(date)).days >= MAX_RANGE_DAYS:
+            return {"error": f"Range is too long (max {MAX_RANGE_DAYS} days)."}
+
+        days = get_range(date, end_date)
+        return {
+            "start_date": date,
+            "end_date": end_date,
+            "days": days,
+            "message": "Here is your schedule for that period." if days else "You have no schedules in that period."
+        }
+
+    # --- Free time on a day ---
+    elif action == "find_free_slots":
+        if not date:
+            return {"error": "Missing date for finding free time."}
+
+        result = {"date": date, "free_slots": find_free_slots(date, duration)}
+
+        if time:
+            start, end = _interval(time, duration)
+            if start is None:
+                return {"error": f"Could not understand the time '{time}'. Use HH:MM."}
+            conflicts = find_conflicts(date, start, end)
+            result["time"] = format_minutes(start)
+            result["available"] = not conflicts
+            result["conflicts"] = conflicts
+
+        return result
+
     # --- Get today's schedule ---
     elif action == "get_today":
         today = datetime.now().strftime("%Y-%m-%d")
-        events = schedule.get(today, {})
+
+        # One-off and recurring events together, in time order
+        events = {}
+        for item in get_range(today, today).get(today, []):
+            events.setdefault(item["time"], []).append(item["event"])
 
         return {
             "date": today,
@@ -88,3 +452,36 @@ def manage_schedule(action: str, event: str = None, date: str = None, time: str
         }
 
     return {"error": "Unknown action."}
+
+
+def benchmark(n=100_000, db_path="schedule_benchmark.sqlite3"):
+    """
+    Rough timing of the storage engine: n single-event inserts spread over
+    a year, then per-day lookups. Uses a separate database file.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    start_date = datetime(2025, 1, 1)
+    days = 365
+
+    start = _time.perf_counter()
+    for i in range(n):
+        date = (start_date + timedelta(days=i % days)).strftime("%Y-%m-%d")
+        add_event(date, f"{i % 24:02d}:00", f"event {i}", db_path=db_path)
+    insert_seconds = _time.perf_counter() - start
+
+    start = _time.perf_counter()
+    found = 0
+    for d in range(days):
+        found += sum(len(v) for v in get_events((start_date + timedelta(days=d)).strftime("%Y-%m-%d"), db_path=db_path).values())
+    lookup_seconds = _time.perf_counter() - start
+
+    print(f"[Schedule Benchmark] 추가 {n}건: {insert_seconds:.2f}초 ({n / insert_seconds:.0f}건/초)")
+    print(f"[Schedule Benchmark] 날짜 조회 {days}회: {lookup_seconds:.3f}초 "
+          f"(1회 평균 {lookup_seconds / days * 1000:.2f}ms, 일정 {found}건)")
+
+
+if __name__ == "__main__":
+    benchmark()
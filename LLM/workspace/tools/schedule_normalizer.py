@@ -0,0 +1,337 @@
+"""
+Rule-based normalization of the date/time expressions users give the
+schedule tool ("내일 저녁 7시", "next Monday", "after lunch").
+
+Dates become YYYY-MM-DD and times HH:MM. All patterns are compiled once at
+import; an expression is matched against them in priority order and the
+first hit wins. Anything not understood is returned unchanged.
+"""
+
+import re
+import time as _time
+from datetime import date, datetime, timedelta
+
+WEEKDAYS_EN = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+WEEKDAYS_KO = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+MONTHS_EN = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10,
+    "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+# Day offsets for single words (longest alternatives first so "내일모레" beats "내일")
+DAY_WORDS = {
+    "day after tomorrow": 2, "내일모레": 2, "tomorrow": 1, "tonight": 0, "today": 0,
+    "yesterday": -1, "오늘": 0, "내일": 1, "모레": 2, "글피": 3, "어제": -1,
+}
+
+# Week offsets; "이번 주" / "this week" = the current Monday-Sunday week
+WEEK_WORDS = {
+    "this": 0, "coming": 0, "next": 1, "last": -1,
+    "이번": 0, "다음": 1, "다다음": 2, "지난": -1, "저번": -1,
+}
+
+# Times for expressions without a clock time, checked in order (longer names before the
+# names they contain; English words need \b so "afternoon" isn't "noon" and "fortnight" isn't "night")
+NAMED_TIMES = [
+    (r"\bafter lunch\b|점심\s*(?:먹고|후|이후|지나서)", "13:00"),
+    (r"\bafternoon\b|오후", "14:00"),
+    (r"\b(?:noon|lunch)\b|정오|점심", "12:00"),
+    (r"\bmidnight\b|자정", "00:00"),
+    (r"\bafter work\b|퇴근\s*(?:후|하고)", "18:30"),
+    (r"\bafter dinner\b|저녁\s*(?:먹고|후|이후)", "20:00"),
+    (r"\bdinner\b|저녁\s*식사", "19:00"),
+    (r"\bevening\b|저녁", "18:00"),
+    (r"\b(?:tonight|night)\b|밤", "21:00"),
+    (r"\bmorning\b|아침|오전", "09:00"),
+    (r"새벽", "06:00"),
+]
+
+_WEEKDAY_EN = "|".join(sorted(WEEKDAYS_EN, key=len, reverse=True))
+_MONTH_EN = "|".join(sorted(MONTHS_EN, key=len, reverse=True))
+_DAY_WORD = "|".join(sorted(DAY_WORDS, key=len, reverse=True))
+
+_ISO_RE = re.compile(r"(\d{4})[-/.]\s*(\d{1,2})[-/.]\s*(\d{1,2})")
+_KO_MONTH_DAY_RE = re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_EN_MONTH_DAY_RE = re.compile(rf"\b({_MONTH_EN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b")
+_EN_DAY_MONTH_RE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_EN})\b")
+_SLASH_RE = re.compile(r"(?<![\d:/])(\d{1,2})/(\d{1,2})(?![\d/])")
+_RELATIVE_EN_RE = re.compile(r"\bin\s+(\d+|a|one)\s+(day|week)s?\b|\b(\d+)\s+(day|week)s?\s+(?:later|from now)\b")
+_RELATIVE_KO_RE = re.compile(r"(\d+)\s*(일|주)\s*(?:후|뒤)|(일주일)\s*(?:후|뒤)")
+_WEEKDAY_EN_RE = re.compile(rf"\b(?:(this|next|last|coming)\s+)?({_WEEKDAY_EN})\b")
+_WEEKDAY_KO_RE = re.compile(r"(?:(다다음|다음|이번|지난|저번)\s*주\s*)?([월화수목금토일])요일")
+_WEEK_RE = re.compile(r"\b(this|next|last|coming)\s+week\b|(다다음|다음|이번|지난|저번)\s*주")
+_DAY_WORD_RE = re.compile(rf"(?<![a-z])({_DAY_WORD})(?![a-z])")
+_KO_DAY_RE = re.compile(r"(?<!\d)(\d{1,2})\s*일(?!\s*(?:후|뒤))")
+
+_KO_TIME_RE = re.compile(r"(?<!\d)(\d{1,2})\s*시(?!간)(?:\s*(\d{1,2})\s*분|\s*(반))?")
+_MERIDIEM_RE = re.compile(r"(?<![\d:])(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\b\.?")
+_CLOCK_RE = re.compile(r"(?<![\d/.-])(\d{1,2}):(\d{2})(?!\d)")
+_AT_HOUR_RE = re.compile(r"\b(?:at|@)\s*(\d{1,2})(?:\s*o'?clock)?(?![\d:/])|\b(\d{1,2})\s*o'?clock\b")
+_PM_RE = re.compile(r"오후|저녁|밤|\b(?:evening|tonight|night|afternoon)\b")
+_AM_RE = re.compile(r"오전|아침|새벽|\bmorning\b")
+_NAMED_TIMES = [(re.compile(pattern), value) for pattern, value in NAMED_TIMES]
+
+# Hours said without am/pm that are read as afternoon ("3시에 회의" -> 15:00)
+AFTERNOON_BARE_HOURS = range(1, 7)
+
+
+def _today(today):
+    if today is None:
+        return datetime.now().date()
+    if isinstance(today, datetime):
+        return today.date()
+    return today
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(month, day, today):
+    """A month/day without a year: this year, or next year if it has already passed."""
+    result = _safe_date(today.year, month, day)
+    if result is not None and result < today:
+        result = _safe_date(today.year + 1, month, day)
+    return result
+
+
+def _week_start(today, weeks):
+    return today - timedelta(days=today.weekday()) + timedelta(weeks=weeks)
+
+
+def find_date(text: str, today=None):
+    """
+    The first date expression in text as a date, or None.
+
+    Weekdays: "금요일" / "Friday" is the next one from today (today included),
+    "다음주 금요일" / "next Friday" is the Friday of next week.
+    """
+    today = _today(today)
+    s = text.lower()
+
+    m = _ISO_RE.search(s)
+    if m:
+        return _safe_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+
+    m = _KO_MONTH_DAY_RE.search(s)
+    if m:
+        return _upcoming(int(m.group(1)), int(m.group(2)), today)
+
+    m = _EN_MONTH_DAY_RE.search(s)
+    if m:
+        return _upcoming(MONTHS_EN[m.group(1)], int(m.group(2)), today)
+
+    m = _EN_DAY_MONTH_RE.search(s)
+    if m:
+        return _upcoming(MONTHS_EN[m.group(2)], int(m.group(1)), today)
+
+    m = _SLASH_RE.search(s)
+    if m:
+        return _upcoming(int(m.group(1)), int(m.group(2)), today)
+
+    m = _RELATIVE_EN_RE.search(s)
+    if m:
+        count, unit = (m.group(1), m.group(2)) if m.group(2) else (m.group(3), m.group(4))
+        count = 1 if count in ("a", "one") else int(count)
+        return today + timedelta(days=count * (7 if unit == "week" else 1))
+
+    m = _RELATIVE_KO_RE.search(s)
+    if m:
+        if m.group(3):
+            return today + timedelta(weeks=1)
+        return today + timedelta(days=int(m.group(1)) * (7 if m.group(2) == "주" else 1))
+
+    m = _WEEKDAY_EN_RE.search(s) or _WEEKDAY_KO_RE.search(s)
+    if m:
+        modifier, name = m.group(1), m.group(2)
+        weekday = WEEKDAYS_EN.get(name, WEEKDAYS_KO.get(name))
+        if modifier in (None, "this", "coming"):
+            return today + timedelta(days=(weekday - today.weekday()) % 7)
+        return _week_start(today, WEEK_WORDS[modifier]) + timedelta(days=weekday)
+
+    m = _WEEK_RE.search(s)
+    if m:
+        return _week_start(today, WEEK_WORDS[m.group(1) or m.group(2)])
+
+    m = _DAY_WORD_RE.search(s)
+    if m:
+        return today + timedelta(days=DAY_WORDS[m.group(1)])
+
+    m = _KO_DAY_RE.search(s)
+    if m:
+        day = int(m.group(1))
+        result = _safe_date(today.year, today.month, day)
+        if result is not None and result < today:
+            result = _safe_date(today.year + (today.month == 12), today.month % 12 + 1, day)
+        return result
+
+    return None
+
+
+def find_time(text: str):
+    """The first time expression in text as "HH:MM", or None."""
+    s = text.lower()
+    hour = minute = None
+    meridiem = None
+
+    m = _MERIDIEM_RE.search(s)
+    if m:
+        hour, minute, meridiem = int(m.group(1)), int(m.group(2) or 0), m.group(3)
+    else:
+        m = _KO_TIME_RE.search(s)
+        if m:
+            hour = int(m.group(1))
+            minute = 30 if m.group(3) else int(m.group(2) or 0)
+        else:
+            m = _CLOCK_RE.search(s) or _AT_HOUR_RE.search(s)
+            if m and m.re is _CLOCK_RE:
+                hour, minute = int(m.group(1)), int(m.group(2))
+            elif m:
+                hour, minute = int(m.group(1) or m.group(2)), 0
+
+    if hour is None:
+        for pattern, value in _NAMED_TIMES:
+            if pattern.search(s):
+                return value
+        return None
+
+    if meridiem is None and hour <= 12:
+        if _PM_RE.search(s):
+            meridiem = "p"
+        elif _AM_RE.search(s):
+            meridiem = "a"
+        elif hour in AFTERNOON_BARE_HOURS and m.re is not _CLOCK_RE:
+            meridiem = "p"
+
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+
+    if hour == 24 and minute == 0:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def normalize_date(date_str: str | None, today=None):
+    """Natural language date -> YYYY-MM-DD. Unrecognised input is returned stripped."""
+    if date_str is None:
+        return None
+
+    found = find_date(date_str, today)
+    return found.isoformat() if found else date_str.strip()
+
+
+def normalize_time(time_str: str | None):
+    """Natural language time -> HH:MM. Unrecognised input is returned stripped."""
+    if time_str is None:
+        return None
+
+    return find_time(time_str) or time_str.strip()
+
+
+# (input, expected date, expected time) relative to EXAMPLE_TODAY, a Wednesday
+EXAMPLE_TODAY = date(2025, 10, 22)
+EXAMPLES = [
+    ("today", "2025-10-22", None),
+    ("Tomorrow", "2025-10-23", None),
+    ("the day after tomorrow", "2025-10-24", None),
+    ("오늘", "2025-10-22", None),
+    ("내일 저녁 7시", "2025-10-23", "19:00"),
+    ("모레 오전 10시 30분", "2025-10-24", "10:30"),
+    ("내일모레", "2025-10-24", None),
+    ("글피", "2025-10-25", None),
+    ("next Monday", "2025-10-27", None),
+    ("this Friday at 3pm", "2025-10-24", "15:00"),
+    ("friday", "2025-10-24", None),
+    ("wednesday", "2025-10-22", None),
+    ("last tuesday", "2025-10-14", None),
+    ("다음주 월요일 아침", "2025-10-27", "09:00"),
+    ("이번주 월요일", "2025-10-20", None),
+    ("다다음주 수요일", "2025-11-05", None),
+    ("금요일 오후 2시 반", "2025-10-24", "14:30"),
+    ("next week", "2025-10-27", None),
+    ("이번 주", "2025-10-20", None),
+    ("in 3 days", "2025-10-25", None),
+    ("2 weeks from now", "2025-11-05", None),
+    ("3일 후", "2025-10-25", None),
+    ("일주일 뒤", "2025-10-29", None),
+    ("2025-12-01 09:15", "2025-12-01", "09:15"),
+    ("2025.11.3", "2025-11-03", None),
+    ("11월 5일 14:00", "2025-11-05", "14:00"),
+    ("Oct 30", "2025-10-30", None),
+    ("1st of January", "2026-01-01", None),
+    ("December 25th 7:30 PM", "2025-12-25", "19:30"),
+    ("10/1", "2026-10-01", None),
+    ("25일", "2025-10-25", None),
+    ("5일", "2025-11-05", None),
+    ("tonight", "2025-10-22", "21:00"),
+    ("this evening", None, "18:00"),
+    ("after lunch", None, "13:00"),
+    ("점심 먹고", None, "13:00"),
+    ("7 PM", None, "19:00"),
+    ("7pm", None, "19:00"),
+    ("12 am", None, "00:00"),
+    ("12:00 pm", None, "12:00"),
+    ("at 3", None, "15:00"),
+    ("at 9", None, "09:00"),
+    ("9 o'clock tonight", "2025-10-22", "21:00"),
+    ("3시", None, "15:00"),
+    ("새벽 3시", None, "03:00"),
+    ("밤 11시", None, "23:00"),
+    ("noon", None, "12:00"),
+    ("자정", None, "00:00"),
+    ("퇴근 후", None, "18:30"),
+    ("08:05", None, "08:05"),
+    ("afternoon", None, "14:00"),
+    ("this afternoon", None, "14:00"),
+    ("Friday afternoon", "2025-10-24", "14:00"),
+    ("Am I free tomorrow afternoon?", "2025-10-23", "14:00"),
+    ("in a fortnight", None, None),
+    ("3시간 후", None, None),
+    ("2시간 뒤", None, None),
+    ("3시간 뒤에 시간 있어?", None, None),
+    ("someday", None, None),
+]
+
+
+def check_examples(today=EXAMPLE_TODAY):
+    """Run EXAMPLES and return the ones that don't match as (input, expected, got)."""
+    failures = []
+    for text, expected_date, expected_time in EXAMPLES:
+        found = find_date(text, today)
+        got = (found.isoformat() if found else None, find_time(text))
+        if got != (expected_date, expected_time):
+            failures.append((text, (expected_date, expected_time), got))
+    return failures
+
+
+def benchmark(rounds=2000):
+    """Average time to normalize one expression (date + time) over EXAMPLES."""
+    start = _time.perf_counter()
+    for _ in range(rounds):
+        for text, _, _ in EXAMPLES:
+            find_date(text, EXAMPLE_TODAY)
+            find_time(text)
+    seconds = _time.perf_counter() - start
+    calls = rounds * len(EXAMPLES)
+    print(f"[Normalizer Benchmark] {calls}회: {seconds:.2f}초 (1회 평균 {seconds / calls * 1e6:.1f}µs)")
+
+
+if __name__ == "__main__":
+    failures = check_examples()
+    for text, expected, got in failures:
+        print(f"[Normalizer] '{text}': 기대 {expected}, 결과 {got}")
+    print(f"[Normalizer] 예시 {len(EXAMPLES) - len(failures)}/{len(EXAMPLES)} 통과")
+    benchmark()
@@ -0,0 +1,144 @@
+import os
+import time
+import socket
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from tools.video_processor import iter_frame_records
+from tools.udp_protocol import MAGIC, FrameAssembler
+
+# 로봇 카메라 UDP 스트림 설정 (leggedrobot/workspace/udp_receive.py와 같은 JPEG-over-UDP 형식)
+# JPEG 하나를 데이터그램 하나로 보내는 형식과 udp_protocol의 조각 형식을 모두 받습니다.
+UDP_HOST = os.getenv("VISION_UDP_HOST", "0.0.0.0")
+UDP_PORT = int(os.getenv("VISION_UDP_PORT", "5005"))
+BUFFER_SECONDS = float(os.getenv("VISION_UDP_BUFFER_SECONDS", "30"))  # 보관할 최근 영상 길이
+MAX_BUFFERED_FRAMES = 30 * 60  # 60fps로 30초 분량을 넘지 않도록 하는 상한
+MAX_DATAGRAM_SIZE = 65536
+
+JPEG_SOI = b"\xff\xd8"  # JPEG 시작 마커
+
+
+class UdpFrameSource:
+    """
+    로봇 카메라의 JPEG-over-UDP 스트림을 받아 최근 프레임을 링 버퍼에 보관합니다.
+
+    수신 스레드는 JPEG 바이트만 저장하고, 디코딩은 recent_frames()에서
+    분석에 쓰일 프레임에 대해서만 수행합니다.
+    """
+
+    def __init__(self, host=UDP_HOST, port=UDP_PORT, buffer_seconds=BUFFER_SECONDS,
+                 max_frames=MAX_BUFFERED_FRAMES):
+        self.host = host
+        self.port = port
+        self.buffer_seconds = buffer_seconds
+
+        self._frames = deque(maxlen=max_frames)  # (수신 시각, JPEG 바이트)
+        self._assembler = FrameAssembler()  # 조각으로 나뉘어 온 프레임 조립 (수신 스레드에서만 사용)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """소켓을 열고 수신 스레드를 시작합니다."""
+        if self._running:
+            return self
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.settimeout(0.5)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._receive_loop, name="udp-frame-source", daemon=True)
+        self._thread.start()
+
+        print(f"[UDP Stream] {self.host}:{self.port}에서 카메라 프레임 수신 시작")
+        return self
+
+    def stop(self):
+        """수신 스레드를 멈추고 소켓을 닫습니다."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _receive_loop(self):
+        while self._running:
+            try:
+                data, _ = self._sock.recvfrom(MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            # 조각 데이터그램은 프레임이 완성될 때만 저장하고, JPEG도 조각도 아닌 패킷은 무시
+            if data.startswith(MAGIC):
+                completed = self._assembler.add(data)
+                if completed is None:
+                    continue
+                data = completed[1]
+            elif not data.startswith(JPEG_SOI):
+                continue
+
+            now = time.monotonic()
+            with self._lock:
+                self._frames.append((now, data))
+
+                # 보관 기간이 지난 프레임 제거
+                while self._frames and now - self._frames[0][0] > self.buffer_seconds:
+                    self._frames.popleft()
+
+    def frame_count(self):
+        """현재 버퍼에 있는 프레임 수를 반환합니다."""
+        with self._lock:
+            return len(self._frames)
+
+    def recent_frames(self, seconds=10, interval_seconds=2):
+        """
+        최근 N초 동안 받은 프레임을 interval_seconds 간격으로 골라 프레임 정보로 만듭니다.
+
+        Args:
+            seconds (float): 분석할 최근 구간 길이 (초)
+            interval_seconds (float): 프레임 선택 간격 (초)
+
+        Returns:
+            List[dict]: extract_frames()와 같은 형식. 타임스탬프는 구간 시작 기준입니다.
+        """
+        now = time.monotonic()
+        window_start = now - seconds
+
+        with self._lock:
+            buffered = [item for item in self._frames if item[0] >= window_start]
+
+        if not buffered:
+            return []
+
+        # 구간 시작을 첫 프레임 수신 시각으로 맞춤
+        window_start = buffered[0][0]
+
+        # interval_seconds마다 그 시점 이후 첫 프레임을 선택
+        selected = []
+        next_time = window_start
+        for received_at, data in buffered:
+            if received_at >= next_time:
+                selected.append((received_at - window_start, data))
+                next_time = received_at + interval_seconds
+
+        samples = self._decode_samples(selected, now - window_start)
+        return list(iter_frame_records(samples))
+
+    @staticmethod
+    def _decode_samples(selected, window_length):
+        """선택된 JPEG만 디코딩하여 (start_time, end_time, frame)을 반환합니다."""
+        for i, (start_time, data) in enumerate(selected):
+            end_time = selected[i + 1][0] if i + 1 < len(selected) else window_length
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                yield start_time, end_time, frame
@@ -1,90 +1,469 @@
 import cv2
 import os
+import numpy as np
 
+# 디버깅용 프레임 이미지 저장 여부 (VISION_DEBUG_FRAMES=1 이면 temp/ 폴더에 저장)
+DEBUG_FRAMES_ENV = "VISION_DEBUG_FRAMES"
 
-def extract_frames(video_path, interval_seconds=2):
+# Vision API 전송용 이미지 전처리 설정
+# low: 긴 변 512px / high, auto: 2048px 안에 맞춘 뒤 짧은 변 768px (OpenAI가 실제로 사용하는 크기)
+IMAGE_DETAIL = os.getenv("VISION_IMAGE_DETAIL", "low")
+JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "80"))
+GRAYSCALE = os.getenv("VISION_GRAYSCALE", "").lower() in ("1", "true", "yes")
+
+# 시퀀셜 디코딩 자동 선택 기준이 되는 GOP(키프레임 간격) 길이 (프레임 수)
+# 파일에서 키프레임 간격을 읽지 못하면 x264 기본값(keyint=250)을 가정합니다.
+# 긴 GOP를 가정할수록 sequential 쪽으로 기울어, 잘못 가정해도 손해가 작습니다.
+DEFAULT_GOP_FRAMES = 250
+GOP_PROBE_PACKETS = int(os.getenv("VISION_GOP_PROBE_PACKETS", "300"))  # 키프레임을 찾을 최대 패킷 수
+
+
+def probe_gop(video_path, max_packets=GOP_PROBE_PACKETS):
     """
-    영상에서 N초마다 프레임을 추출합니다.
-    
+    영상 앞부분의 패킷을 디코딩 없이 읽어 평균 키프레임 간격을 구합니다.
+
+    raw 모드(CAP_PROP_FORMAT=-1)에서는 grab()이 압축된 패킷만 읽으므로
+    수백 패킷도 몇 밀리초 안에 확인할 수 있습니다.
+
+    Returns:
+        float | None: 평균 키프레임 간격 (프레임 수)
+            백엔드가 raw 모드를 지원하지 않거나 키프레임이 두 개 이상 보이지 않으면 None
+    """
+    key_frame_prop = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", None)
+    if key_frame_prop is None:
+        return None
+
+    video = cv2.VideoCapture(video_path)
+    try:
+        if not video.isOpened() or not video.set(cv2.CAP_PROP_FORMAT, -1):
+            return None
+
+        key_frames = []
+        for index in range(max_packets):
+            if not video.grab():
+                break
+            if video.get(key_frame_prop):
+                key_frames.append(index)
+    finally:
+        video.release()
+
+    if len(key_frames) < 2:
+        return None
+    return (key_frames[-1] - key_frames[0]) / (len(key_frames) - 1)
+
+
+def _select_mode(step_frames, gop_frames=None):
+    """
+    샘플 간격과 GOP 길이를 비교하여 디코딩 방식을 결정합니다.
+
+    seek 방식은 매 샘플마다 직전 키프레임부터 다시 디코딩하므로 평균 GOP/2 프레임을,
+    sequential 방식은 샘플 사이의 모든 프레임을 grab()(디코딩 포함) 합니다.
+    샘플 간격이 GOP/2 이하이면 sequential 방식이 더 적게 디코딩합니다.
+
+    Args:
+        step_frames (float): 샘플 간격 (프레임 수)
+        gop_frames (float | None): 키프레임 간격, None이면 DEFAULT_GOP_FRAMES
+    """
+    gop_frames = gop_frames or DEFAULT_GOP_FRAMES
+    return "sequential" if step_frames <= gop_frames / 2 else "seek"
+
+
+# 장면 변화 기반 샘플링 기본값
+SCENE_CHECK_INTERVAL = 0.5  # 장면 변화를 확인하는 간격 (초)
+SCENE_CHANGE_THRESHOLD = 12  # 64비트 dHash 중 몇 비트가 달라야 장면 변화로 볼지
+SCENE_MAX_GAP_SECONDS = 10  # 장면 변화가 없어도 이 간격마다 프레임을 추출
+
+
+def _debug_frames_enabled():
+    """환경 변수로 디버깅용 프레임 저장이 켜져 있는지 확인합니다."""
+    return os.getenv(DEBUG_FRAMES_ENV, "").lower() in ("1", "true", "yes")
+
+
+def encode_jpeg(frame, quality=None):
+    """
+    프레임을 메모리에서 JPEG으로 인코딩합니다.
+
+    Args:
+        frame (np.ndarray): BGR 또는 그레이스케일 프레임
+        quality (int | None): JPEG 품질 (1~100), None이면 OpenCV 기본값(95)
+
+    Returns:
+        bytes: JPEG 인코딩된 이미지
+
+    Raises:
+        ValueError: 인코딩에 실패한 경우
+    """
+    params = [] if quality is None else [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    success, buffer = cv2.imencode(".jpg", frame, params)
+    if not success:
+        raise ValueError("프레임을 JPEG으로 인코딩할 수 없습니다.")
+    return buffer.tobytes()
+
+
+def target_size(width, height, detail=None):
+    """
+    Vision API detail 설정에서 실제로 사용되는 크기를 넘지 않도록 목표 해상도를 계산합니다.
+
+    Returns:
+        tuple: (width, height) - 축소가 필요 없으면 원래 크기
+    """
+    detail = detail or IMAGE_DETAIL
+
+    if detail == "low":
+        scale = 512 / max(width, height)
+    else:
+        scale = min(2048 / max(width, height), 1.0)
+        scale *= min(768 / (min(width, height) * scale), 1.0)
+
+    if scale >= 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def preprocess_frame(frame, detail=None, quality=None, grayscale=None):
+    """
+    프레임을 detail 설정에 맞게 축소하고 JPEG으로 인코딩합니다.
+
+    Args:
+        frame (np.ndarray): BGR 프레임
+        detail (str | None): "low", "high" 또는 "auto" (None이면 IMAGE_DETAIL)
+        quality (int | None): JPEG 품질 (None이면 JPEG_QUALITY)
+        grayscale (bool | None): 흑백 변환 여부 (None이면 GRAYSCALE)
+
+    Returns:
+        tuple: (jpeg_bytes, (원본 width, height), (전송 width, height))
+    """
+    quality = JPEG_QUALITY if quality is None else quality
+    grayscale = GRAYSCALE if grayscale is None else grayscale
+
+    height, width = frame.shape[:2]
+    new_width, new_height = target_size(width, height, detail)
+
+    if (new_width, new_height) != (width, height):
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+    if grayscale:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    return encode_jpeg(frame, quality), (width, height), (new_width, new_height)
+
+
+def iter_frames(video_path, interval_seconds=2, mode="auto", save_to_disk=None):
+    """
+    영상에서 N초마다 프레임을 추출하여 하나씩 반환하는 이터레이터를 만듭니다.
+
+    전체 영상을 디코딩하기 전에 첫 프레임부터 바로 사용할 수 있습니다.
+    파일 확인 오류는 호출 시점에 바로 발생합니다.
+
     Args:
         video_path (str): 영상 파일 경로
         interval_seconds (int): 프레임 추출 간격 (초)
-        
+        mode (str): "auto", "sequential" 또는 "seek"
+            - sequential: grab()으로 순차 탐색하고 필요한 프레임만 retrieve()
+            - seek: 샘플마다 CAP_PROP_POS_FRAMES로 이동
+            - auto: 파일의 키프레임 간격(GOP)을 읽어 샘플 간격이 GOP/2 이하이면 sequential 선택
+        save_to_disk (bool | None): True면 temp/frame_N.jpg로도 저장 (디버깅용)
+            None이면 VISION_DEBUG_FRAMES 환경 변수를 따릅니다.
+
     Returns:
-        List[dict]: [
-            {"timestamp": "0-2초", "image_path": "temp/frame_0.jpg", "frame_index": 0},
-            {"timestamp": "2-4초", "image_path": "temp/frame_1.jpg", "frame_index": 1},
-            ...
-        ]
-        
+        Iterator[dict]: {"timestamp": "0-2초", "image_bytes": b"...", "frame_index": 0,
+                         "start_time": 0, "end_time": 2}
+            디스크에 저장한 경우 "image_path" 항목이 추가됩니다.
+
+    Raises:
+        FileNotFoundError: 영상 파일이 없는 경우
+        ValueError: 영상 파일이 손상된 경우 또는 알 수 없는 mode
+    """
+
+    if mode not in ("auto", "sequential", "seek"):
+        raise ValueError(f"알 수 없는 추출 모드입니다: {mode}")
+
+    video, fps, duration = _open_video(video_path)
+
+    if mode == "auto":
+        gop_frames = probe_gop(video_path)
+        mode = _select_mode(interval_seconds * fps, gop_frames)
+        gop_label = f"{gop_frames:.1f}프레임" if gop_frames else f"알 수 없음, {DEFAULT_GOP_FRAMES}프레임 가정"
+        print(f"[Video Info] 모드: {mode} (GOP: {gop_label})")
+    else:
+        print(f"[Video Info] 모드: {mode}")
+
+    if mode == "sequential":
+        samples = _read_sequential(video, fps, duration, interval_seconds)
+    else:
+        samples = _read_seek(video, fps, duration, interval_seconds)
+
+    # 파일 확인과 열기는 즉시 수행하고, 디코딩은 소비하는 쪽의 속도에 맞춰 진행합니다.
+    return _generate_frames(video, samples, save_to_disk)
+
+
+def _open_video(video_path):
+    """
+    영상을 열고 (video, fps, duration)을 반환합니다.
+
     Raises:
         FileNotFoundError: 영상 파일이 없는 경우
         ValueError: 영상 파일이 손상된 경우
     """
-    
+
     # 영상 파일 존재 확인
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"영상 파일을 찾을 수 없습니다: {video_path}")
-    
+
     # 영상 로드
     video = cv2.VideoCapture(video_path)
-    
+
     if not video.isOpened():
         raise ValueError(f"영상 파일을 열 수 없습니다. 파일이 손상되었거나 지원하지 않는 형식입니다: {video_path}")
-    
+
     # 영상 정보 추출
     fps = video.get(cv2.CAP_PROP_FPS)
     total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
     duration = total_frames / fps if fps > 0 else 0
-    
+
     print(f"[Video Info] FPS: {fps:.2f}, 총 프레임: {total_frames}, 길이: {duration:.2f}초")
-    
-    # temp 폴더 확인 및 생성
+
+    return video, fps, duration
+
+
+def _format_seconds(seconds):
+    """정수 초는 그대로, 그렇지 않으면 소수점 한 자리로 표시합니다."""
+    if abs(seconds - round(seconds)) < 0.05:
+        return f"{seconds:.0f}"
+    return f"{seconds:.1f}"
+
+
+def format_timestamp(start_time, end_time):
+    """구간을 "0-2초" 형식의 타임스탬프로 만듭니다."""
+    return f"{_format_seconds(start_time)}-{_format_seconds(end_time)}초"
+
+
+def _generate_frames(video, samples, save_to_disk=None):
+    """iter_frame_records()를 감싸고, 다 읽거나 중단되면 영상을 닫습니다."""
+    try:
+        yield from iter_frame_records(samples, save_to_disk)
+    finally:
+        video.release()
+
+
+def iter_frame_records(samples, save_to_disk=None):
+    """
+    샘플된 프레임을 JPEG으로 인코딩하고 프레임 정보를 하나씩 반환합니다.
+
+    영상 파일 외의 프레임 소스(UDP 스트림 등)에서도 같은 형식을 만들 때 사용합니다.
+
+    Args:
+        samples (Iterable[tuple]): (start_time, end_time, frame)을 순서대로 내놓는 이터레이터
+        save_to_disk (bool | None): 디버깅용 temp/ 저장 여부 - iter_frames() 참고
+
+    Returns:
+        Iterator[dict]: iter_frames()와 같은 형식의 프레임 정보
+    """
+
+    if save_to_disk is None:
+        save_to_disk = _debug_frames_enabled()
+
+    # 디버깅 모드에서만 temp 폴더 확인 및 생성
     temp_dir = "temp"
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    # 프레임 추출
-    frames_info = []
+    if save_to_disk:
+        os.makedirs(temp_dir, exist_ok=True)
+
     frame_index = 0
+
+    for start_time, end_time, frame in samples:
+        # detail 설정에 맞게 축소한 뒤 메모리에서 JPEG 인코딩
+        image_bytes, original_size, size = preprocess_frame(frame)
+
+        # 타임스탬프 계산
+        timestamp = format_timestamp(start_time, end_time)
+
+        frame_info = {
+            "timestamp": timestamp,
+            "image_bytes": image_bytes,
+            "frame_index": frame_index,
+            "start_time": start_time,
+            "end_time": end_time,
+            "original_size": original_size,
+            "size": size
+        }
+
+        # 디버깅용으로 인코딩된 바이트를 그대로 파일에 기록
+        if save_to_disk:
+            image_path = os.path.join(temp_dir, f"frame_{frame_index}.jpg")
+            with open(image_path, "wb") as f:
+                f.write(image_bytes)
+            frame_info["image_path"] = image_path
+            print(f"[Frame Extracted] {timestamp} → {image_path}")
+        else:
+            print(f"[Frame Extracted] {timestamp} ({size[0]}x{size[1]}, {len(image_bytes) / 1024:.1f} KB)")
+
+        yield frame_info
+        frame_index += 1
+
+    print(f"[Complete] 총 {frame_index}개의 프레임 추출 완료")
+
+
+def _read_seek(video, fps, duration, interval_seconds):
+    """샘플마다 프레임 위치를 지정하여 읽습니다. (start_time, end_time, frame)을 반환합니다."""
     current_second = 0
-    
+
     while current_second < duration:
         # 해당 시간의 프레임 번호 계산
         frame_number = int(current_second * fps)
-        
+
         # 프레임 위치 설정
         video.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        
+
         # 프레임 읽기
         success, frame = video.read()
-        
+
         if success:
-            # 이미지 파일로 저장
-            image_path = os.path.join(temp_dir, f"frame_{frame_index}.jpg")
-            cv2.imwrite(image_path, frame)
-            
-            # 타임스탬프 계산
-            start_time = current_second
-            end_time = min(current_second + interval_seconds, duration)
-            timestamp = f"{start_time:.0f}-{end_time:.0f}초"
-            
-            frames_info.append({
-                "timestamp": timestamp,
-                "image_path": image_path,
-                "frame_index": frame_index
-            })
-            
-            print(f"[Frame Extracted] {timestamp} → {image_path}")
-            frame_index += 1
-        
+            yield current_second, min(current_second + interval_seconds, duration), frame
+
         # 다음 추출 시간으로 이동
         current_second += interval_seconds
+
+
+def _read_sequential(video, fps, duration, interval_seconds):
+    """grab()으로 순차 탐색하고 샘플 위치의 프레임만 retrieve()합니다."""
+    current_second = 0
+    position = 0
+
+    while current_second < duration:
+        frame_number = int(current_second * fps)
+
+        # 목표 프레임 직전까지는 grab()만 수행 (BGR 변환 생략)
+        while position < frame_number:
+            if not video.grab():
+                return
+            position += 1
+
+        if not video.grab():
+            return
+        position += 1
+
+        success, frame = video.retrieve()
+
+        if success:
+            yield current_second, min(current_second + interval_seconds, duration), frame
+
+        current_second += interval_seconds
+
+
+def frame_signature(frame):
+    """
+    장면 비교용 64비트 차이 해시(dHash)를 계산합니다.
+
+    9x8 그레이스케일로 축소한 뒤 가로로 이웃한 픽셀의 밝기 대소를 비트로 만듭니다.
+    """
+    small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return gray[:, 1:] > gray[:, :-1]
+
+
+def signature_distance(a, b):
+    """두 dHash 사이의 해밍 거리(다른 비트 수)를 반환합니다."""
+    return int(np.count_nonzero(a != b))
+
+
+def iter_keyframes(video_path, threshold=SCENE_CHANGE_THRESHOLD,
+                   max_gap_seconds=SCENE_MAX_GAP_SECONDS,
+                   check_interval=SCENE_CHECK_INTERVAL, save_to_disk=None):
+    """
+    장면이 바뀔 때만 프레임을 추출하는 이터레이터를 만듭니다.
+
+    check_interval마다 프레임을 확인하고, 마지막으로 추출한 프레임과의 dHash 거리가
+    threshold 이상이거나 max_gap_seconds가 지나면 새 구간을 시작합니다.
+    각 프레임의 타임스탬프는 다음 프레임이 선택된 시점까지의 실제 구간입니다.
+
+    Args:
+        video_path (str): 영상 파일 경로
+        threshold (int): 장면 변화로 판단할 dHash 거리 (0~64)
+        max_gap_seconds (float): 추출 프레임 사이의 최대 간격 (초)
+        check_interval (float): 장면 변화 확인 간격 (초)
+        save_to_disk (bool | None): 디버깅용 temp/ 저장 여부 - iter_frames() 참고
+
+    Returns:
+        Iterator[dict]: iter_frames()와 같은 형식의 프레임 정보
+
+    Raises:
+        FileNotFoundError: 영상 파일이 없는 경우
+        ValueError: 영상 파일이 손상된 경우
+    """
+
+    video, fps, duration = _open_video(video_path)
+
+    print(f"[Video Info] 모드: scene (threshold: {threshold}, 최대 간격: {max_gap_seconds}초)")
+
+    samples = _read_keyframes(video, fps, duration, threshold, max_gap_seconds, check_interval)
+    return _generate_frames(video, samples, save_to_disk)
+
+
+def _read_keyframes(video, fps, duration, threshold, max_gap_seconds, check_interval):
+    """
+    check_interval마다 프레임을 확인하여 장면 변화 지점을 찾습니다.
+
+    구간 끝을 알아야 하므로 프레임 하나를 보류해 두었다가
+    다음 구간이 시작될 때 (start_time, end_time, frame)으로 반환합니다.
+    """
+    pending = None  # (start_time, frame, signature)
+
+    for current_second, _, frame in _read_sequential(video, fps, duration, check_interval):
+        signature = frame_signature(frame)
+
+        if pending is None:
+            pending = (current_second, frame, signature)
+            continue
+
+        start_time, pending_frame, pending_signature = pending
+        changed = signature_distance(signature, pending_signature) >= threshold
+        too_long = current_second - start_time >= max_gap_seconds
+
+        if changed or too_long:
+            yield start_time, current_second, pending_frame
+            pending = (current_second, frame, signature)
+
+    if pending is not None:
+        start_time, pending_frame, _ = pending
+        yield start_time, duration, pending_frame
+
+
+def extract_keyframes(video_path, threshold=SCENE_CHANGE_THRESHOLD,
+                      max_gap_seconds=SCENE_MAX_GAP_SECONDS,
+                      check_interval=SCENE_CHECK_INTERVAL, save_to_disk=None):
+    """
+    장면이 바뀔 때만 프레임을 추출합니다. 인자는 iter_keyframes()와 같습니다.
+
+    Returns:
+        List[dict]: extract_frames()와 같은 형식이며, 타임스탬프는 실제 구간 경계입니다.
+    """
+
+    return list(iter_keyframes(video_path, threshold, max_gap_seconds, check_interval, save_to_disk))
+
+
+def extract_frames(video_path, interval_seconds=2, mode="auto", save_to_disk=None):
+    """
+    영상에서 N초마다 프레임을 추출합니다.
     
-    video.release()
-    
-    print(f"[Complete] 총 {len(frames_info)}개의 프레임 추출 완료")
+    Args:
+        video_path (str): 영상 파일 경로
+        interval_seconds (int): 프레임 추출 간격 (초)
+        mode (str): 디코딩 방식 ("auto", "sequential", "seek") - iter_frames() 참고
+        save_to_disk (bool | None): 디버깅용 temp/ 저장 여부 - iter_frames() 참고
+        
+    Returns:
+        List[dict]: [
+            {"timestamp": "0-2초", "image_bytes": b"...", "frame_index": 0},
+            {"timestamp": "2-4초", "image_bytes": b"...", "frame_index": 1},
+            ...
+        ]
+        
+    Raises:
+        FileNotFoundError: 영상 파일이 없는 경우
+        ValueError: 영상 파일이 손상된 경우
+    """
     
-    return frames_info
+    return list(iter_frames(video_path, interval_seconds, mode, save_to_disk))
 
 
 def cleanup_temp_frames():
@@ -104,5 +483,3 @@ def cleanup_temp_frames():
                 os.remove(file_path)
             except Exception as e:
                 print(f"[Warning] 파일 삭제 실패: {file_path} - {e}")
-
-
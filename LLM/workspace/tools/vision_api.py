@@ -1,11 +1,15 @@
-import os
+import json
 import base64
-from openai import OpenAI
-from dotenv import load_dotenv
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from openai import APIConnectionError, APIStatusError, RateLimitError
+from services.openai_client import get_client, create_async_client
+from tools import vision_cache
+from tools.video_processor import IMAGE_DETAIL
 
-load_dotenv()
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+VISION_MODEL = "gpt-4o"
+API_ERROR_MESSAGE = "Vision API 호출 중 오류가 발생했습니다"  # 응답 대신 반환되는 오류 문구의 시작
 
 
 def encode_image(image_path):
@@ -22,25 +26,27 @@ def encode_image(image_path):
         return base64.b64encode(image_file.read()).decode('utf-8')
 
 
-def analyze_frames(frames_info, question):
+def encode_frame(frame_info):
     """
-    추출된 프레임들을 OpenAI Vision API로 분석합니다.
+    프레임 정보를 base64로 인코딩합니다.
+    
+    메모리에 있는 JPEG 바이트("image_bytes")를 우선 사용하고,
+    없을 때만 "image_path"의 파일을 읽습니다.
     
     Args:
-        frames_info (List[dict]): extract_frames()의 반환값
-        question (str): 사용자 질문
+        frame_info (dict): extract_frames()가 반환한 프레임 정보
         
     Returns:
-        str: 시간별 장면 묘사
+        str: base64 인코딩된 이미지 문자열
     """
-    
-    if not frames_info:
-        return "분석할 프레임이 없습니다."
-    
-    print(f"[Vision API] {len(frames_info)}개의 프레임 분석 시작...")
-    
-    # 프롬프트 구성
-    system_prompt = """Describe video scenes in Korean in a friendly way.
+    image_bytes = frame_info.get("image_bytes")
+    if image_bytes is not None:
+        return base64.b64encode(image_bytes).decode('utf-8')
+    return encode_image(frame_info["image_path"])
+
+
+# 프레임 분석용 시스템 프롬프트
+FRAMES_SYSTEM_PROMPT = """Describe video scenes in Korean in a friendly way.
 
 For each time segment shown, write descriptions in this format:
 
@@ -62,6 +68,74 @@ Style notes:
 
 Be conversational and natural."""
 
+# 프레임별 구조화 분석용 시스템 프롬프트 (JSON 응답)
+FRAMES_JSON_SYSTEM_PROMPT = """Describe video frames in Korean in a friendly way, one description per frame.
+
+Each image is preceded by its frame number and time segment, e.g. [#0 0-2초].
+Return JSON with one entry per frame: "index" is the frame number, "description" the scene description
+(without the timestamp), for example:
+"지금 우리는 실내에 있고, 주변은 밝은 거실이야. 왼쪽에는 소파, 오른쪽에는 책장이 있어. 정면에는 창문이 보여."
+
+Style notes:
+- Skip location description if unchanged from the previous frame
+- Mention people or moving objects first
+- List multiple objects: "너를 기준으로 [물체1], [물체2]"
+- Note camera movement: "앞으로 이동할게"
+- When sides are clear: "좌우 모두 특별한 물체는 보이지 않아"
+
+Be conversational and natural."""
+
+FRAMES_JSON_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "frame_descriptions",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "frames": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer"},
+                            "description": {"type": "string"},
+                        },
+                        "required": ["index", "description"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["frames"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# 단일 프레임 질문용 시스템 프롬프트
+FRAME_QUESTION_SYSTEM_PROMPT = """You are answering questions about a video scene in Korean.
+Be direct, natural, and conversational.
+Focus on answering the specific question asked."""
+
+# 병렬 분석 설정
+CHUNK_SIZE = 4  # 요청 하나에 담을 프레임 수
+MAX_CONCURRENCY = 4  # 동시에 보낼 최대 요청 수
+MAX_RETRIES = 4  # 429/5xx 응답 시 재시도 횟수
+RETRY_BASE_DELAY = 1.0  # 재시도 대기 시간 (초, 지수 증가)
+
+
+def _build_frames_content(frames_info, question, numbered=False, images=None):
+    """
+    프레임들을 Vision API 사용자 메시지로 구성합니다.
+    
+    Args:
+        numbered (bool): 타임스탬프 앞에 프레임 번호를 붙임 ([#0 0-2초])
+        images (list[str] | None): 이미 인코딩된 base64 이미지 (프레임 순서대로)
+    
+    Returns:
+        tuple: (user_content, frame_hashes, payload) - payload는 _add_payload() 참고
+    """
+    
     # 사용자 메시지 구성
     user_content = [
         {
@@ -71,14 +145,20 @@ Be conversational and natural."""
     ]
     
     # 각 프레임을 이미지로 추가
-    for frame in frames_info:
+    frame_hashes = []
+    payload = {"bytes": 0, "saved_bytes": 0}
+    for index, frame in enumerate(frames_info):
+        frame_hashes.append(vision_cache.hash_frame(frame))
+
         # 이미지 인코딩
-        base64_image = encode_image(frame["image_path"])
+        base64_image = images[index] if images is not None else encode_frame(frame)
+        _add_payload(payload, frame, len(base64_image))
         
         # 타임스탬프 텍스트 추가
+        label = f"#{index} {frame['timestamp']}" if numbered else frame['timestamp']
         user_content.append({
             "type": "text",
-            "text": f"\n[{frame['timestamp']}]"
+            "text": f"\n[{label}]"
         })
         
         # 이미지 추가
@@ -86,88 +166,468 @@ Be conversational and natural."""
             "type": "image_url",
             "image_url": {
                 "url": f"data:image/jpeg;base64,{base64_image}",
-                "detail": "low"  # 저해상도로 변경 (안전 필터 우회)
+                "detail": IMAGE_DETAIL  # 저해상도로 변경 (안전 필터 우회)
             }
         })
     
-    # Vision API 호출
+    return user_content, frame_hashes, payload
+
+
+def _add_payload(payload, frame_info, encoded_length):
+    """
+    전송할 이미지 크기와 축소로 절약한 크기를 누적합니다.
+    
+    절약량은 JPEG 크기가 픽셀 수에 거의 비례한다고 보고
+    원본 해상도로 보냈을 때의 크기를 추정하여 계산합니다.
+    """
+    payload["bytes"] += encoded_length
+    
+    original_size = frame_info.get("original_size")
+    size = frame_info.get("size")
+    if original_size and size:
+        ratio = (original_size[0] * original_size[1]) / (size[0] * size[1])
+        payload["saved_bytes"] += int(encoded_length * (ratio - 1))
+
+
+def _format_payload(payload):
+    """요청 하나의 이미지 전송량을 로그용 문자열로 만듭니다."""
+    return (f"이미지 {payload['bytes'] / 1024:.1f} KB 전송, "
+            f"축소로 약 {payload['saved_bytes'] / 1024:.1f} KB 절감")
+
+
+def _stream_completion(messages, max_tokens, cache_key, use_cache):
+    """
+    Vision API를 stream=True로 호출하여 텍스트 조각을 받는 대로 반환합니다.
+    
+    응답이 끝까지 도착한 경우에만 캐시에 저장하고,
+    오류가 나면 오류 메시지를 마지막 조각으로 반환합니다.
+    
+    Returns:
+        bool: 응답을 끝까지 받았으면 True, 오류로 끝났으면 False (yield from의 값)
+    """
+    parts = []
+    stream = None
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            max_tokens=3000,  # 구어체 안내만 생성
-            temperature=0.7
+        stream = get_client().chat.completions.create(
+            model=VISION_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True
         )
         
-        result = response.choices[0].message.content
-        print(f"[Vision API] 분석 완료")
-        
-        return result
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
         
     except Exception as e:
-        error_msg = f"Vision API 호출 중 오류가 발생했습니다: {str(e)}"
+        error_msg = f"{API_ERROR_MESSAGE}: {str(e)}"
         print(f"[Error] {error_msg}")
-        return error_msg
+        yield ("\n" if parts else "") + error_msg
+        return False
+    
+    finally:
+        # 중간에 취소(close)되어도 HTTP 연결을 바로 반환
+        if stream is not None:
+            stream.close()
+    
+    result = "".join(parts)
+    if use_cache and result:
+        vision_cache.put(cache_key, result)
+    return True
 
 
-def analyze_single_frame(frame_info, question):
+def analyze_frames_stream(frames_info, question, use_cache=True):
     """
-    단일 프레임에 대한 질문에 답변합니다.
+    analyze_frames()와 같지만 응답을 생성되는 대로 조각(str)으로 반환합니다.
+    
+    Args:
+        frames_info (Iterable[dict]): extract_frames() 또는 iter_frames()의 반환값
+        question (str): 사용자 질문
+        use_cache (bool): 같은 프레임/질문에 대한 이전 응답을 재사용할지 여부
+        
+    Yields:
+        str: 장면 묘사 텍스트 조각 (캐시 적중 시 전체 응답 한 번)
+    """
+    
+    if not frames_info:
+        yield "분석할 프레임이 없습니다."
+        return
+    
+    print(f"[Vision API] 프레임 분석 시작...")
+    
+    user_content, frame_hashes, payload = _build_frames_content(frames_info, question)
+    
+    if not frame_hashes:
+        yield "분석할 프레임이 없습니다."
+        return
+    
+    # 캐시 확인
+    cache_key = vision_cache.make_key(frame_hashes, question, FRAMES_SYSTEM_PROMPT, VISION_MODEL)
+    if use_cache:
+        cached = vision_cache.get(cache_key)
+        if cached is not None:
+            print(f"[Vision Cache] 캐시된 응답 사용 ({len(frame_hashes)}개 프레임)")
+            yield cached
+            return
+    
+    print(f"[Vision API] {len(frame_hashes)}개의 프레임 전송 중... ({_format_payload(payload)})")
+    
+    # Vision API 호출
+    messages = [
+        {"role": "system", "content": FRAMES_SYSTEM_PROMPT},
+        {"role": "user", "content": user_content}
+    ]
+    yield from _stream_completion(messages, 3000, cache_key, use_cache)  # 구어체 안내만 생성
+    
+    print(f"\n[Vision API] 분석 완료")
+
+
+def analyze_frames(frames_info, question, use_cache=True):
+    """
+    추출된 프레임들을 OpenAI Vision API로 분석합니다.
     
     Args:
-        frame_info (dict): 프레임 정보 {"timestamp": "0-2초", "image_path": "...", ...}
+        frames_info (Iterable[dict]): extract_frames() 또는 iter_frames()의 반환값
+            iter_frames()를 넘기면 디코딩과 인코딩이 프레임 단위로 겹쳐 진행됩니다.
         question (str): 사용자 질문
+        use_cache (bool): 같은 프레임/질문에 대한 이전 응답을 재사용할지 여부
         
     Returns:
-        str: 질문에 대한 답변
+        str: 시간별 장면 묘사
+    """
+    
+    return "".join(analyze_frames_stream(frames_info, question, use_cache))
+
+
+def _describe_chunk(frames, question, use_cache, images=None):
+    """
+    프레임 묶음 하나의 프레임별 설명을 JSON(structured output)으로 받습니다.
+    
+    Returns:
+        dict | None: 묶음 안의 프레임 번호 -> 설명.
+            응답이 max_tokens에서 잘렸거나(finish_reason == "length"), JSON을 해석할 수 없거나,
+            API 오류가 나면 None (이런 응답은 캐시하지 않음)
+    """
+    
+    user_content, frame_hashes, payload = _build_frames_content(frames, question, numbered=True, images=images)
+    cache_key = vision_cache.make_key(frame_hashes, question, FRAMES_JSON_SYSTEM_PROMPT, VISION_MODEL)
+    span = f"{frames[0]['timestamp']} ~ {frames[-1]['timestamp']}"
+    
+    content = vision_cache.get(cache_key) if use_cache else None
+    cached = content is not None
+    if cached:
+        print(f"[Vision Cache] 캐시된 응답 사용 ({span})")
+    else:
+        print(f"[Vision API] {span} {len(frames)}개의 프레임 전송 중... ({_format_payload(payload)})")
+        try:
+            response = get_client().chat.completions.create(
+                model=VISION_MODEL,
+                messages=[
+                    {"role": "system", "content": FRAMES_JSON_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_content}
+                ],
+                max_tokens=3000,
+                temperature=0.7,
+                response_format=FRAMES_JSON_SCHEMA
+            )
+        except Exception as e:
+            print(f"[Error] {API_ERROR_MESSAGE} ({span}): {str(e)}")
+            return None
+        
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            print(f"[Error] {span} 응답이 max_tokens에서 잘렸습니다")
+            return None
+        content = choice.message.content
+    
+    try:
+        descriptions = {
+            item["index"]: item["description"].strip()
+            for item in json.loads(content)["frames"]
+            if isinstance(item["index"], int) and 0 <= item["index"] < len(frames)
+        }
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"[Error] {span} 프레임별 응답을 해석할 수 없습니다: {e}")
+        return None
+    
+    # 온전한 응답만 캐시
+    if use_cache and not cached and descriptions:
+        vision_cache.put(cache_key, content)
+    return descriptions
+
+
+def analyze_frames_structured(frames_info, question, use_cache=True, images=None,
+                              chunk_size=CHUNK_SIZE, max_concurrency=MAX_CONCURRENCY):
+    """
+    프레임별 설명을 JSON(structured output)으로 받아 프레임 번호에 맞춰 반환합니다.
+    
+    응답 텍스트를 타임스탬프로 다시 나누지 않으므로 모델의 서식이 조금 달라져도
+    설명이 엉뚱한 프레임에 붙거나 사라지지 않습니다.
+    프레임은 chunk_size개씩 나눠 동시에 요청하므로 긴 영상도 응답이 max_tokens에서 잘리지 않고,
+    한 묶음의 응답이 잘리거나 깨지면 그 묶음만 프레임 하나씩 다시 요청합니다.
+    
+    Args:
+        frames_info (Iterable[dict]): extract_frames() 또는 iter_frames()의 반환값
+        question (str): 사용자 질문
+        use_cache (bool): 같은 프레임/질문에 대한 이전 응답을 재사용할지 여부
+        images (list[str] | None): 이미 인코딩된 base64 이미지 (프레임 순서대로)
+        chunk_size (int): 요청 하나에 담을 프레임 수
+        max_concurrency (int): 동시에 보낼 최대 요청 수
+        
+    Returns:
+        List[dict]: [{"frame_index": 0, "timestamp": "0-2초", "description": "..." 또는 None}, ...]
+    """
+    
+    frames = list(frames_info)
+    if not frames:
+        return []
+    
+    print(f"[Vision API] 프레임별 분석 시작...")
+    
+    def describe(start):
+        chunk = frames[start:start + chunk_size]
+        chunk_images = images[start:start + chunk_size] if images is not None else None
+        descriptions = _describe_chunk(chunk, question, use_cache, chunk_images)
+        
+        if descriptions is None and len(chunk) > 1:
+            descriptions = {}
+            for offset, frame in enumerate(chunk):
+                single = _describe_chunk([frame], question, use_cache,
+                                         [chunk_images[offset]] if chunk_images is not None else None)
+                if single and 0 in single:
+                    descriptions[offset] = single[0]
+        
+        return {start + offset: description for offset, description in (descriptions or {}).items()}
+    
+    descriptions = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for part in pool.map(describe, range(0, len(frames), chunk_size)):
+            descriptions.update(part)
+    
+    print(f"[Vision API] 분석 완료 ({len(descriptions)}/{len(frames)}개 프레임)")
+    return [
+        {"frame_index": i, "timestamp": frame["timestamp"], "description": descriptions.get(i)}
+        for i, frame in enumerate(frames)
+    ]
+
+
+def _is_retryable(error):
+    """429(요청 한도 초과), 5xx, 연결 오류만 재시도 대상으로 봅니다."""
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+async def _analyze_chunk(async_client, semaphore, chunk, question, use_cache):
+    """
+    프레임 묶음 하나를 분석합니다. 재시도 가능한 오류는 지수 백오프로 재시도합니다.
+
+    Returns:
+        tuple: (묘사 또는 오류 문구, 성공 여부)
+    """
+    
+    user_content, frame_hashes, payload = _build_frames_content(chunk, question)
+    span = f"{chunk[0]['timestamp']} ~ {chunk[-1]['timestamp']}"
+    
+    cache_key = vision_cache.make_key(frame_hashes, question, FRAMES_SYSTEM_PROMPT, VISION_MODEL)
+    if use_cache:
+        cached = vision_cache.get(cache_key)
+        if cached is not None:
+            print(f"[Vision Cache] 캐시된 응답 사용 ({span})")
+            return cached, True
+    
+    async with semaphore:
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await async_client.chat.completions.create(
+                    model=VISION_MODEL,
+                    messages=[
+                        {"role": "system", "content": FRAMES_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_content}
+                    ],
+                    max_tokens=3000,
+                    temperature=0.7
+                )
+                result = response.choices[0].message.content
+                print(f"[Vision API] 구간 분석 완료: {span} ({_format_payload(payload)})")
+                
+                if use_cache and result:
+                    vision_cache.put(cache_key, result)
+                
+                return result, True
+            
+            except Exception as e:
+                if attempt < MAX_RETRIES and _is_retryable(e):
+                    delay = RETRY_BASE_DELAY * (2 ** attempt) * (1 + random.random())
+                    print(f"[Vision API] {span} 재시도 {attempt + 1}/{MAX_RETRIES} ({delay:.1f}초 후): {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                error_msg = f"{API_ERROR_MESSAGE} ({span}): {str(e)}"
+                print(f"[Error] {error_msg}")
+                return error_msg, False
+
+
+async def analyze_frames_concurrent_async(frames_info, question, chunk_size=CHUNK_SIZE,
+                                          max_concurrency=MAX_CONCURRENCY, use_cache=True,
+                                          async_client=None, with_errors=False):
+    """
+    프레임을 chunk_size개씩 나누어 동시에 분석하고 시간 순서대로 합칩니다.
+    
+    Args:
+        frames_info (Iterable[dict]): extract_frames() 또는 iter_frames()의 반환값
+        question (str): 사용자 질문
+        chunk_size (int): 요청 하나에 담을 프레임 수
+        max_concurrency (int): 동시에 보낼 최대 요청 수
+        use_cache (bool): 구간별로 이전 응답을 재사용할지 여부
+        async_client (AsyncOpenAI | None): 사용할 클라이언트 (없으면 create_async_client()로 생성)
+        with_errors (bool): True면 실패한 구간의 오류 문구 목록도 함께 반환
+        
+    Returns:
+        str: 시간별 장면 묘사 (실패한 구간은 그 자리에 오류 문구)
+        with_errors=True면 (묘사, [오류 문구, ...])
+    """
+    
+    frames = list(frames_info)
+    if not frames:
+        message = "분석할 프레임이 없습니다."
+        return (message, []) if with_errors else message
+    
+    chunks = [frames[i:i + chunk_size] for i in range(0, len(frames), chunk_size)]
+    print(f"[Vision API] {len(frames)}개의 프레임을 {len(chunks)}개 구간으로 병렬 분석 시작 (동시 {max_concurrency}개)")
+    
+    # 재시도는 직접 처리하므로 SDK 자체 재시도는 끕니다.
+    owns_client = async_client is None
+    if owns_client:
+        async_client = create_async_client(max_retries=0)
+    
+    try:
+        semaphore = asyncio.Semaphore(max_concurrency)
+        # gather()는 입력 순서대로 결과를 돌려주므로 시간 순서가 유지됩니다.
+        results = await asyncio.gather(*(
+            _analyze_chunk(async_client, semaphore, chunk, question, use_cache)
+            for chunk in chunks
+        ))
+    finally:
+        if owns_client:
+            await async_client.close()
+    
+    print(f"[Vision API] 분석 완료")
+    description = "\n\n".join(result.strip() for result, _ in results if result)
+    if with_errors:
+        return description, [result for result, ok in results if not ok]
+    return description
+
+
+def analyze_frames_concurrent(frames_info, question, chunk_size=CHUNK_SIZE,
+                              max_concurrency=MAX_CONCURRENCY, use_cache=True):
+    """
+    analyze_frames_concurrent_async()의 동기 버전입니다.
+    
+    긴 영상에서도 전체 소요 시간이 프레임 수가 아닌 구간별 응답 시간에 비례하고,
+    구간마다 max_tokens 한도를 따로 가지므로 답변이 잘리지 않습니다.
+    """
+    return asyncio.run(analyze_frames_concurrent_async(
+        frames_info, question, chunk_size, max_concurrency, use_cache
+    ))
+
+
+def analyze_single_frame_stream(frame_info, question, use_cache=True, description=None,
+                                history=None, base64_image=None):
+    """
+    analyze_single_frame()과 같지만 답변을 생성되는 대로 조각(str)으로 반환합니다.
+    
+    Args:
+        frame_info (dict): 프레임 정보 {"timestamp": "0-2초", "image_bytes": b"...", ...}
+        question (str): 사용자 질문
+        use_cache (bool): 같은 프레임/질문에 대한 이전 응답을 재사용할지 여부
+        description (str | None): 이 프레임의 기본 설명 (문맥으로 함께 전달)
+        history (list[tuple] | None): 이 프레임에 대한 이전 (질문, 답변) 목록
+        base64_image (str | None): 이미 인코딩된 이미지 (없으면 frame_info에서 인코딩)
+        
+    Yields:
+        str: 답변 텍스트 조각 (캐시 적중 시 전체 답변 한 번)
+    
+    Returns:
+        bool: 답변을 끝까지 받았으면 True, 오류 문구로 끝났으면 False (yield from의 값)
     """
     
     if not frame_info:
-        return "분석할 프레임이 없습니다."
+        yield "분석할 프레임이 없습니다."
+        return False
     
-    # 프롬프트 구성
-    system_prompt = """You are answering questions about a video scene in Korean.
-Be direct, natural, and conversational.
-Focus on answering the specific question asked."""
+    history = history or []
+    
+    # 캐시 확인 (기본 설명과 이전 대화도 키에 포함)
+    context = json.dumps([description, history], ensure_ascii=False) if description or history else ""
+    cache_key = vision_cache.make_key(
+        [vision_cache.hash_frame(frame_info)], question, FRAME_QUESTION_SYSTEM_PROMPT + context, VISION_MODEL
+    )
+    if use_cache:
+        cached = vision_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return True
 
     # 이미지 인코딩
-    base64_image = encode_image(frame_info["image_path"])
+    if base64_image is None:
+        base64_image = encode_frame(frame_info)
+    payload = {"bytes": 0, "saved_bytes": 0}
+    _add_payload(payload, frame_info, len(base64_image))
+    print(f"[Vision API] {_format_payload(payload)}")
     
-    # 사용자 메시지 구성
-    user_content = [
-        {
-            "type": "text",
-            "text": f"이 장면에 대한 질문: {question}"
-        },
-        {
-            "type": "image_url",
-            "image_url": {
-                "url": f"data:image/jpeg;base64,{base64_image}",
-                "detail": "low"
-            }
+    image_part = {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:image/jpeg;base64,{base64_image}",
+            "detail": IMAGE_DETAIL
         }
-    ]
+    }
+    
+    if not context:
+        # 사용자 메시지 구성
+        messages = [
+            {"role": "system", "content": FRAME_QUESTION_SYSTEM_PROMPT},
+            {"role": "user", "content": [
+                {"type": "text", "text": f"이 장면에 대한 질문: {question}"},
+                image_part
+            ]}
+        ]
+    else:
+        # 이미지와 기본 설명을 맨 앞에 고정하고 이전 대화를 이어 붙임
+        # (같은 프레임의 후속 질문은 앞부분이 같아 프롬프트 캐시가 적용됨)
+        scene = [image_part]
+        if description:
+            scene.append({"type": "text", "text": f"이 장면의 기본 설명: {description}"})
+        messages = [
+            {"role": "system", "content": FRAME_QUESTION_SYSTEM_PROMPT},
+            {"role": "user", "content": scene}
+        ]
+        for previous_question, previous_answer in history:
+            messages.append({"role": "user", "content": f"이 장면에 대한 질문: {previous_question}"})
+            messages.append({"role": "assistant", "content": previous_answer})
+        messages.append({"role": "user", "content": f"이 장면에 대한 질문: {question}"})
     
     # Vision API 호출
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            max_tokens=500,  # 짧은 답변
-            temperature=0.7
-        )
-        
-        result = response.choices[0].message.content
-        return result
-        
-    except Exception as e:
-        error_msg = f"Vision API 호출 중 오류가 발생했습니다: {str(e)}"
-        print(f"[Error] {error_msg}")
-        return error_msg
+    return (yield from _stream_completion(messages, 500, cache_key, use_cache))  # 짧은 답변
 
+
+def analyze_single_frame(frame_info, question, use_cache=True):
+    """
+    단일 프레임에 대한 질문에 답변합니다.
+    
+    Args:
+        frame_info (dict): 프레임 정보 {"timestamp": "0-2초", "image_bytes": b"...", ...}
+        question (str): 사용자 질문
+        use_cache (bool): 같은 프레임/질문에 대한 이전 응답을 재사용할지 여부
+        
+    Returns:
+        str: 질문에 대한 답변
+    """
+    
+    return "".join(analyze_single_frame_stream(frame_info, question, use_cache))
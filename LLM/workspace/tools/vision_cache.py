@@ -0,0 +1,157 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Vision API 응답 캐시 설정
+CACHE_PATH = os.getenv("VISION_CACHE_PATH", os.path.join("cache", "vision_cache.sqlite3"))
+CACHE_TTL_SECONDS = int(os.getenv("VISION_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))  # 7일
+CACHE_MAX_ENTRIES = int(os.getenv("VISION_CACHE_MAX_ENTRIES", "1000"))
+
+_conn = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _get_connection():
+    """캐시 DB 연결을 처음 사용할 때 한 번만 엽니다."""
+    global _conn
+
+    if _conn is None:
+        directory = os.path.dirname(CACHE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vision_cache (
+                key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_vision_cache_accessed ON vision_cache (accessed_at)")
+        _conn.commit()
+
+    return _conn
+
+
+def normalize_question(question):
+    """대소문자와 공백 차이만 있는 질문이 같은 키를 갖도록 정규화합니다."""
+    return " ".join((question or "").lower().split())
+
+
+def make_key(frame_hashes, question, system_prompt, model):
+    """
+    프레임 해시, 정규화된 질문, 시스템 프롬프트, 모델 이름으로 캐시 키를 만듭니다.
+
+    Args:
+        frame_hashes (List[str]): hash_frame()으로 계산한 프레임별 해시 (순서 유지)
+        question (str): 사용자 질문
+        system_prompt (str): 시스템 프롬프트
+        model (str): 모델 이름
+
+    Returns:
+        str: sha256 hex 문자열
+    """
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, normalize_question(question)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    for frame_hash in frame_hashes:
+        digest.update(frame_hash.encode("ascii"))
+    return digest.hexdigest()
+
+
+def hash_frame(frame_info):
+    """
+    프레임의 JPEG 바이트와 타임스탬프로 해시를 계산합니다.
+
+    타임스탬프도 응답 내용([0-2초] 등)에 들어가므로 키에 포함합니다.
+    """
+    digest = hashlib.sha256(frame_info.get("timestamp", "").encode("utf-8"))
+    image_bytes = frame_info.get("image_bytes")
+    if image_bytes is None:
+        with open(frame_info["image_path"], "rb") as f:
+            image_bytes = f.read()
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+def get(key):
+    """
+    캐시된 응답을 조회합니다. 만료된 항목은 없는 것으로 취급합니다.
+
+    Returns:
+        str | None: 캐시된 응답
+    """
+    now = time.time()
+
+    with _lock:
+        conn = _get_connection()
+        row = conn.execute(
+            "SELECT answer, created_at FROM vision_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or now - row[1] > CACHE_TTL_SECONDS:
+            _stats["misses"] += 1
+            return None
+
+        conn.execute("UPDATE vision_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        _stats["hits"] += 1
+        return row[0]
+
+
+def put(key, answer):
+    """응답을 저장하고, 만료되었거나 최대 개수를 넘는 오래된 항목을 정리합니다."""
+    now = time.time()
+
+    with _lock:
+        conn = _get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO vision_cache (key, answer, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, answer, now, now),
+        )
+
+        # TTL 만료 항목 삭제
+        expired = conn.execute(
+            "DELETE FROM vision_cache WHERE created_at < ?", (now - CACHE_TTL_SECONDS,)
+        ).rowcount
+
+        # 최대 개수 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+        overflow = conn.execute(
+            """
+            DELETE FROM vision_cache WHERE key IN (
+                SELECT key FROM vision_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (CACHE_MAX_ENTRIES,),
+        ).rowcount
+
+        conn.commit()
+        _stats["evictions"] += expired + overflow
+
+
+def get_stats():
+    """현재 프로세스의 캐시 적중/실패/삭제 횟수를 반환합니다."""
+    with _lock:
+        stats = dict(_stats)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    return stats
+
+
+def clear():
+    """캐시를 모두 비우고 통계를 초기화합니다."""
+    with _lock:
+        conn = _get_connection()
+        conn.execute("DELETE FROM vision_cache")
+        conn.commit()
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,81 @@
+from tools.vision_api import encode_frame, analyze_frames_structured, analyze_single_frame_stream
+
+BASIC_QUESTION = "지금 뭐가 보여?"
+
+
+class VisionSession:
+    """
+    영상 한 편의 분석 상태를 프레임 번호로 보관합니다.
+
+    - frames: 추출된 프레임 정보
+    - descriptions: 프레임 번호 -> 기본 설명 (설명을 받지 못한 프레임은 None)
+    - 인코딩된 이미지와 프레임별 후속 질문 기록
+
+    이미지는 프레임마다 한 번만 인코딩하고, 후속 질문에는 같은 이미지와
+    기본 설명, 이전 질문/답변을 문맥으로 함께 보냅니다.
+    """
+
+    def __init__(self, frames_info):
+        self.frames = list(frames_info)
+        self.descriptions = {}
+        self._images = {}  # 프레임 번호 -> base64 JPEG
+        self._history = {}  # 프레임 번호 -> [(질문, 답변)]
+
+    def __len__(self):
+        return len(self.frames)
+
+    def image(self, index):
+        """프레임의 base64 이미지 (처음 요청할 때 한 번만 인코딩)"""
+        if index not in self._images:
+            self._images[index] = encode_frame(self.frames[index])
+        return self._images[index]
+
+    def describe(self, question=BASIC_QUESTION, use_cache=True):
+        """
+        모든 프레임의 기본 설명을 받아 프레임 번호별로 저장합니다. (CHUNK_SIZE개씩 나눈 요청)
+
+        Returns:
+            List[dict]: analyze_frames_structured()의 결과
+        """
+        images = [self.image(i) for i in range(len(self.frames))]
+        results = analyze_frames_structured(self.frames, question, use_cache, images=images)
+        self.descriptions = {result["frame_index"]: result["description"] for result in results}
+        return results
+
+    def description(self, index):
+        return self.descriptions.get(index)
+
+    def history(self, index):
+        """프레임에 대한 이전 (질문, 답변) 목록"""
+        return list(self._history.get(index, []))
+
+    def ask_stream(self, index, question, use_cache=True):
+        """
+        프레임에 대한 후속 질문에 답변을 생성되는 대로 조각(str)으로 반환하고,
+        답변을 끝까지 받았으면 이 프레임의 대화 기록에 추가합니다.
+        (API 오류 문구는 기록하지 않으므로 다음 질문의 문맥과 캐시 키에 들어가지 않습니다)
+        """
+        stream = analyze_single_frame_stream(
+            self.frames[index], question, use_cache,
+            description=self.description(index),
+            history=self.history(index),
+            base64_image=self.image(index),
+        )
+        parts = []
+        try:
+            while True:
+                try:
+                    chunk = next(stream)
+                except StopIteration as finished:
+                    completed = finished.value
+                    break
+                parts.append(chunk)
+                yield chunk
+        finally:
+            stream.close()
+
+        if completed:
+            self._history.setdefault(index, []).append((question, "".join(parts)))
+
+    def ask(self, index, question, use_cache=True):
+        return "".join(self.ask_stream(index, question, use_cache))
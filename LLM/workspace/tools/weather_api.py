@@ -1,20 +1,68 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
 
+# 도시별 캐시 설정 (초)
+CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))  # 이 시간 동안은 바로 캐시 응답
+STALE_TTL_SECONDS = float(os.getenv("WEATHER_STALE_TTL_SECONDS", "3600"))  # 이 시간까지는 오래된 응답도 사용 가능
+STALE_WAIT_SECONDS = 1.0  # 오래된 응답이 있을 때 새 응답을 기다리는 최대 시간
 
-def get_weather(city: str):
-    url = (
-        f"https://api.openweathermap.org/data/2.5/weather?"
-        f"q={city}&appid={OPENWEATHER_API_KEY}&units=metric&lang=kr"
-    )
+# HTTP 설정: 재시도까지 포함한 최악의 경우((1 + MAX_RETRIES) x (연결 + 읽기))가
+# REQUEST_DEADLINE_SECONDS 안에 들어가고, 그 시간은 weather_agent의 도구 timeout(15초)보다 짧게
+CONNECT_TIMEOUT = 2.0
+READ_TIMEOUT = 3.0
+MAX_RETRIES = 1
+REQUEST_DEADLINE_SECONDS = 12.0  # 캐시가 없을 때 get_weather가 응답을 기다리는 최대 시간
+
+_session = None
+_cache = {}  # 도시 키 -> (조회 시각, 결과)
+_inflight = {}  # 도시 키 -> 진행 중인 조회 Future
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather")
+
+
+def _get_session():
+    """연결 풀과 재시도 설정이 된 requests 세션을 처음 사용할 때 만듭니다."""
+    global _session
+
+    if _session is None:
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=10))
+        session.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=10))
+        _session = session
 
-    response = requests.get(url)
-    data = response.json()
+    return _session
 
-    if response.status_code != 200:
-        return {"error": data.get("message", "API 요청 실패")}
+
+def _fetch_weather(city: str):
+    """OpenWeatherMap에서 현재 날씨를 조회합니다. (캐시 없이 항상 요청)"""
+    response = _get_session().get(
+        OPENWEATHER_URL,
+        params={"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric", "lang": "kr"},
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+    )
+    try:
+        data = response.json()
+    except ValueError:  # 프록시/게이트웨이의 HTML 오류 페이지 등
+        data = {}
+
+    if response.status_code != 200 or "main" not in data:
+        return {"error": data.get("message", f"API 요청 실패 (HTTP {response.status_code})")}
 
     return {
         "도시": data["name"],
@@ -24,3 +72,72 @@ def get_weather(city: str):
         "습도": data["main"]["humidity"],
         "풍속": data["wind"]["speed"],
     }
+
+
+def _refresh(key: str, city: str):
+    """조회 결과를 캐시에 저장합니다. 오류 응답은 저장하지 않습니다."""
+    try:
+        result = _fetch_weather(city)
+        if "error" not in result:
+            with _lock:
+                _cache[key] = (time.monotonic(), result)
+        return result
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def _start_refresh(key: str, city: str):
+    """
+    같은 도시에 대한 조회가 이미 진행 중이면 그 Future를, 아니면 새 조회를 시작합니다.
+    (동시에 들어온 같은 도시 요청은 HTTP 요청 하나를 공유)
+    """
+    with _lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _executor.submit(_refresh, key, city)
+            _inflight[key] = future
+        return future
+
+
+def get_weather(city: str):
+    """
+    도시의 현재 날씨를 반환합니다.
+
+    - CACHE_TTL_SECONDS 이내의 결과는 바로 반환
+    - 그보다 오래되었지만 STALE_TTL_SECONDS 이내라면 새로 조회하되,
+      STALE_WAIT_SECONDS 안에 응답이 없거나 실패하면 이전 결과를 반환
+    - 캐시가 없으면 조회가 끝날 때까지 기다리되, REQUEST_DEADLINE_SECONDS가 지나면 오류를 반환
+    """
+    key = city.strip().lower()
+
+    with _lock:
+        entry = _cache.get(key)
+
+    age = time.monotonic() - entry[0] if entry else None
+
+    if entry and age < CACHE_TTL_SECONDS:
+        return entry[1]
+
+    future = _start_refresh(key, city)
+
+    if entry and age < STALE_TTL_SECONDS:
+        try:
+            result = future.result(timeout=STALE_WAIT_SECONDS)
+        except FutureTimeoutError:
+            return entry[1]
+        except Exception:
+            return entry[1]
+        return entry[1] if "error" in result else result
+
+    try:
+        return future.result(timeout=REQUEST_DEADLINE_SECONDS)
+    except FutureTimeoutError:
+        return {"error": f"날씨 API가 {REQUEST_DEADLINE_SECONDS:.0f}초 안에 응답하지 않았습니다"}
+
+
+def clear_cache():
+    """날씨 캐시를 비웁니다."""
+    with _lock:
+        _cache.clear()
+
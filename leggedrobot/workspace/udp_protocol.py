@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+한 데이터그램보다 큰 JPEG를 여러 조각으로 나눠 보내는 UDP 프레이밍 프로토콜
+
+조각 헤더 (19바이트, 빅엔디언):
+    magic "UF" | version | frame_id (uint32) | chunk_index (uint16) | chunk_count (uint16) | timestamp (float64)
+
+JPEG는 항상 SOI(FF D8)로 시작하므로 헤더 없이 JPEG 하나를 통째로 보내는
+기존 송신기의 데이터그램과 구분됩니다.
+
+    python udp_protocol.py --loss 0.02 --reorder 0.1   # 손실/순서 뒤바뀜 주입 테스트
+"""
+import time
+import struct
+import random
+import argparse
+
+MAGIC = b"UF"
+VERSION = 1
+HEADER = struct.Struct(">2sBIHHd")
+FRAME_ID_MASK = 0xFFFFFFFF
+
+CHUNK_PAYLOAD_SIZE = 1400  # 일반적인 MTU(1500) 안에 들어가 IP 단편화가 생기지 않는 크기
+MAX_CHUNKS = 0xFFFF
+
+REASSEMBLY_TIMEOUT = 0.5  # 이 시간 안에 조각이 다 모이지 않은 프레임은 버림 (초)
+MAX_PENDING_FRAMES = 8  # 동시에 조립 중인 프레임 수 상한
+MAX_PENDING_BYTES = 8 * 1024 * 1024  # 조립 중인 조각의 총 크기 상한
+RESTART_GAP = 32  # 마지막 완성 프레임보다 이만큼 이상 뒤의 번호가 오면 송신기가 다시 시작한 것으로 봄
+# 뒤의 번호라도 송신 시각이 마지막 완성 프레임보다 늦으면 바로 다시 시작한 것으로 봅니다.
+# (송신기 시계가 뒤로 가서 송신 시각을 믿을 수 없을 때는 위의 두 기준이 대신 감지합니다.)
+RESTART_TIMEOUT = 1.0  # 이 시간 동안 완성된 프레임 없이 오래된 번호만 오면 다시 시작한 것으로 봄 (초)
+
+
+def split_frame(data, frame_id, sent_at=None, chunk_size=CHUNK_PAYLOAD_SIZE):
+    """JPEG 바이트를 헤더가 붙은 데이터그램 목록으로 나눕니다."""
+    if sent_at is None:
+        sent_at = time.time()
+    count = max(1, -(-len(data) // chunk_size))
+    if count > MAX_CHUNKS:
+        raise ValueError(f"프레임이 너무 큽니다: {len(data)} bytes")
+
+    frame_id &= FRAME_ID_MASK
+    return [
+        HEADER.pack(MAGIC, VERSION, frame_id, index, count, sent_at) + data[index * chunk_size:(index + 1) * chunk_size]
+        for index in range(count)
+    ]
+
+
+def parse_chunk(datagram):
+    """조각 데이터그램을 (frame_id, chunk_index, chunk_count, timestamp, payload)로 읽습니다. 형식이 다르면 None."""
+    if len(datagram) < HEADER.size or datagram[:2] != MAGIC:
+        return None
+    magic, version, frame_id, index, count, sent_at = HEADER.unpack_from(datagram)
+    if version != VERSION or count == 0 or index >= count:
+        return None
+    return frame_id, index, count, sent_at, datagram[HEADER.size:]
+
+
+def is_newer(frame_id, other):
+    """frame_id가 other보다 나중 프레임인지 (uint32 순환 고려)"""
+    return frame_id != other and ((frame_id - other) & FRAME_ID_MASK) < 0x80000000
+
+
+class FrameAssembler:
+    """
+    조각 데이터그램을 프레임 단위로 다시 조립합니다.
+
+    - 조립 중인 프레임 수와 총 바이트 수에 상한이 있어 메모리가 일정 이상 늘지 않습니다.
+      상한을 넘으면 가장 오래된 프레임부터 버립니다. (overflow)
+    - timeout 안에 조각이 다 모이지 않은 프레임은 버립니다. (timed_out)
+    - 이미 완성된 프레임보다 오래된 프레임의 조각은 무시하고,
+      더 새 프레임이 완성되면 그보다 오래된 미완성 프레임도 버립니다. (stale, superseded)
+    - 송신기가 다시 시작해 frame_id가 처음부터 시작되면(뒤의 번호인데 송신 시각이 더 늦거나,
+      RESTART_GAP 이상 뒤로 가거나, RESTART_TIMEOUT 동안 오래된 번호만 오면)
+      상태를 비우고 새 번호부터 받습니다. (restarts)
+    """
+
+    def __init__(self, timeout=REASSEMBLY_TIMEOUT, max_frames=MAX_PENDING_FRAMES, max_bytes=MAX_PENDING_BYTES):
+        self.timeout = timeout
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+
+        self._pending = {}  # frame_id -> {"chunks", "received", "size", "started", "sent_at"}
+        self.pending_bytes = 0
+        self.last_completed = None
+        self.last_completed_at = None
+        self.last_completed_sent_at = None
+
+        self.completed = 0
+        self.restarts = 0
+        self.timed_out = 0
+        self.overflow = 0
+        self.superseded = 0
+        self.stale = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def _evict(self, frame_id):
+        frame = self._pending.pop(frame_id)
+        self.pending_bytes -= frame["size"]
+
+    def _evict_expired(self, now):
+        for frame_id, frame in list(self._pending.items()):
+            if now - frame["started"] > self.timeout:
+                self._evict(frame_id)
+                self.timed_out += 1
+
+    def _is_restart(self, frame_id, sent_at, now):
+        # 늦게 도착한 예전 프레임의 조각은 마지막 완성 프레임보다 먼저 보낸 것입니다.
+        if sent_at > self.last_completed_sent_at:
+            return True
+        behind = (self.last_completed - frame_id) & FRAME_ID_MASK
+        return behind >= RESTART_GAP or now - self.last_completed_at > RESTART_TIMEOUT
+
+    def _reset(self):
+        """송신기 재시작: 조립 중인 프레임과 마지막 완성 번호를 비웁니다."""
+        self._pending.clear()
+        self.pending_bytes = 0
+        self.last_completed = None
+        self.last_completed_at = None
+        self.last_completed_sent_at = None
+        self.restarts += 1
+
+    def _evict_oldest(self):
+        oldest = min(self._pending, key=lambda frame_id: self._pending[frame_id]["started"])
+        self._evict(oldest)
+        self.overflow += 1
+        return oldest
+
+    def add(self, datagram, now=None):
+        """
+        조각 하나를 추가합니다.
+
+        Returns:
+            tuple | None: 프레임이 완성되면 (frame_id, JPEG 바이트, 송신 시각), 아니면 None
+        """
+        chunk = parse_chunk(datagram)
+        if chunk is None:
+            self.invalid += 1
+            return None
+        frame_id, index, count, sent_at, payload = chunk
+
+        if now is None:
+            now = time.monotonic()
+        if self.last_completed is not None and not is_newer(frame_id, self.last_completed):
+            if not self._is_restart(frame_id, sent_at, now):
+                self.stale += 1
+                return None
+            self._reset()
+        self._evict_expired(now)
+
+        frame = self._pending.get(frame_id)
+        if frame is None:
+            if len(self._pending) >= self.max_frames:
+                self._evict_oldest()
+            frame = {"chunks": [None] * count, "received": 0, "size": 0, "started": now, "sent_at": sent_at}
+            self._pending[frame_id] = frame
+        elif len(frame["chunks"]) != count:
+            self.invalid += 1
+            return None
+
+        if frame["chunks"][index] is not None:
+            self.duplicates += 1
+            return None
+
+        frame["chunks"][index] = bytes(payload)  # 수신 버퍼를 다시 쓰는 경우를 위해 복사
+        frame["received"] += 1
+        frame["size"] += len(payload)
+        self.pending_bytes += len(payload)
+
+        while self.pending_bytes > self.max_bytes:
+            if self._evict_oldest() == frame_id:
+                return None
+
+        if frame["received"] < count:
+            return None
+
+        self._evict(frame_id)
+        self.completed += 1
+        self.last_completed = frame_id
+        self.last_completed_at = now
+        self.last_completed_sent_at = frame["sent_at"]
+        for other in [other for other in self._pending if not is_newer(other, frame_id)]:
+            self._evict(other)
+            self.superseded += 1
+        return frame_id, b"".join(frame["chunks"]), frame["sent_at"]
+
+    def stats(self):
+        return {
+            "completed": self.completed,
+            "pending": len(self._pending),
+            "pending_bytes": self.pending_bytes,
+            "timed_out": self.timed_out,
+            "overflow": self.overflow,
+            "superseded": self.superseded,
+            "stale": self.stale,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "restarts": self.restarts,
+        }
+
+
+def simulate(frames=600, fps=30, frame_size=(20000, 200000), loss=0.02, reorder=0.1, duplicate=0.01,
+             chunk_size=CHUNK_PAYLOAD_SIZE, max_bytes=MAX_PENDING_BYTES, restart_at=None, seed=0):
+    """
+    손실, 순서 뒤바뀜, 중복을 주입한 채널로 프레임을 보내 조립 결과를 검증합니다.
+
+    순서가 바뀐 조각은 다음 프레임의 조각들 뒤에 도착합니다.
+    restart_at번째 프레임부터는 송신기가 다시 시작한 것처럼 frame_id가 0부터 다시 붙습니다.
+    완성된 프레임이 원본과 다르거나 조립 중 메모리가 max_bytes를 넘으면 AssertionError.
+    """
+    rng = random.Random(seed)
+    assembler = FrameAssembler(max_bytes=max_bytes)
+    originals = {}
+    delayed = []
+    delivered = peak_bytes = delivered_after_restart = 0
+    now = 0.0
+
+    for sequence in range(frames):
+        restarted = restart_at is not None and sequence >= restart_at
+        frame_id = sequence - restart_at if restarted else sequence
+        data = b"\xff\xd8" + rng.randbytes(rng.randint(*frame_size))
+        originals[frame_id] = data
+
+        arriving, delayed = delayed, []
+        for chunk in split_frame(data, frame_id, now, chunk_size):
+            if rng.random() < loss:
+                continue
+            copies = 2 if rng.random() < duplicate else 1
+            target = delayed if rng.random() < reorder else arriving
+            target.extend([chunk] * copies)
+        rng.shuffle(arriving)
+
+        for chunk in arriving:
+            result = assembler.add(chunk, now)
+            peak_bytes = max(peak_bytes, assembler.pending_bytes)
+            if result is not None:
+                completed_id, payload, _ = result
+                assert payload == originals[completed_id], f"프레임 {completed_id} 내용 불일치"
+                delivered += 1
+                delivered_after_restart += restarted
+        now += 1.0 / fps
+
+    assert peak_bytes <= max_bytes, f"조립 버퍼가 상한을 넘었습니다: {peak_bytes}"
+    result = {"frames": frames, "delivered": delivered, "peak_pending_bytes": peak_bytes, **assembler.stats()}
+    if restart_at is not None:
+        result["delivered_after_restart"] = delivered_after_restart
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조각 조립 손실 주입 테스트")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--loss", type=float, default=0.02, help="조각 손실 확률")
+    parser.add_argument("--reorder", type=float, default=0.1, help="조각이 다음 프레임 뒤로 밀릴 확률")
+    parser.add_argument("--duplicate", type=float, default=0.01, help="조각 중복 확률")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_PAYLOAD_SIZE)
+    parser.add_argument("--max-bytes", type=int, default=MAX_PENDING_BYTES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for loss in sorted({0.0, args.loss}):
+        result = simulate(args.frames, loss=loss, reorder=args.reorder, duplicate=args.duplicate,
+                          chunk_size=args.chunk_size, max_bytes=args.max_bytes, seed=args.seed)
+        print(f"[UDP Protocol] loss={loss}: {result['delivered']}/{result['frames']} 프레임 완성, {result}")
+
+    # 송신기 재시작: 번호가 크게 뒤로 가든(100 -> 0) 조금만 뒤로 가든(20 -> 0)
+    # 송신 시각이 마지막 완성 프레임보다 늦으므로 첫 조각에서 바로 감지합니다.
+    for restart_at in (100, 20):
+        result = simulate(restart_at + 50, loss=0.0, reorder=args.reorder, duplicate=args.duplicate,
+                          chunk_size=args.chunk_size, max_bytes=args.max_bytes, restart_at=restart_at, seed=args.seed)
+        print(f"[UDP Protocol] {restart_at}번째 프레임 후 재시작: 재시작 뒤 "
+              f"{result['delivered_after_restart']}/50 프레임 완성, {result}")
+        assert result["restarts"] == 1, f"재시작을 {result['restarts']}번 감지했습니다"
+        assert result["delivered_after_restart"] >= 45, "재시작 뒤 프레임을 대부분 받지 못했습니다"
+
+
+if __name__ == "__main__":
+    main()
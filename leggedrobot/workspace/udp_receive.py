@@ -1,80 +1,609 @@
 # -*- coding: utf-8 -*-
-import gradio as gr
-import numpy as np
+import os
+import html
+import time
+import math
+import base64
+import select
 import socket
+import selectors
+import argparse
+import threading
+import tracemalloc
+from collections import deque
+
+import numpy as np
 import cv2
-import time
+
+from udp_protocol import MAGIC, FrameAssembler
 
 print("=== 프로그램 시작 ===")
-print("모든 라이브러리 import 완료")
 
-# UDP 수신 소켓 설정
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.bind(("0.0.0.0", 5005))
-print("UDP 서버가 0.0.0.0:5005에서 시작되었습니다.")
+# UDP 수신 설정
+UDP_HOST = os.getenv("UDP_HOST", "0.0.0.0")
+UDP_PORT = int(os.getenv("UDP_PORT", "5005"))
+MAX_DATAGRAM_SIZE = 65536
+SOCKET_BUFFER_BYTES = 4 * 1024 * 1024  # 수신 스레드가 잠깐 밀려도 패킷이 버려지지 않도록 넉넉하게
+RECV_BUFFERS = 2  # recv_into용 버퍼 초기 수 (스트림이 늘면 필요한 만큼 추가)
+MAX_STREAMS = 16  # 동시에 받을 최대 송신자(로봇) 수
+STREAM_IDLE_SECONDS = 30.0  # 이 시간 동안 패킷이 없으면 화면에서 뺌
+DISPLAY_BUFFERS = 3  # RGB 출력 버퍼 초기 수 (게시된 프레임 + 화면이 읽는 프레임 + 다음 디코딩, 화면이 늘면 추가)
+
+# 화면 표시 설정
+DISPLAY_WIDTH = int(os.getenv("UDP_DISPLAY_WIDTH", "1280"))  # 이보다 큰 프레임은 줄여서 보냄
+DISPLAY_HEIGHT = int(os.getenv("UDP_DISPLAY_HEIGHT", "720"))
+PASSTHROUGH = os.getenv("UDP_PASSTHROUGH") == "1"  # 1이면 디코딩 없이 받은 JPEG를 그대로 브라우저로 전달
+MIN_DISPLAY_INTERVAL = 1 / 30  # 화면 갱신 최소 간격 (최대 30 FPS)
+MAX_DISPLAY_INTERVAL = 1.0  # 화면 갱신 비용이 커도 이 간격보다는 자주 갱신
+CLIENT_HEADROOM = 1.5  # 서버 쪽 갱신 비용에 곱하는 여유 (갱신 간격 = 비용 x 여유)
+FRAME_POLL_INTERVAL = 0.005  # 새 프레임이 있는지 확인하는 간격 (초)
 
-# 전역 변수
-last_frame = None
+STATS_INTERVAL = 5.0  # 통계 출력 간격 (초)
+FPS_WINDOW = 2.0  # fps 계산 구간 (초)
+STATS_HEADERS = ["stream", "fps", "latency_ms", "p95_ms", "received", "decoded", "dropped", "incomplete"]
+LATENCY_SAMPLES = 300  # 지연 시간 통계에 쓰는 최근 프레임 수
 
-# UDP 프레임 수신 함수
-def receive_udp_frame():
-    global last_frame
-    sock.settimeout(0.1)
-    
+JPEG_SOI = b"\xff\xd8"
+JPEG_COM = b"\xff\xfe"  # 송신 시각을 담는 JPEG 주석 세그먼트 (udp_send.py --raw --stamp)
+STAMP_PREFIX = b"ts="
+
+BLANK_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def sent_time(data):
+    """
+    udp_send.py가 JPEG 주석 세그먼트에 넣은 송신 시각을 읽습니다. 없으면 None.
+
+    주석 세그먼트는 디코더가 무시하므로 일반 JPEG 송신기와도 호환됩니다.
+    """
+    if data[2:4] != JPEG_COM:
+        return None
+    length = int.from_bytes(data[4:6], "big")
+    comment = bytes(data[6:4 + length])
+    if not comment.startswith(STAMP_PREFIX):
+        return None
     try:
-        data, addr = sock.recvfrom(65536)
-        np_arr = np.frombuffer(data, dtype=np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        if frame is not None:
-            print(f"프레임 수신 성공 from {addr}")
-            last_frame = frame.copy()
+        return float(comment[len(STAMP_PREFIX):])
+    except ValueError:
+        return None
+
+
+class StreamChannel:
+    """
+    송신자(로봇) 하나의 수신 상태: 조각 조립, 최신 프레임 슬롯, 통계
+
+    - latest는 (번호, RGB 프레임, 수신 시각) 튜플을 통째로 바꾸는 방식이라
+      읽는 쪽은 락 없이 항상 완전한 프레임을 봅니다. (참조 대입은 원자적)
+    - RGB 변환 결과는 출력 버퍼를 돌려 쓰므로 프레임마다 새로 할당되는 것은 imdecode 결과뿐입니다.
+      화면(브라우저 탭)마다 acquire(viewer)로 읽는 버퍼를 따로 표시하므로 어느 화면이 읽는 중인
+      버퍼도 덮어쓰지 않습니다. 버퍼 수는 화면 수 + 2까지 늘어납니다.
+    - passthrough면 디코딩하지 않고 받은 JPEG 바이트를 latest_jpeg에 그대로 둡니다.
+      (decoded는 게시한 프레임 수)
+    """
+
+    def __init__(self, address, passthrough=False):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.passthrough = passthrough
+        self.latest = None  # (frame_no, rgb_frame, received_at)
+        self.latest_jpeg = None  # passthrough: (frame_no, JPEG 바이트, received_at)
+        self.last_seen = time.monotonic()
+        self.pending = None  # 이번 수신에서 가장 최근 JPEG (data, sent_at, recv_buffer)
+
+        self.assembler = FrameAssembler()
+        self.received = 0  # 받은(조각은 조립이 끝난) JPEG 프레임 수
+        self.decoded = 0  # 디코딩한 프레임 수
+        self.dropped = 0  # 더 새 프레임에 밀려 디코딩하지 않은 프레임 수
+        self.errors = 0  # 디코딩 실패 수
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)  # 송신 -> 디코딩 완료 (초)
+        self._decode_times = deque(maxlen=LATENCY_SAMPLES)  # fps 계산용
+
+        self._display_buffers = [None] * DISPLAY_BUFFERS
+        self._published = None  # latest 프레임이 담긴 출력 버퍼 번호
+        self._reading = {}  # 화면 -> 그 화면이 읽고 있는 출력 버퍼 번호
+        self._reading_lock = threading.Lock()
+
+    def _output_buffer(self, shape):
+        """게시된 프레임과 화면들이 읽는 프레임이 아닌 출력 버퍼를 반환합니다. (크기가 바뀌면 새로 할당)"""
+        with self._reading_lock:
+            busy = {self._published, *self._reading.values()}
+        index = next((i for i in range(len(self._display_buffers)) if i not in busy), None)
+        if index is None:
+            self._display_buffers.append(None)
+            index = len(self._display_buffers) - 1
+        buffer = self._display_buffers[index]
+        if buffer is None or buffer.shape != shape:
+            buffer = self._display_buffers[index] = np.empty(shape, dtype=np.uint8)
+        return index, buffer
+
+    def publish(self, data, sent_at):
+        """JPEG를 디코딩해 빈 출력 버퍼에 RGB로 변환하고 latest로 게시합니다. (passthrough면 JPEG 그대로)"""
+        received_at = time.time()
+        if self.passthrough:
+            self.decoded += 1
+            self.latest_jpeg = (self.decoded, bytes(data), received_at)  # 수신 버퍼는 다시 쓰이므로 복사
+        else:
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                self.errors += 1
+                return
+
+            index, rgb = self._output_buffer(frame.shape)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            self.decoded += 1
+            self.latest = (self.decoded, rgb, received_at)
+            self._published = index
+
+        self._decode_times.append(time.monotonic())
+        if sent_at is not None:
+            self._latencies.append(time.time() - sent_at)
+
+    def acquire(self, viewer=None):
+        """
+        화면에 보낼 최신 프레임을 반환하고, 같은 viewer의 다음 acquire()나 release()까지
+        그 버퍼를 덮어쓰지 않게 표시합니다.
+
+        표시하는 사이에 새 프레임이 게시되면 다시 읽습니다.
+        """
+        while True:
+            latest = self.latest
+            if latest is None:
+                return None
+            index = next((i for i, buffer in enumerate(self._display_buffers) if buffer is latest[1]), None)
+            if index is None:
+                # 읽는 사이에 새 프레임이 게시되고 예전 버퍼 자리가 다른 크기로 바뀐 경우
+                continue
+            with self._reading_lock:
+                self._reading[viewer] = index
+            if self.latest is latest:
+                return latest
+
+    def release(self, viewer=None):
+        """화면이 닫히면 그 화면이 잡고 있던 출력 버퍼를 풀어 줍니다."""
+        with self._reading_lock:
+            self._reading.pop(viewer, None)
+
+    def version(self):
+        """화면에 보낸 프레임이 최신인지 비교하기 위한 현재 프레임 번호 (없으면 0)"""
+        latest = self.latest_jpeg if self.passthrough else self.latest
+        return latest[0] if latest is not None else 0
+
+    def fps(self):
+        """최근 FPS_WINDOW초 동안의 초당 디코딩 수"""
+        now = time.monotonic()
+        times = [t for t in self._decode_times if now - t <= FPS_WINDOW]
+        if len(times) < 2:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0]) if times[-1] > times[0] else 0.0
+
+    def stats(self):
+        """수신/디코딩/드롭 수, fps, 조각 조립 통계와 최근 지연 시간(ms)을 반환합니다."""
+        latencies = sorted(self._latencies)
+        stats = {
+            "fps": round(self.fps(), 1),
+            "received": self.received,
+            "decoded": self.decoded,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "reassembly": self.assembler.stats(),
+        }
+        if latencies:
+            stats["latency_avg_ms"] = round(sum(latencies) / len(latencies) * 1000, 1)
+            stats["latency_p95_ms"] = round(latencies[int((len(latencies) - 1) * 0.95)] * 1000, 1)
+        return stats
+
+
+class FrameReceiver:
+    """
+    한 UDP 포트로 여러 로봇의 스트림을 받아 송신 주소별 StreamChannel로 나눕니다.
+
+    - 수신 스레드 하나가 selectors로 소켓을 기다렸다가 쌓인 패킷을 모두 읽고,
+      스트림마다 가장 최근에 완성된 JPEG만 디코딩합니다. (나머지는 dropped)
+    - JPEG 하나가 통째로 담긴 데이터그램과 udp_protocol의 조각 데이터그램을 모두 받습니다.
+    - 패킷은 미리 할당한 버퍼에 recv_into로 받습니다. 단일 데이터그램 JPEG는 디코딩할 때까지
+      그 버퍼를 스트림이 잡고 있고, 다음 패킷은 빈 버퍼로 받습니다. (버퍼 수 <= 스트림 수 + 1)
+    - 스트림 목록(streams)은 튜플을 통째로 바꾸므로 화면 쪽은 락 없이 읽습니다.
+    - passthrough면 디코딩하지 않습니다. (StreamChannel 참고)
+    """
+
+    def __init__(self, host=UDP_HOST, port=UDP_PORT, max_streams=MAX_STREAMS, passthrough=PASSTHROUGH):
+        self.host = host
+        self.port = port
+        self.max_streams = max_streams
+        self.passthrough = passthrough
+        self.channels = {}  # 송신 주소 -> StreamChannel
+        self.streams = ()  # 화면 표시용 스트림 목록 (주소 순)
+        self.rejected = 0  # 스트림 수 상한을 넘어 무시한 패킷 수
+
+        self._free_buffers = [memoryview(bytearray(MAX_DATAGRAM_SIZE)) for _ in range(RECV_BUFFERS)]
+        self._selector = None
+        self._sock = None
+        self._thread = None
+        self._running = False
+        self._last_cleanup = time.monotonic()
+
+    def open(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
+        self._sock.bind((self.host, self.port))
+        self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        return self
+
+    def start(self):
+        self.open()
+        self._running = True
+        self._thread = threading.Thread(target=self._receive_loop, name="udp-receiver", daemon=True)
+        self._thread.start()
+        print(f"UDP 서버가 {self.host}:{self.port}에서 시작되었습니다.")
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._selector is not None:
+            self._selector.close()
+        if self._sock is not None:
+            self._sock.close()
+
+    def _channel(self, address):
+        channel = self.channels.get(address)
+        if channel is None:
+            if len(self.channels) >= self.max_streams:
+                return None
+            channel = self.channels[address] = StreamChannel(address, self.passthrough)
+            self.streams = tuple(sorted(self.channels.values(), key=lambda c: c.address))
+            print(f"[UDP] 새 스트림: {channel.name}")
+        return channel
+
+    def _release(self, pending):
+        if pending is not None and pending[2] is not None:
+            self._free_buffers.append(pending[2])
+
+    def _drain(self):
+        """소켓에 쌓인 패킷을 모두 읽어 스트림마다 가장 최근에 완성된 JPEG를 pending에 둡니다."""
+        updated = set()
+        while True:
+            if not self._free_buffers:
+                self._free_buffers.append(memoryview(bytearray(MAX_DATAGRAM_SIZE)))
+            buffer = self._free_buffers[-1]
+            try:
+                size, address = self._sock.recvfrom_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                return updated
+            data = buffer[:size]
+
+            channel = self._channel(address)
+            if channel is None:
+                self.rejected += 1
+                continue
+            channel.last_seen = time.monotonic()
+
+            if data[:2] == JPEG_SOI:
+                frame = (data, sent_time(data), self._free_buffers.pop())
+            elif data[:2] == MAGIC:
+                completed = channel.assembler.add(data)
+                if completed is None:
+                    continue
+                _, jpeg, sent_at = completed
+                frame = (jpeg, sent_at, None)
+            else:
+                continue
+
+            channel.received += 1
+            if channel.pending is not None:
+                channel.dropped += 1
+                self._release(channel.pending)
+            channel.pending = frame
+            updated.add(channel)
+
+    def _remove_idle(self):
+        """STREAM_IDLE_SECONDS 동안 패킷이 없던 스트림을 목록에서 뺍니다."""
+        now = time.monotonic()
+        idle = [address for address, channel in self.channels.items() if now - channel.last_seen > STREAM_IDLE_SECONDS]
+        for address in idle:
+            print(f"[UDP] 스트림 종료: {self.channels.pop(address).name}")
+        if idle:
+            self.streams = tuple(sorted(self.channels.values(), key=lambda c: c.address))
+
+    def poll(self, timeout=0.1):
+        """패킷을 기다렸다가 읽고, 새 프레임이 있는 스트림마다 한 장씩 디코딩합니다."""
+        if self._selector.select(timeout):
+            for channel in self._drain():
+                pending, channel.pending = channel.pending, None
+                channel.publish(pending[0], pending[1])
+                self._release(pending)
+
+        if time.monotonic() - self._last_cleanup > 1.0:
+            self._last_cleanup = time.monotonic()
+            self._remove_idle()
+
+    def _receive_loop(self):
+        while self._running:
+            try:
+                self.poll()
+            except OSError:
+                break
+
+    def stats(self):
+        """스트림별 통계"""
+        return {channel.name: channel.stats() for channel in self.streams}
+
+
+def _fit(frame, tile):
+    """비율을 유지한 채 frame을 tile 가운데에 그립니다. (INTER_AREA보다 5배가량 빠른 INTER_LINEAR 사용)"""
+    tile_height, tile_width = tile.shape[:2]
+    height, width = frame.shape[:2]
+    scale = min(tile_width / width, tile_height / height)
+    fit_width, fit_height = max(1, int(width * scale)), max(1, int(height * scale))
+    x, y = (tile_width - fit_width) // 2, (tile_height - fit_height) // 2
+    cv2.resize(frame, (fit_width, fit_height), dst=tile[y:y + fit_height, x:x + fit_width], interpolation=cv2.INTER_LINEAR)
+
+
+def render_grid(streams, canvas, viewer=None):
+    """
+    스트림들의 최신 프레임을 화면 크기의 canvas에 격자로 그립니다. (viewer는 acquire() 참고)
+
+    스트림이 하나면 화면보다 클 때만 줄여서 그리고, 아니면 그 프레임을 그대로 반환합니다.
+    각 칸 왼쪽 위에 스트림 이름과 fps를 표시합니다.
+    """
+    if not streams:
+        return BLANK_FRAME
+    if len(streams) == 1:
+        latest = streams[0].acquire(viewer)
+        if latest is None:
+            return BLANK_FRAME
+        frame = latest[1]
+        if frame.shape[0] <= canvas.shape[0] and frame.shape[1] <= canvas.shape[1]:
             return frame
-    except socket.timeout:
-        pass
-    except Exception as e:
-        print(f"프레임 수신 오류: {e}")
-    
-    return None
-
-# 비디오 스트림 표시 함수
-def video_stream():
-    global last_frame
-    
+        canvas[:] = 0
+        _fit(frame, canvas)
+        return canvas
+
+    columns = math.ceil(math.sqrt(len(streams)))
+    rows = math.ceil(len(streams) / columns)
+    tile_width, tile_height = canvas.shape[1] // columns, canvas.shape[0] // rows
+
+    canvas[:] = 0
+    for i, channel in enumerate(streams):
+        x, y = (i % columns) * tile_width, (i // columns) * tile_height
+        tile = canvas[y:y + tile_height, x:x + tile_width]
+        latest = channel.acquire(viewer)
+        if latest is not None:
+            _fit(latest[1], tile)
+        cv2.putText(tile, f"{channel.name} {channel.fps():.0f}fps", (8, 24),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+    return canvas
+
+
+def render_html(streams):
+    """passthrough: 받은 JPEG를 디코딩 없이 data URI로 넣은 격자 HTML (크기 조절은 브라우저가 함)"""
+    if not streams:
+        return "<p>UDP 스트림 수신 대기 중...</p>"
+
+    columns = math.ceil(math.sqrt(len(streams)))
+    tiles = []
+    for channel in streams:
+        latest = channel.latest_jpeg
+        image = ""
+        if latest is not None:
+            image = (f'<img src="data:image/jpeg;base64,{base64.b64encode(latest[1]).decode()}" '
+                     f'style="width:100%;height:auto;display:block">')
+        tiles.append(f"<figure style=\"margin:0\">{image}"
+                     f"<figcaption>{html.escape(channel.name)} {channel.fps():.0f}fps</figcaption></figure>")
+    return (f'<div style="display:grid;grid-template-columns:repeat({columns},1fr);gap:4px;'
+            f'max-width:{DISPLAY_WIDTH}px">{"".join(tiles)}</div>')
+
+
+class DisplayPacer:
+    """
+    화면 갱신 간격을 서버 쪽 갱신 비용에 맞춥니다.
+
+    yield한 뒤 다시 호출될 때까지 걸린 시간(Gradio 후처리와 이미지 인코딩)의 이동 평균에
+    CLIENT_HEADROOM을 곱해 간격으로 쓰고, MIN/MAX_DISPLAY_INTERVAL 범위로 제한합니다.
+    인코딩이 무거운 큰 격자일수록 간격이 늘어납니다.
+    """
+
+    def __init__(self, min_interval=MIN_DISPLAY_INTERVAL, max_interval=MAX_DISPLAY_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._cost = None
+
+    def update(self, cost):
+        self._cost = cost if self._cost is None else self._cost * 0.8 + cost * 0.2
+        self.interval = min(self.max_interval, max(self.min_interval, self._cost * CLIENT_HEADROOM))
+
+
+def stats_rows(receiver):
+    """Gradio 표에 보여줄 스트림별 통계 행"""
+    rows = []
+    for channel in receiver.streams:
+        stats = channel.stats()
+        reassembly = stats["reassembly"]
+        incomplete = reassembly["timed_out"] + reassembly["overflow"] + reassembly["superseded"]
+        rows.append([
+            channel.name, stats["fps"], stats.get("latency_avg_ms"), stats.get("latency_p95_ms"),
+            stats["received"], stats["decoded"], stats["dropped"], incomplete,
+        ])
+    return rows
+
+
+def video_stream(receiver, unchanged=None):
+    """
+    수신 스레드가 채운 스트림별 최신 프레임만 읽어 격자 화면과 통계를 보냅니다. (소켓은 읽지 않음)
+
+    - 새 프레임이 있을 때만 화면을 보내고, 간격은 DisplayPacer가 서버 쪽 갱신 비용에 맞춥니다.
+    - 새 프레임이 없어도 MAX_DISPLAY_INTERVAL마다 화면 대신 unchanged(gr.update())와
+      통계만 보내 표가 멈추지 않게 합니다.
+    - passthrough면 화면은 render_html()의 HTML입니다.
+    - 탭마다 이 제너레이터가 하나씩 돌며, 각자 canvas와 읽는 버퍼 표시(viewer)를 따로 가집니다.
+    """
+    pacer = DisplayPacer()
+    canvas = np.zeros((DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
+    viewer = object()
+    shown = None
+    last_yield = 0.0
+
+    try:
+        while True:
+            streams = receiver.streams
+            versions = tuple((channel.address, channel.version()) for channel in streams)
+            since = time.monotonic() - last_yield
+
+            if versions == shown:
+                if since >= MAX_DISPLAY_INTERVAL:
+                    last_yield = time.monotonic()
+                    yield unchanged, stats_rows(receiver)
+                else:
+                    time.sleep(FRAME_POLL_INTERVAL)
+                continue
+            if since < pacer.interval:
+                time.sleep(pacer.interval - since)
+                continue  # 기다리는 동안 더 새 프레임이 왔을 수 있으므로 다시 읽음
+
+            shown = versions
+            output = render_html(streams) if receiver.passthrough else render_grid(streams, canvas, viewer)
+            last_yield = time.monotonic()
+            yield output, stats_rows(receiver)
+            pacer.update(time.monotonic() - last_yield)
+    finally:
+        # 탭이 닫혀 제너레이터가 끝나면 잡고 있던 출력 버퍼를 돌려줌
+        for channel in receiver.streams:
+            channel.release(viewer)
+
+
+def print_stats(receiver):
+    """STATS_INTERVAL마다 스트림별 수신 통계를 출력합니다."""
     while True:
+        time.sleep(STATS_INTERVAL)
+        for name, stats in receiver.stats().items():
+            print(f"[UDP] {name}: {stats}")
+
+
+def _legacy_receive(sock):
+    """이전 수신 경로 (벤치마크 비교용): 패킷마다 bytes, 디코딩 결과 복사, 새 RGB 배열"""
+    data, _ = sock.recvfrom(MAX_DATAGRAM_SIZE)
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    last_frame = frame.copy()
+    return cv2.cvtColor(last_frame, cv2.COLOR_BGR2RGB)
+
+
+def benchmark(frames=300, rounds=3, port=UDP_PORT + 100, width=1280, height=720):
+    """
+    이전 경로, 현재 경로, passthrough의 프레임당 할당량(tracemalloc 최대 증가량)과 CPU 시간을 비교합니다.
+
+    루프백으로 JPEG 데이터그램을 하나씩 보내고 수신 측 처리만 측정합니다.
+    CPU 시간은 tracemalloc 부담이 섞이지 않도록 따로, 두 경로를 번갈아 rounds번 측정해
+    가장 작은 평균을 씁니다. (디코딩 시간의 흔들림이 차이보다 큼)
+    """
+    from udp_send import synthetic_frames
+
+    jpeg = cv2.imencode(".jpg", next(synthetic_frames(width, height)), [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver = FrameReceiver("127.0.0.1", port).open()
+    passthrough = FrameReceiver("127.0.0.1", port + 1, passthrough=True).open()
+
+    paths = (
+        ("before", receiver, lambda: _legacy_receive(receiver._sock)),
+        ("after", receiver, lambda: receiver.poll(0)),
+        ("passthrough", passthrough, lambda: passthrough.poll(0)),
+    )
+
+    def send(target):
+        sender.sendto(jpeg, (target.host, target.port))
+        select.select([target._sock], [], [])
+
+    def measure_cpu(target, receive):
+        cpu = 0.0
+        for _ in range(frames):
+            send(target)
+            start = time.process_time()
+            receive()
+            cpu += time.process_time() - start
+        return cpu / frames
+
+    cpu = {name: float("inf") for name, _, _ in paths}
+    for _ in range(rounds):
+        for name, target, receive in paths:
+            cpu[name] = min(cpu[name], measure_cpu(target, receive))
+
+    results = {}
+    for name, target, receive in paths:
+        allocated = 0
+        tracemalloc.start()
+        for _ in range(frames):
+            send(target)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            receive()
+            allocated += tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+
+        results[name] = {
+            "alloc_kb_per_frame": round(allocated / frames / 1024, 1),
+            "cpu_ms_per_frame": round(cpu[name] * 1000, 3),
+        }
+        print(f"[UDP Benchmark] {name}: {results[name]}")
+
+    sender.close()
+    receiver.stop()
+    passthrough.stop()
+    print(f"[UDP Benchmark] {width}x{height}, JPEG {len(jpeg)} bytes, {frames} frames")
+    return results
+
+
+def build_interface(receiver):
+    import gradio as gr
+
+    print("Gradio 인터페이스 생성 중...")
+    if receiver.passthrough:
+        screen = gr.HTML(label="UDP 비디오 스트림 (JPEG 그대로 전달)")
+    else:
+        screen = gr.Image(label="UDP 비디오 스트림", width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT)
+
+    return gr.Interface(
+        fn=lambda: video_stream(receiver, gr.update()),
+        inputs=[],
+        outputs=[
+            screen,
+            gr.Dataframe(label="스트림별 통계", headers=STATS_HEADERS),
+        ],
+        title="UDP 비디오 스트리밍",
+        description="실시간 UDP 비디오 스트림 수신 및 표시 (로봇이 여러 대면 송신 주소별로 격자 표시)",
+        live=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP JPEG 스트림 수신 및 표시")
+    parser.add_argument("--headless", action="store_true", help="Gradio 없이 수신 통계만 출력")
+    parser.add_argument("--benchmark", action="store_true", help="프레임당 할당량/CPU 시간 측정 후 종료")
+    parser.add_argument("--passthrough", action="store_true", default=PASSTHROUGH,
+                        help="디코딩/재인코딩 없이 받은 JPEG를 그대로 브라우저로 전달")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+
+    receiver = FrameReceiver(passthrough=args.passthrough).start()
+    threading.Thread(target=print_stats, args=(receiver,), name="udp-stats", daemon=True).start()
+
+    if args.headless:
         try:
-            # 최신 프레임 수신
-            current_frame = receive_udp_frame()
-            
-            # 화면 표시용 프레임 선택
-            if current_frame is not None:
-                display_frame_rgb = cv2.cvtColor(current_frame, cv2.COLOR_BGR2RGB)
-            elif last_frame is not None:
-                display_frame_rgb = cv2.cvtColor(last_frame, cv2.COLOR_BGR2RGB)
-            else:
-                # 표시할 프레임이 없으면 검은 화면 생성
-                display_frame_rgb = np.zeros((480, 640, 3), dtype=np.uint8)
-            
-            yield display_frame_rgb
-            time.sleep(0.03)  # 약 30 FPS
-            
-        except Exception as e:
-            print(f"스트리밍 오류: {e}")
-            error_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            yield error_frame
-
-# Gradio 인터페이스 구성
-print("Gradio 인터페이스 생성 중...")
-
-interface = gr.Interface(
-    fn=video_stream,
-    inputs=[],
-    outputs=[
-        gr.Image(label="UDP 비디오 스트림", width=1280, height=720)
-    ],
-    title="UDP 비디오 스트리밍",
-    description="실시간 UDP 비디오 스트림 수신 및 표시",
-    live=True
-)
-
-print("Gradio 인터페이스 시작...")
-interface.launch(server_name="0.0.0.0", share=True)
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"[UDP] 종료: {receiver.stats()}")
+        return
+
+    interface = build_interface(receiver)
+    print("Gradio 인터페이스 시작...")
+    interface.launch(server_name="0.0.0.0", share=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 재생 송신기: 영상 파일(또는 합성 프레임)을 JPEG-over-UDP로 보냅니다.
+
+udp_receive.py의 지연 시간/드롭 측정용 참조 송신기입니다.
+기본은 udp_protocol의 조각 프로토콜로 보내며 헤더의 송신 시각으로 지연을 계산합니다.
+--raw는 JPEG 하나를 데이터그램 하나로 보내는 기존 형식이고, 이때 --stamp를 주면
+JPEG 주석 세그먼트에 송신 시각을 넣습니다.
+
+    python udp_receive.py --headless
+    python udp_send.py --video sample.mp4 --fps 60 --quality 95 --loss 0.01
+    python udp_send.py --video sample.mp4 --raw --stamp
+    python udp_send.py --streams 8   # 로봇 8대 흉내 (송신 포트가 다른 소켓 8개)
+"""
+import time
+import random
+import socket
+import argparse
+
+import numpy as np
+import cv2
+
+from udp_protocol import CHUNK_PAYLOAD_SIZE, split_frame
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5005
+DEFAULT_FPS = 30
+DEFAULT_QUALITY = 80
+MAX_DATAGRAM_SIZE = 65507  # IPv4 UDP 페이로드 최대 크기
+
+
+def stamp_jpeg(jpeg, sent_at):
+    """SOI 바로 뒤에 송신 시각을 담은 주석(COM) 세그먼트를 넣습니다."""
+    comment = b"ts=%.6f" % sent_at
+    segment = b"\xff\xfe" + (len(comment) + 2).to_bytes(2, "big") + comment
+    return jpeg[:2] + segment + jpeg[2:]
+
+
+def synthetic_frames(width=640, height=480):
+    """영상 파일이 없을 때 쓰는 움직이는 테스트 패턴"""
+    index = 0
+    while True:
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        x = (index * 8) % width
+        cv2.rectangle(frame, (x, height // 3), (x + 80, height // 3 + 80), (0, 200, 255), -1)
+        cv2.putText(frame, str(index), (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+        yield frame
+        index += 1
+
+
+def video_frames(path, loop=True):
+    """영상 파일의 프레임을 순서대로 반환합니다. loop면 끝나면 처음부터 다시 재생합니다."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"영상 파일을 열 수 없습니다: {path}")
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                if not loop:
+                    return
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                continue
+            yield frame
+    finally:
+        cap.release()
+
+
+def send_frames(frames, host=DEFAULT_HOST, port=DEFAULT_PORT, fps=DEFAULT_FPS, quality=DEFAULT_QUALITY,
+                count=None, stamp=False, raw=False, chunk_size=CHUNK_PAYLOAD_SIZE, loss=0.0, seed=None, streams=1):
+    """
+    프레임을 fps 간격으로 인코딩해 보냅니다.
+
+    Args:
+        raw (bool): True면 조각으로 나누지 않고 JPEG 하나를 데이터그램 하나로 보냄 (기존 형식)
+        chunk_size (int): 조각 하나의 JPEG 바이트 수
+        loss (float): 테스트용으로 조각(raw면 프레임)을 보내지 않고 버릴 확률
+        streams (int): 같은 프레임을 서로 다른 소켓(송신 포트)으로 보내 로봇 여러 대를 흉내냄
+
+    Returns:
+        dict: {"sent", "skipped", "datagrams", "lost", "seconds"}
+            skipped는 raw 모드에서 한 데이터그램보다 커서 보내지 못한 프레임 수
+    """
+    socks = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(streams)]
+    rng = random.Random(seed)
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    interval = 1.0 / fps if fps > 0 else 0.0
+    sent = skipped = datagrams = lost = 0
+    start = next_at = time.perf_counter()
+
+    try:
+        for frame in frames:
+            if count is not None and sent + skipped >= count:
+                break
+            ok, encoded = cv2.imencode(".jpg", frame, params)
+            if not ok:
+                continue
+            data = encoded.tobytes()
+            if raw:
+                if stamp:
+                    data = stamp_jpeg(data, time.time())
+                packets = [data] if len(data) <= MAX_DATAGRAM_SIZE else []
+            else:
+                packets = split_frame(data, sent, time.time(), chunk_size)
+
+            for sock in socks:
+                for packet in packets:
+                    if loss and rng.random() < loss:
+                        lost += 1
+                        continue
+                    sock.sendto(packet, (host, port))
+                    datagrams += 1
+            if packets:
+                sent += 1
+            else:
+                skipped += 1
+
+            # 인코딩 시간과 무관하게 일정한 간격 유지
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    finally:
+        for sock in socks:
+            sock.close()
+
+    return {"sent": sent, "skipped": skipped, "datagrams": datagrams, "lost": lost,
+            "seconds": round(time.perf_counter() - start, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JPEG-over-UDP 재생 송신기")
+    parser.add_argument("--video", help="보낼 영상 파일 (없으면 합성 테스트 패턴)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="초당 전송 프레임 수 (0이면 최대 속도)")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG 품질 (1~100)")
+    parser.add_argument("--count", type=int, help="보낼 프레임 수 (기본: 무제한)")
+    parser.add_argument("--raw", action="store_true", help="조각으로 나누지 않고 기존 단일 데이터그램 형식으로 전송")
+    parser.add_argument("--stamp", action="store_true", help="--raw에서 지연 시간 측정용 송신 시각 삽입")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_PAYLOAD_SIZE, help="조각 하나의 바이트 수")
+    parser.add_argument("--loss", type=float, default=0.0, help="테스트용 패킷 손실 확률")
+    parser.add_argument("--streams", type=int, default=1, help="흉내낼 로봇 수 (스트림마다 송신 포트가 다름)")
+    args = parser.parse_args()
+
+    frames = video_frames(args.video) if args.video else synthetic_frames()
+    print(f"[UDP Send] {args.host}:{args.port}로 전송 시작 ({args.fps} fps)")
+    try:
+        result = send_frames(frames, args.host, args.port, args.fps, args.quality, args.count,
+                             stamp=args.stamp, raw=args.raw, chunk_size=args.chunk_size, loss=args.loss,
+                             streams=args.streams)
+    except KeyboardInterrupt:
+        return
+    print(f"[UDP Send] 완료: {result}")
+
+
+if __name__ == "__main__":
+    main()